@@ -1,287 +1,493 @@
+import functools
+import json
+import logging
+import os
+import time
+from urllib.parse import urlencode
 import streamlit as st
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import yfinance as yf
-from dataclasses import dataclass
-from typing import List, Optional
+
+from mstr_sim import (GBM, BlockBootstrap, ConvertibleDebt, MarketImpact, PreferredStock, RegimeSwitching, render,
+                      simulate_mstr_bands, simulate_mstr_monthly)
+from mstr_sim.archive import KINDS as ARCHIVED_KINDS, RunArchive
+from mstr_sim.cache import ResultCache, TTLCache
+from mstr_sim.client import ServiceClient
+from mstr_sim.incremental import IncrementalSimulator
+from mstr_sim.marketdata import MarketData
+from mstr_sim.sensitivity import sensitivity_report
+from mstr_sim.paths import CachedGenerator
+from mstr_sim.preview import PreviewRenderer
+from mstr_sim.profiling import Profiler, StageTimer
+from mstr_sim.scenario import scenario_dict
+from mstr_sim.solver import solve_breakeven
+from mstr_sim.sweep import sweep_grid
+
+# Optional directory shared by every session/worker for cached results and quotes
+CACHE_DIR = os.environ.get("MSTR_SIM_CACHE_DIR")
+QUOTE_TTL_SECONDS = 300
+# Optional run archive: every monthly run and Monte Carlo study is kept here (the newest
+# MSTR_SIM_ARCHIVE_MAX_RUNS of them) and reopened instead of recomputed
+ARCHIVE_DIR = os.environ.get("MSTR_SIM_ARCHIVE_DIR")
+ARCHIVE_MAX_RUNS = int(os.environ.get("MSTR_SIM_ARCHIVE_MAX_RUNS", 500))
+# Optional shared simulation service (`python -m mstr_sim serve`); the app then only renders
+SERVICE_URL = os.environ.get("MSTR_SIM_SERVICE_URL")
+# Debug panel with per-stage timings and profiling; every rerun's timings are also logged (`mstr_sim.profiling`)
+DEBUG = bool(os.environ.get("MSTR_SIM_DEBUG"))
 
 # -----------------------------
-# Data Structures
+# Caches (shared across sessions)
 # -----------------------------
-@dataclass
-class ConvertibleDebt:
-    name: str
-    principal: float
-    maturity_month: int  # Month index from start (e.g., 36 = 3 years out)
-    coupon_rate: float
-    conversion_price: float
-
-@dataclass
-class PreferredStock:
-    name: str
-    principal: float
-    dividend_rate: float
+@st.cache_resource
+def get_result_cache():
+    return ResultCache(max_entries=64, directory=os.path.join(CACHE_DIR, "results") if CACHE_DIR else None)
+
+@st.cache_resource
+def get_quote_cache():
+    return TTLCache(ttl_seconds=QUOTE_TTL_SECONDS, directory=os.path.join(CACHE_DIR, "quotes") if CACHE_DIR else None)
+
+@st.cache_resource
+def get_incremental_simulator():
+    # Resumes from the last checkpoint unaffected by the changed inputs
+    return IncrementalSimulator(checkpoint_every=12)
+
+@st.cache_resource
+def get_market_data():
+    return MarketData(timeout=8.0)
+
+@st.cache_resource
+def get_run_archive():
+    return RunArchive(ARCHIVE_DIR, max_runs=ARCHIVE_MAX_RUNS)
+
+@st.cache_resource
+def get_preview_renderer():
+    # Share-preview cards, cached by scenario hash
+    return PreviewRenderer(max_entries=128, directory=os.path.join(CACHE_DIR, "previews") if CACHE_DIR else None)
+
+@st.cache_resource
+def get_service_client():
+    return ServiceClient(SERVICE_URL)
+
+@st.cache_resource
+def setup_logging():
+    # Structured timing records to stderr, one JSON line per rerun
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    logger = logging.getLogger("mstr_sim")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+# -----------------------------
+# Instrumentation
+# -----------------------------
+def stage(name, **details):
+    """Times a stage of the current rerun (shown in the debug panel and logged)."""
+    return st.session_state['rerun_timer'].stage(name, **details)
+
+def timed_fragment(fn):
+    """`st.fragment` timed as a stage; a rerun of just the fragment gets (and logs) its own timer."""
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        timer = st.session_state.get('rerun_timer')
+        own = timer is None
+        if own:
+            timer = st.session_state['rerun_timer'] = StageTimer(f"app.fragment.{fn.__name__}")
+        try:
+            with timer.stage(fn.__name__):
+                return fn(*args, **kwargs)
+        finally:
+            if own:
+                timer.log()
+                st.session_state['rerun_timer'] = None
+    return st.fragment(run)
+
+def plot(fig):
+    """`st.plotly_chart`, timed per figure (serializing the traces is most of its cost)."""
+    with stage("chart", title=fig.layout.title.text, traces=len(fig.data)):
+        st.plotly_chart(fig, width="stretch")
 
 # -----------------------------
 # Helper Functions
 # -----------------------------
+@st.cache_resource
+def load_image(path):
+    """Image bytes, read once per process (None if missing)."""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+def _fetch_quotes():
+    """Fetches live BTC and MSTR quotes (concurrently, topping up the local history)."""
+    quotes = get_market_data().refresh()
+    return quotes.btc_price, quotes.mstr_price, quotes.shares_outstanding
+
 def fetch_live_data():
-    """Fetches live BTC and MSTR data using yfinance."""
+    """Live quotes, cached for a few minutes, with a last-known-good fallback."""
     try:
-        btc = yf.Ticker("BTC-USD")
-        mstr = yf.Ticker("MSTR")
-        
-        btc_price = btc.history(period="1d")['Close'].iloc[-1]
-        mstr_price = mstr.history(period="1d")['Close'].iloc[-1]
-        
-        # Shares outstanding is tricky to get accurately from free APIs sometimes,
-        # but let's try info. If not, fallback.
-        shares_outstanding = mstr.info.get('sharesOutstanding', 275_000_000) # Fallback to ~275M
-        
-        return btc_price, mstr_price, shares_outstanding
+        quotes, stale = get_quote_cache().get_or_fetch("BTC-USD/MSTR", _fetch_quotes)
     except Exception as e:
         st.warning(f"Could not fetch live data: {e}. Using defaults.")
         return None, None, None
+    if stale:
+        st.warning("Yahoo Finance is unavailable. Using the last known quotes.")
+    return quotes
 
-# -----------------------------
-# Core Simulation Logic
-# -----------------------------
-def simulate_mstr_monthly(
-    n_months: int,
-    btc_price_start: float,
-    btc_growth_annual: float,
-    btc_volatility_annual: float,
-    btc_holdings_start: float,
-    cash_start: float,
-    shares_start: float,
-    convertible_debts: List[ConvertibleDebt],
-    preferred_stocks: List[PreferredStock],
-    operating_burn_annual: float,
-    issuance_capacity_pct_annual: float,
-    base_premium: float,
-    dynamic_premium: bool,
-):
+def run_label(kind, sim_inputs, **options):
+    """Short description of a run for the archive."""
+    label = (f"{sim_inputs['n_months'] // 12}y, BTC {sim_inputs['btc_growth_annual']:+.0%}, "
+             f"{sim_inputs['base_premium']:.1f}x, cap {sim_inputs['issuance_capacity_pct_annual']:.0%}, "
+             f"cash ${sim_inputs['cash_start'] / 1e6:,.0f}M")
+    if kind == "bands":
+        label += f", {options['n_paths']:,} paths ({type(options.get('generator')).__name__})"
+        if options.get('market_impact') is not None:
+            label += ", reflexive"
+    return label
+
+def preview_url(sim_inputs):
+    """Service URL of the scenario's share-preview card (usable as a link-unfurl image)."""
+    scenario = {k: json.dumps(v) for k, v in scenario_dict(sim_inputs).items()}
+    return f"{SERVICE_URL.rstrip('/')}/preview.png?{urlencode(scenario)}"
+
+def compute(kind, sim_inputs, **options):
     """
-    Monthly simulation of MSTR capital structure.
+    Runs a simulation `kind` on the shared service if configured, else in-process (cached).
+    With MSTR_SIM_ARCHIVE_DIR set, monthly runs and Monte Carlo bands are archived and reopened from the archive.
+    The debug panel's "engine phases" switch reruns them uncached with per-phase timings.
     """
-    
-    # Time array
-    months = np.arange(n_months)
-    years = months / 12.0
-    
-    # Pre-allocate arrays
-    btc_price = np.zeros(n_months)
-    mstr_stock_price = np.zeros(n_months)
-    premium_mult = np.zeros(n_months)
-    
-    btc_holdings = np.zeros(n_months)
-    cash_balance = np.zeros(n_months)
-    shares_outstanding = np.zeros(n_months)
-    
-    debt_principal = np.zeros(n_months)
-    pref_principal = np.zeros(n_months)
-    
-    nav_per_share = np.zeros(n_months)
-    market_cap = np.zeros(n_months)
-    
-    inflows = np.zeros(n_months)
-    outflows = np.zeros(n_months)
-    btc_sold = np.zeros(n_months)
-    
-    # Initial State
-    btc_price[0] = btc_price_start
-    btc_holdings[0] = btc_holdings_start
-    cash_balance[0] = cash_start
-    shares_outstanding[0] = shares_start
-    
-    # Calculate initial debt/pref totals
-    current_debts = [d for d in convertible_debts] # Copy list to modify if needed
-    current_prefs = [p for p in preferred_stocks]
-    
-    debt_principal[0] = sum(d.principal for d in current_debts)
-    pref_principal[0] = sum(p.principal for p in current_prefs)
-    
-    # Initial Premium
-    premium_mult[0] = base_premium
-    
-    collapse_month = None
-    collapse_reason = None
-
-    # Monthly growth/volatility
-    # Simple deterministic growth path for now to show trend, 
-    # or we could add random walk. Let's stick to deterministic trend for clarity
-    # but allow "scenarios" to define the path shape.
-    monthly_growth = (1 + btc_growth_annual) ** (1/12) - 1
-    
-    for i in range(n_months):
-        if i > 0:
-            # 1. Update BTC Price
-            btc_price[i] = btc_price[i-1] * (1 + monthly_growth)
-            
-            # Carry forward state
-            btc_holdings[i] = btc_holdings[i-1]
-            cash_balance[i] = cash_balance[i-1]
-            shares_outstanding[i] = shares_outstanding[i-1]
-            
-            # Dynamic Premium Logic
-            # If BTC drops significantly from peak or is in drawdown, premium compresses.
-            # Simplified: If BTC growth is negative, premium drops.
-            if dynamic_premium:
-                if monthly_growth < 0:
-                    premium_mult[i] = max(1.0, premium_mult[i-1] * 0.95) # Decay
-                else:
-                    premium_mult[i] = min(base_premium, premium_mult[i-1] * 1.02) # Recover
-            else:
-                premium_mult[i] = base_premium
-
-        # 2. Calculate NAV and Stock Price
-        # Assets = BTC + Cash
-        assets = btc_price[i] * btc_holdings[i] + cash_balance[i]
-        
-        # Liabilities = Debt + Preferreds
-        total_debt = sum(d.principal for d in current_debts)
-        total_pref = sum(p.principal for p in current_prefs)
-        
-        debt_principal[i] = total_debt
-        pref_principal[i] = total_pref
-        
-        equity_value = max(0, assets - total_debt - total_pref)
-        
-        if shares_outstanding[i] > 0:
-            nav_per_share[i] = equity_value / shares_outstanding[i]
-        else:
-            nav_per_share[i] = 0
-            
-        # Stock Price = NAV/share * Premium
-        # If NAV is 0, stock price is theoretically 0 (or option value, but let's say 0 for collapse)
-        if nav_per_share[i] <= 0:
-            mstr_stock_price[i] = 0
-            if collapse_month is None:
-                collapse_month = i
-                collapse_reason = "NAV <= 0 (Insolvency)"
-        else:
-            mstr_stock_price[i] = nav_per_share[i] * premium_mult[i]
-            
-        market_cap[i] = mstr_stock_price[i] * shares_outstanding[i]
-
-        if collapse_month is not None:
-            continue # Stop simulating logic, just fill arrays
-
-        # 3. Calculate Obligations (Monthly)
-        monthly_ops_burn = operating_burn_annual / 12.0
-        
-        # Coupon payments
-        monthly_interest = sum(d.principal * d.coupon_rate for d in current_debts) / 12.0
-        monthly_dividends = sum(p.principal * p.dividend_rate for p in current_prefs) / 12.0
-        
-        # Maturities
-        maturity_payment = 0.0
-        debts_to_remove = []
-        
-        for debt in current_debts:
-            if debt.maturity_month == i:
-                # Check for Conversion!
-                # If Stock Price > Conversion Price, debt converts to shares.
-                if mstr_stock_price[i] > debt.conversion_price:
-                    # Convert!
-                    new_shares = debt.principal / debt.conversion_price
-                    shares_outstanding[i] += new_shares
-                    # Principal is extinguished without cash
-                    debts_to_remove.append(debt)
-                else:
-                    # Must repay in cash
-                    maturity_payment += debt.principal
-                    debts_to_remove.append(debt)
-        
-        # Remove matured/converted debts
-        for d in debts_to_remove:
-            current_debts.remove(d)
-            
-        total_obligations = monthly_ops_burn + monthly_interest + monthly_dividends + maturity_payment
-        outflows[i] = total_obligations
-        
-        # 4. Funding & Inflows
-        # Issuance Capacity (Monthly limit)
-        # Max we can raise is % of Market Cap / 12
-        max_issuance = (issuance_capacity_pct_annual / 12.0) * market_cap[i]
-        
-        # We only raise what we need? Or do we always raise max to buy BTC?
-        # "Ponzi" logic: Raise max, pay obligations, buy BTC with rest.
-        # But let's stick to the previous logic: Raise to cover obligations + maybe buy BTC?
-        # Let's assume aggressive strategy: Always raise max possible to buy BTC, 
-        # but first priority is obligations.
-        
-        # Actually, to keep it simple and robust:
-        # 1. Pay obligations from Cash.
-        # 2. If Cash < Obligations, raise Capital.
-        # 3. If Capital + Cash < Obligations, Sell BTC.
-        # 4. If Surplus Capital, Buy BTC.
-        
-        # Let's model the "Aggressive Accumulation":
-        # We try to raise `max_issuance`.
-        raised_capital = max_issuance 
-        inflows[i] = raised_capital
-        
-        cash_available = cash_balance[i] + raised_capital
-        
-        if cash_available >= total_obligations:
-            # Pay obligations
-            surplus = cash_available - total_obligations
-            # Buy BTC with surplus?
-            # Let's say we keep a small buffer, but mostly buy BTC.
-            # For simplicity: Buy BTC with 90% of surplus.
-            btc_to_buy = (surplus * 0.9) / btc_price[i]
-            btc_holdings[i] += btc_to_buy
-            cash_balance[i] = surplus * 0.1 # Keep 10% as buffer
+    with stage("simulation", kind=kind) as record:
+        if kind in ARCHIVED_KINDS and st.session_state.get('debug_phases'):
+            record.details['source'] = "timed"
+            return _timed(kind, sim_inputs, **options)
+        if kind in ARCHIVED_KINDS and ARCHIVE_DIR:
+            archive = get_run_archive()
+            key = archive.key(kind, sim_inputs, **options)
+            if key in archive:
+                record.details['source'] = "archive"
+                return archive.load(key).result()
+            result, record.details['source'] = _compute(kind, sim_inputs, **options)
+            archive.save(kind, sim_inputs, result, label=run_label(kind, sim_inputs, **options), **options)
+            return result
+        result, record.details['source'] = _compute(kind, sim_inputs, **options)
+        return result
+
+def _timed(kind, sim_inputs, **options):
+    phase_times = {}
+    if kind == "monthly":
+        result = simulate_mstr_monthly(**sim_inputs, phase_times=phase_times)
+    else:
+        result = simulate_mstr_bands(**options, **sim_inputs, phase_times=phase_times)
+    st.session_state['rerun_timer'].add_phases(phase_times)
+    return result
+
+def _cached(fn, **inputs):
+    computed = []
+    def run():
+        computed.append(True)
+        return fn(**inputs)
+    result = get_result_cache().get_or_compute(ResultCache.call_key(fn, **inputs), run)
+    return result, "computed" if computed else "cache"
+
+def _compute(kind, sim_inputs, **options):
+    """Result of `kind` and where it came from ("service", "cache" or "computed")."""
+    if SERVICE_URL:
+        bar = []
+        def on_progress(progress):
+            # Only jobs that are not already finished get a progress bar
+            if not bar:
+                bar.append(st.progress(0.0, text=f"Waiting for the simulation service ({kind})..."))
+            bar[0].progress(progress)
+        result = get_service_client().run(kind, sim_inputs, on_progress=on_progress, **options)
+        if bar:
+            bar[0].empty()
+        return result, "service"
+
+    if kind == "monthly":
+        return _cached(get_incremental_simulator().run, **sim_inputs)
+    if kind == "bands":
+        generator = options.get('generator')
+        if CACHE_DIR and generator is not None and not isinstance(generator, GBM):
+            options['generator'] = CachedGenerator(generator, os.path.join(CACHE_DIR, "paths"))
+        return _cached(simulate_mstr_bands, **options, **sim_inputs)
+    fn = {"sweep": sweep_grid, "breakeven": solve_breakeven, "sensitivity": sensitivity_report}[kind]
+    return _cached(fn, base_inputs=sim_inputs, **options)
+
+# -----------------------------
+# Chart Fragments
+# -----------------------------
+# Each tab is a fragment: its display controls rerun only that tab, and
+# switching tabs reruns only `charts`, never the simulation above it.
+@timed_fragment
+def price_tab(df):
+    """BTC vs MSTR price and premium."""
+    log_scale = st.toggle("Log Scale", key='price_log_scale')
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(render.line(df['Year'], df['BTC_Price'], "BTC Price"), secondary_y=False)
+    fig.add_trace(render.line(df['Year'], df['MSTR_Price'], "MSTR Price"), secondary_y=True)
+    fig.update_layout(title="BTC vs MSTR Price Action")
+    if log_scale:
+        fig.update_yaxes(type='log')
+    plot(fig)
+
+    fig_prem = go.Figure()
+    fig_prem.add_trace(render.line(df['Year'], df['Premium'], "Premium (Multiplier)"))
+    fig_prem.update_layout(title="MSTR Premium Over NAV")
+    plot(fig_prem)
+
+@timed_fragment
+def balance_sheet_tab(df):
+    """Holdings, dilution and debt."""
+    fig = go.Figure()
+    fig.add_trace(render.line(df['Year'], df['BTC_Holdings'], "BTC Holdings", fill='tozeroy'))
+    fig.add_trace(render.line(df['Year'], df['Shares'], "Shares Outstanding", yaxis="y2"))
+    fig.update_layout(
+        title="Holdings vs Dilution",
+        yaxis=dict(title="BTC Holdings"),
+        yaxis2=dict(title="Shares", overlaying="y", side="right")
+    )
+    plot(fig)
+
+    # Debt stack
+    fig_debt = go.Figure()
+    fig_debt.add_trace(render.line(df['Year'], df['Debt'], "Total Debt Principal"))
+    fig_debt.update_layout(title="Debt Burden (Decreases as debt converts!)")
+    plot(fig_debt)
+
+@timed_fragment
+def cash_flow_tab(df):
+    """Monthly inflows and outflows."""
+    fig = go.Figure()
+    fig.add_trace(render.bars(df['Year'], df['Inflows'], "Capital Inflows (Dilution)"))
+    fig.add_trace(render.bars(df['Year'], -df['Outflows'], "Cash Outflows (Ops + Interest)"))
+    fig.update_layout(title="Cash Flows", barmode='relative')
+    plot(fig)
+
+@timed_fragment
+def monte_carlo_tab(df, mc, sim_inputs):
+    """Percentile fan chart and collapse timing."""
+    # Percentile bands across all simulated paths (the inner pair is always 25th-75th)
+    outer = st.segmented_control("Outer Band", ["5th-95th", "None"], default="5th-95th", key='mc_outer_band')
+    keep = slice(None) if outer != "None" else slice(1, -1)
+    fig = render.fan_chart(df['Year'], mc.bands['mstr_price'][keep], mc.quantiles[keep], "Median MSTR Price")
+    model = st.session_state.get('path_model', "GBM")
+    detail = f"{sim_inputs['btc_volatility_annual']*100:.0f}% BTC vol" if model == "GBM" else model
+    if st.session_state.get('market_impact_box'):
+        detail += ", reflexive"
+    fig.update_layout(title=f"MSTR Price Distribution ({mc.n_paths:,} paths, {detail})")
+    plot(fig)
+
+    # When do the collapsing paths collapse?
+    quarters = np.arange(0, mc.n_months, 3)
+    fig_hist = go.Figure()
+    fig_hist.add_trace(go.Bar(x=quarters / 12.0 + 0.125, y=np.add.reduceat(mc.collapse_counts, quarters),
+                              width=0.25, name="Collapses"))
+    fig_hist.update_layout(title="Collapse Timing (Year)", xaxis=dict(range=[0, mc.n_months / 12]))
+    plot(fig_hist)
+
+@timed_fragment
+def survival_map_tab(sim_inputs):
+    """Parameter sweep heatmap."""
+    # Sweep axes: label -> (simulation input, min, max, display scale)
+    sweep_axes = {
+        "BTC Annual Growth (%)": ('btc_growth_annual', -0.5, 1.0, 100.0),
+        "Max Annual Issuance (%)": ('issuance_capacity_pct_annual', 0.0, 1.0, 100.0),
+        "Target Premium": ('base_premium', 0.5, 3.0, 1.0),
+        "Initial Cash ($M)": ('cash_start', 0.0, 5e9, 1e-6),
+    }
+    labels = list(sweep_axes)
+    sc1, sc2, sc3 = st.columns(3)
+    x_label = sc1.selectbox("X Axis", labels, index=0)
+    y_label = sc2.selectbox("Y Axis", [l for l in labels if l != x_label], index=0)
+    resolution = sc3.slider("Grid Points per Axis", 10, 50, 25, 5)
+
+    if st.button("🗺️ Run Sweep"):
+        x_name, x_lo, x_hi, _ = sweep_axes[x_label]
+        y_name, y_lo, y_hi, _ = sweep_axes[y_label]
+        with st.spinner(f"Simulating {resolution**2:,} scenarios..."):
+            st.session_state['sweep'] = (x_label, y_label, compute("sweep", sim_inputs, axes={
+                x_name: np.linspace(x_lo, x_hi, resolution),
+                y_name: np.linspace(y_lo, y_hi, resolution),
+            }))
+
+    if 'sweep' in st.session_state:
+        x_label, y_label, sweep = st.session_state['sweep']
+        x_name, _, _, x_scale = sweep_axes[x_label]
+        y_name, _, _, y_scale = sweep_axes[y_label]
+        fig = go.Figure(go.Heatmap(
+            x=sweep.axes[x_name] * x_scale,
+            y=sweep.axes[y_name] * y_scale,
+            z=sweep.collapse_surface(x_name, y_name) / 12.0,
+            colorscale='RdYlGn',
+            colorbar=dict(title="Years to Collapse"),
+        ))
+        fig.update_layout(
+            title=f"Collapse Boundary (green = survives {sweep.n_months // 12} years)",
+            xaxis=dict(title=x_label),
+            yaxis=dict(title=y_label),
+        )
+        plot(fig)
+        st.caption(f"{sweep.survived.mean()*100:.1f}% of {sweep.survived.size:,} grid points survive. Other inputs are taken from the sidebar.")
+
+@timed_fragment
+def breakeven_tab(sim_inputs):
+    """Breakeven thresholds by horizon."""
+    # Thresholds: label -> (simulation input, search range, display scale)
+    breakeven_inputs = {
+        "BTC Annual Growth (%)": ('btc_growth_annual', -0.9, 3.0, 100.0),
+        "Max Annual Issuance (% of Market Cap)": ('issuance_capacity_pct_annual', 0.0, 2.0, 100.0),
+        "Target Premium (NAV Multiplier)": ('base_premium', 0.5, 5.0, 1.0),
+        "Initial Cash ($M)": ('cash_start', 0.0, 50e9, 1e-6),
+        "Annual Ops Burn ($M)": ('operating_burn_annual', 0.0, 50e9, 1e-6),
+    }
+    be_label = st.selectbox("Solve For", list(breakeven_inputs))
+    be_name, be_lo, be_hi, be_scale = breakeven_inputs[be_label]
+
+    # One batched solve covers every horizon from 1 year to the simulation length
+    horizons = np.arange(1, sim_inputs['n_months'] // 12 + 1) * 12
+    breakeven = compute("breakeven", sim_inputs, parameter=be_name, lo=be_lo, hi=be_hi, horizon_months=horizons)
+    thresholds = breakeven.threshold * be_scale
+    bound = np.where(breakeven.survives_above, "Minimum", "Maximum")
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=horizons / 12, y=thresholds, mode='lines+markers', name=be_label))
+    fig.update_layout(
+        title=f"Breakeven {be_label} to Survive N Years (deterministic BTC path)",
+        xaxis=dict(title="Years Survived"),
+        yaxis=dict(title=be_label),
+    )
+    plot(fig)
+    st.dataframe(pd.DataFrame({
+        'Years': horizons // 12,
+        'Bound': np.where(np.isnan(thresholds), "No flip in range", bound),
+        be_label: thresholds,
+    }), hide_index=True)
+
+@timed_fragment
+def sensitivity_tab(sim_inputs, mc_inputs):
+    """Tornado chart of survival probability and final NAV/share per input."""
+    sc1, sc2 = st.columns(2)
+    rel_step = sc1.slider("Bump Size (%)", 1, 50, 10, 1, key='sens_step') / 100.0
+    maturity_step = sc2.slider("Maturity Bump (Months)", 1, 24, 6, 1, key='sens_maturity_step')
+
+    if st.button("🌪️ Run Sensitivity"):
+        with st.spinner(f"Simulating {mc_inputs['n_paths']:,} shared paths per bump..."):
+            st.session_state['sensitivity'] = compute("sensitivity", sim_inputs, rel_step=rel_step,
+                                                      maturity_step=maturity_step, **mc_inputs)
+
+    if 'sensitivity' in st.session_state:
+        report = st.session_state['sensitivity']
+        frame = report.frame()[::-1] # Largest swing on top
+        fig = go.Figure()
+        fig.add_trace(go.Bar(y=frame['Label'], x=(frame['Survival_Low'] - report.base_survival) * 100,
+                             orientation='h', name="Low bump"))
+        fig.add_trace(go.Bar(y=frame['Label'], x=(frame['Survival_High'] - report.base_survival) * 100,
+                             orientation='h', name="High bump"))
+        fig.update_layout(
+            title=f"Survival Probability Sensitivity (base {report.base_survival*100:.1f}%, {report.n_paths:,} common paths)",
+            xaxis=dict(title="Change in Survival Probability (pp)"),
+            barmode='overlay',
+            height=max(400, 28 * len(frame)),
+        )
+        plot(fig)
+        st.dataframe(report.frame()[['Label', 'Base', 'Low', 'High', 'Survival_Low', 'Survival_High',
+                                     'dSurvival', 'dSurvival_SE', 'NAV_Low', 'NAV_High', 'dNAV', 'dNAV_SE']],
+                     hide_index=True)
+        st.caption(f"Base final NAV/share ${report.base_nav_per_share:,.2f}. Slopes are central differences per unit "
+                   "of each input; every bump runs on the same BTC paths, so SE is the paired standard error.")
+
+@timed_fragment
+def archive_tab():
+    """Overlay of any set of archived runs (memory-mapped, nothing is recomputed)."""
+    if not ARCHIVE_DIR:
+        st.info("Run archiving is off. Start the app with MSTR_SIM_ARCHIVE_DIR=data/runs to keep and compare runs.")
+        return
+    archive = get_run_archive()
+    index = archive.index()
+    if index.empty:
+        st.info("No archived runs yet.")
+        return
+
+    choices = {f"{row.Label or row.Key[:8]} ({row.Created:%Y-%m-%d %H:%M}, {row.Key[:8]})": (row.Key, row.Kind)
+               for row in index.itertuples()}
+    # Default: the newest runs of the newest run's kind
+    newest = [c for c, (_, kind) in choices.items() if kind == index['Kind'].iloc[0]][:3]
+    chosen = st.multiselect("Runs", list(choices), default=newest, key='archive_runs')
+    if chosen:
+        runs = [archive.load(choices[c][0]) for c in chosen]
+        # Series every selected run has (monthly runs and Monte Carlo bands have different columns)
+        columns = [c for c in runs[0].table.column_names
+                   if c not in ('Month', 'Year') and all(c in r.table.column_names for r in runs)]
+        if not columns:
+            st.warning("The selected runs share no series; compare monthly runs or Monte Carlo studies separately.")
         else:
-            # Shortfall
-            shortfall = total_obligations - cash_available
-            # Must sell BTC
-            btc_needed = shortfall / btc_price[i]
-            if btc_needed > btc_holdings[i]:
-                # Collapse
-                btc_sold[i] = btc_holdings[i]
-                btc_holdings[i] = 0
-                collapse_month = i
-                collapse_reason = "Liquidity Crisis (Ran out of BTC)"
-            else:
-                btc_holdings[i] -= btc_needed
-                btc_sold[i] = btc_needed
-                cash_balance[i] = 0
-
-    # Create DataFrame
-    df = pd.DataFrame({
-        'Month': months,
-        'Year': years,
-        'BTC_Price': btc_price,
-        'MSTR_Price': mstr_stock_price,
-        'BTC_Holdings': btc_holdings,
-        'Debt': debt_principal,
-        'Shares': shares_outstanding,
-        'Premium': premium_mult,
-        'NAV_Per_Share': nav_per_share,
-        'Cash': cash_balance,
-        'Inflows': inflows,
-        'Outflows': outflows,
-        'BTC_Sold': btc_sold
-    })
-    
-    return df, collapse_month, collapse_reason
+            default = next((c for c in ('MSTR_Price', 'MSTR_Price_P50') if c in columns), columns[0])
+            sc1, sc2 = st.columns([3, 1])
+            series = sc1.selectbox("Series", columns, index=columns.index(default), key='archive_series')
+            log_scale = sc2.toggle("Log Scale", key='archive_log_scale')
+            fig = go.Figure()
+            for run in runs:
+                fig.add_trace(render.line(run.column('Year'), run.column(series), run.label or run.key[:8]))
+            fig.update_layout(title=f"{series} Across {len(runs)} Archived Runs", xaxis=dict(title="Year"))
+            if log_scale:
+                fig.update_yaxes(type='log')
+            plot(fig)
+
+    st.dataframe(index.assign(Key=index['Key'].str[:8]), hide_index=True)
+    st.caption(f"{len(index):,} runs archived in {ARCHIVE_DIR} (the newest {ARCHIVE_MAX_RUNS:,} are kept)")
+
+@timed_fragment
+def charts(df, mc, sim_inputs, mc_inputs):
+    """Stateful tabs; only the open tab's figures are built."""
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs(["Price & Premium", "Balance Sheet", "Cash Flow", "Monte Carlo",
+                                                              "Survival Map", "Breakeven", "Sensitivity", "Run Archive"],
+                                                             key='chart_tab', on_change="rerun")
+    with tab1:
+        if tab1.open:
+            price_tab(df)
+    with tab2:
+        if tab2.open:
+            balance_sheet_tab(df)
+    with tab3:
+        if tab3.open:
+            cash_flow_tab(df)
+    with tab4:
+        if tab4.open:
+            monte_carlo_tab(df, mc, sim_inputs)
+    with tab5:
+        if tab5.open:
+            survival_map_tab(sim_inputs)
+    with tab6:
+        if tab6.open:
+            breakeven_tab(sim_inputs)
+    with tab7:
+        if tab7.open:
+            sensitivity_tab(sim_inputs, mc_inputs)
+    with tab8:
+        if tab8.open:
+            archive_tab()
 
 # -----------------------------
 # Streamlit UI
 # -----------------------------
 st.set_page_config(page_title="MSTR Simulator 2.0", page_icon="🧨", layout="wide")
 
+# Stage timings of this rerun (logged at the end, and shown in the debug panel)
+if DEBUG:
+    setup_logging()
+timer = st.session_state['rerun_timer'] = StageTimer("app.rerun")
+profiler = Profiler() if DEBUG and st.session_state.get('debug_profile') else None
+if profiler:
+    profiler.start()
+
 st.title("🧨 MSTR Simulator 2.0: The Convertible Debt Edition")
 
 # Header Image
-try:
-    st.image("img/musical-chairs.jpeg", use_container_width=True)
-except:
-    pass
+header_image = load_image("img/musical-chairs.jpeg")
+if header_image:
+    st.image(header_image, width="stretch")
 
 st.markdown("""
 **A more accurate simulation of MicroStrategy's leverage mechanics.**
@@ -297,7 +503,7 @@ st.sidebar.header("Configuration")
 # Live Data Fetch
 # Live Data Fetch
 if st.sidebar.button("📡 Fetch Live Data"):
-    with st.spinner("Fetching from Yahoo Finance..."):
+    with st.spinner("Fetching from Yahoo Finance..."), stage("live_fetch"):
         live_btc, live_mstr, live_shares = fetch_live_data()
         if live_btc:
             st.session_state['btc_price'] = live_btc
@@ -324,10 +530,9 @@ st.sidebar.markdown("---")
 st.sidebar.subheader("Quick Scenarios")
 
 # Music Stops Image
-try:
-    st.sidebar.image("img/stop-music.jpg", use_container_width=True)
-except:
-    pass
+sidebar_image = load_image("img/stop-music.jpg")
+if sidebar_image:
+    st.sidebar.image(sidebar_image, width="stretch")
 
 if st.sidebar.button("💀 \"The Music Stops\" (Liquidity Freeze)"):
     st.session_state['issuance_cap'] = 0.0
@@ -337,59 +542,78 @@ if st.sidebar.button("💀 \"The Music Stops\" (Liquidity Freeze)"):
     st.session_state['dynamic_premium'] = True
     st.sidebar.warning("Scenario Loaded: Liquidity Freeze! (0% Issuance, Low Cash)")
 
-# Inputs
-with st.sidebar.expander("Market Assumptions", expanded=True):
-    btc_start = st.number_input("BTC Start Price ($)", value=st.session_state.get('btc_price', 98000.0))
-    btc_growth = st.slider("BTC Annual Growth (%)", -50, 100, int(st.session_state.get('btc_growth', 15.0)), key='btc_growth_slider') / 100.0
-    base_premium = st.slider("Target Premium (NAV Multiplier)", 0.5, 3.0, float(st.session_state.get('base_premium', 2.0)), 0.1, key='premium_slider')
-    dynamic_premium = st.checkbox("Dynamic Premium (Compresses in downturns)", value=st.session_state.get('dynamic_premium', True), key='dyn_prem_box')
-
-with st.sidebar.expander("MSTR Financials", expanded=False):
-    btc_holdings = st.number_input("BTC Holdings", value=386000.0) # Nov 2024 approx
-    cash_start = st.number_input("Initial Cash ($M)", value=st.session_state.get('cash_start', 50.0)) * 1_000_000
-    shares_start = st.number_input("Shares Outstanding", value=st.session_state.get('shares', 225_000_000))
-    ops_burn = st.number_input("Annual Ops Burn ($M)", value=100.0) * 1_000_000
-    issuance_cap = st.slider("Max Annual Issuance (% of Market Cap)", 0, 100, int(st.session_state.get('issuance_cap', 25.0)), key='issuance_slider') / 100.0
-
-with st.sidebar.expander("Debt Structure (Advanced)", expanded=False):
-    st.caption("Define Convertible Notes")
-    # Simplified representation of major tranches
-    # 2027, 2028, 2030, 2031, 2032 notes
-    # We'll just create a few representative ones
+# Inputs (a form, so edits are applied together instead of rerunning on every keystroke)
+inputs_started = time.perf_counter()
+with st.sidebar.form("sim_inputs", border=False):
+    with st.expander("Market Assumptions", expanded=True):
+        btc_start = st.number_input("BTC Start Price ($)", value=st.session_state.get('btc_price', 98000.0))
+        btc_growth = st.slider("BTC Annual Growth (%)", -50, 100, int(st.session_state.get('btc_growth', 15.0)), key='btc_growth_slider') / 100.0
+        base_premium = st.slider("Target Premium (NAV Multiplier)", 0.5, 3.0, float(st.session_state.get('base_premium', 2.0)), 0.1, key='premium_slider')
+        dynamic_premium = st.checkbox("Dynamic Premium (Compresses in downturns)", value=st.session_state.get('dynamic_premium', True), key='dyn_prem_box')
+        premium_drawdown = st.slider("Premium Hits NAV at BTC Drawdown (%)", 0, 90, 0, 5, key='premium_drawdown_slider',
+                                     help="0 = compress/recover month by month; otherwise the premium shrinks linearly with the drawdown from the BTC peak") / 100.0
+
+    with st.expander("MSTR Financials", expanded=False):
+        btc_holdings = st.number_input("BTC Holdings", value=386000.0) # Nov 2024 approx
+        cash_start = st.number_input("Initial Cash ($M)", value=st.session_state.get('cash_start', 50.0)) * 1_000_000
+        shares_start = st.number_input("Shares Outstanding", value=st.session_state.get('shares', 225_000_000))
+        ops_burn = st.number_input("Annual Ops Burn ($M)", value=100.0) * 1_000_000
+        issuance_cap = st.slider("Max Annual Issuance (% of Market Cap)", 0, 100, int(st.session_state.get('issuance_cap', 25.0)), key='issuance_slider') / 100.0
+
+    with st.expander("Debt Structure (Advanced)", expanded=False):
+        st.caption("Define Convertible Notes")
+        # Simplified representation of major tranches
+        # 2027, 2028, 2030, 2031, 2032 notes
+        # We'll just create a few representative ones
     
-    # Tranche 1: 2027/2028
-    d1_principal = st.number_input("Tranche 1 Principal ($B)", value=1.0) * 1e9
-    d1_year = st.number_input("Tranche 1 Maturity (Year)", value=3) # 2028
-    d1_conv = st.number_input("Tranche 1 Conv Price ($)", value=300.0) # Split adjusted approx
+        # Tranche 1: 2027/2028
+        d1_principal = st.number_input("Tranche 1 Principal ($B)", value=1.0) * 1e9
+        d1_year = st.number_input("Tranche 1 Maturity (Year)", value=3) # 2028
+        d1_conv = st.number_input("Tranche 1 Conv Price ($)", value=300.0) # Split adjusted approx
     
-    # Tranche 2: 2030/2031
-    d2_principal = st.number_input("Tranche 2 Principal ($B)", value=2.0) * 1e9
-    d2_year = st.number_input("Tranche 2 Maturity (Year)", value=5) # 2030
-    d2_conv = st.number_input("Tranche 2 Conv Price ($)", value=400.0)
+        # Tranche 2: 2030/2031
+        d2_principal = st.number_input("Tranche 2 Principal ($B)", value=2.0) * 1e9
+        d2_year = st.number_input("Tranche 2 Maturity (Year)", value=5) # 2030
+        d2_conv = st.number_input("Tranche 2 Conv Price ($)", value=400.0)
     
-    # Tranche 3: 2032
-    d3_principal = st.number_input("Tranche 3 Principal ($B)", value=1.0) * 1e9
-    d3_year = st.number_input("Tranche 3 Maturity (Year)", value=7) # 2032
-    d3_conv = st.number_input("Tranche 3 Conv Price ($)", value=500.0)
-
-    debts = [
-        ConvertibleDebt("Notes 2028", d1_principal, int(d1_year*12), 0.0, d1_conv),
-        ConvertibleDebt("Notes 2030", d2_principal, int(d2_year*12), 0.0, d2_conv),
-        ConvertibleDebt("Notes 2032", d3_principal, int(d3_year*12), 0.0, d3_conv),
-    ]
+        # Tranche 3: 2032
+        d3_principal = st.number_input("Tranche 3 Principal ($B)", value=1.0) * 1e9
+        d3_year = st.number_input("Tranche 3 Maturity (Year)", value=7) # 2032
+        d3_conv = st.number_input("Tranche 3 Conv Price ($)", value=500.0)
+
+        debts = [
+            ConvertibleDebt("Notes 2028", d1_principal, int(d1_year*12), 0.0, d1_conv),
+            ConvertibleDebt("Notes 2030", d2_principal, int(d2_year*12), 0.0, d2_conv),
+            ConvertibleDebt("Notes 2032", d3_principal, int(d3_year*12), 0.0, d3_conv),
+        ]
     
-    st.caption("Preferred Stock")
-    pref_principal = st.number_input("Preferred Stock Total ($B)", value=0.0) * 1e9 # MSTR has redeemed most? Or new ones? Let's keep 0 default for now unless user adds.
-    prefs = [PreferredStock("Series A", pref_principal, 0.0)]
+        st.caption("Preferred Stock")
+        pref_principal = st.number_input("Preferred Stock Total ($B)", value=0.0) * 1e9 # MSTR has redeemed most? Or new ones? Let's keep 0 default for now unless user adds.
+        prefs = [PreferredStock("Series A", pref_principal, 0.0)]
+
+    # Monte Carlo
+    with st.expander("Monte Carlo", expanded=False):
+        path_model = st.selectbox("BTC Path Model", ["GBM", "Historical Bootstrap", "Bull/Bear Regimes"], key='path_model')
+        btc_volatility = st.slider("BTC Annual Volatility (%)", 0, 150, 50, 5, key='btc_vol_slider',
+                                   help="GBM only; the bootstrap takes its volatility from history") / 100.0
+        n_paths = st.select_slider("Number of Paths", options=[100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000], value=1000)
+        mc_seed = int(st.number_input("Random Seed", value=42, step=1))
+        reflexive = st.checkbox("Market Impact (Reflexive)", value=False, key='market_impact_box',
+                                help="The company's BTC sales push BTC down (and purchases up), and a compressed premium throttles issuance")
+        impact_depth = st.number_input("Market Depth (BTC per -1 log point)", value=1_000_000.0, step=100_000.0,
+                                       min_value=1_000.0, key='impact_depth')
+        impact_recovery = st.slider("Impact Recovery (% per month)", 0, 50, 0, 1, key='impact_recovery') / 100.0
 
-# Simulation
-n_years = st.sidebar.slider("Simulation Years", 1, 10, 5)
+    # Simulation
+    n_years = st.slider("Simulation Years", 1, 10, 5)
 
-df, collapse_month, collapse_reason = simulate_mstr_monthly(
+    st.form_submit_button("▶️ Run Simulation", type="primary", width="stretch")
+
+sim_inputs = dict(
     n_months=n_years*12,
     btc_price_start=btc_start,
     btc_growth_annual=btc_growth,
-    btc_volatility_annual=0.5, # Not used in deterministic model yet
+    btc_volatility_annual=btc_volatility, # Only used by the Monte Carlo engine
     btc_holdings_start=btc_holdings,
     cash_start=cash_start,
     shares_start=shares_start,
@@ -398,59 +622,79 @@ df, collapse_month, collapse_reason = simulate_mstr_monthly(
     operating_burn_annual=ops_burn,
     issuance_capacity_pct_annual=issuance_cap,
     base_premium=base_premium,
-    dynamic_premium=dynamic_premium
+    dynamic_premium=dynamic_premium,
+    premium_drawdown=premium_drawdown or None,
 )
 
+# BTC path generator for the Monte Carlo (the deterministic run follows the growth trend)
+path_generator = GBM(btc_growth, btc_volatility)
+if path_model == "Historical Bootstrap":
+    bootstrap = BlockBootstrap.from_history(get_market_data().load_history(), btc_growth_annual=btc_growth)
+    if len(bootstrap.monthly_returns()) > (bootstrap.block_months - 1) * bootstrap.days_per_month:
+        path_generator = bootstrap
+    else:
+        st.sidebar.warning("Not enough local BTC history for the bootstrap yet; using GBM.")
+elif path_model == "Bull/Bear Regimes":
+    path_generator = RegimeSwitching()
+timer.add("inputs", time.perf_counter() - inputs_started, path_model=path_model)
+
+df, collapse_month, collapse_reason = compute("monthly", sim_inputs)
+# Streamed in chunks: only percentile bands and collapse counts are kept
+mc_inputs = dict(n_paths=n_paths, seed=mc_seed, generator=path_generator)
+if reflexive:
+    mc_inputs['market_impact'] = MarketImpact(impact_depth, impact_recovery)
+mc = compute("bands", sim_inputs, series=('mstr_price',), **mc_inputs)
+
 # --- Results ---
 
 # Metrics
+metrics_started = time.perf_counter()
 last_row = df.iloc[-1]
-col1, col2, col3, col4 = st.columns(4)
+col1, col2, col3, col4, col5 = st.columns(5)
 col1.metric("Final BTC Price", f"${last_row['BTC_Price']:,.0f}", delta=f"{(last_row['BTC_Price']/btc_start - 1)*100:.1f}%")
 col2.metric("Final MSTR Price", f"${last_row['MSTR_Price']:,.2f}")
 col3.metric("Final BTC Holdings", f"{last_row['BTC_Holdings']:,.0f}")
 col4.metric("Dilution (Shares)", f"{last_row['Shares']/shares_start:.2f}x")
+col5.metric(f"Collapse Probability ({mc.n_paths:,} paths)", f"{mc.collapse_probability()*100:.1f}%")
 
 if collapse_month:
     st.error(f"💥 COLLAPSE in Month {collapse_month} (Year {collapse_month/12:.1f}): {collapse_reason}")
 else:
     st.success("✅ SURVIVED! No default or liquidation triggered.")
 
+timer.add("metrics", time.perf_counter() - metrics_started)
+
 # Charts (Plotly)
-tab1, tab2, tab3 = st.tabs(["Price & Premium", "Balance Sheet", "Cash Flow"])
+charts(df, mc, sim_inputs, mc_inputs)
 
-with tab1:
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-    fig.add_trace(go.Scatter(x=df['Year'], y=df['BTC_Price'], name="BTC Price"), secondary_y=False)
-    fig.add_trace(go.Scatter(x=df['Year'], y=df['MSTR_Price'], name="MSTR Price"), secondary_y=True)
-    fig.update_layout(title="BTC vs MSTR Price Action")
-    st.plotly_chart(fig, use_container_width=True)
-    
-    fig_prem = go.Figure()
-    fig_prem.add_trace(go.Scatter(x=df['Year'], y=df['Premium'], name="Premium (Multiplier)"))
-    fig_prem.update_layout(title="MSTR Premium Over NAV")
-    st.plotly_chart(fig_prem, use_container_width=True)
+# Share preview (drawn only while open; reuses the result above)
+share = st.expander("📤 Share Preview", key='share_preview', on_change="rerun")
+if share.open:
+    with share, stage("share_preview"):
+        preview = get_preview_renderer().render(sim_inputs, (df, collapse_month, collapse_reason))
+        st.image(preview, caption="1200x630 link preview of this scenario")
+        st.download_button("Download Preview (.png)", preview, "mstr-goes-boom.png", mime="image/png")
+        if SERVICE_URL:
+            st.caption("Image URL for link unfurls (served and cached by the simulation service):")
+            st.code(preview_url(sim_inputs), language=None)
 
-with tab2:
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df['Year'], y=df['BTC_Holdings'], name="BTC Holdings", fill='tozeroy'))
-    fig.add_trace(go.Scatter(x=df['Year'], y=df['Shares'], name="Shares Outstanding", yaxis="y2"))
-    fig.update_layout(
-        title="Holdings vs Dilution",
-        yaxis=dict(title="BTC Holdings"),
-        yaxis2=dict(title="Shares", overlaying="y", side="right")
-    )
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Debt stack
-    fig_debt = go.Figure()
-    fig_debt.add_trace(go.Scatter(x=df['Year'], y=df['Debt'], name="Total Debt Principal"))
-    fig_debt.update_layout(title="Debt Burden (Decreases as debt converts!)")
-    st.plotly_chart(fig_debt, use_container_width=True)
+if profiler:
+    profiler.stop()
+timer.log()
+st.session_state['rerun_timer'] = None
 
-with tab3:
-    fig = go.Figure()
-    fig.add_trace(go.Bar(x=df['Year'], y=df['Inflows'], name="Capital Inflows (Dilution)"))
-    fig.add_trace(go.Bar(x=df['Year'], y=-df['Outflows'], name="Cash Outflows (Ops + Interest)"))
-    fig.update_layout(title="Cash Flows", barmode='relative')
-    st.plotly_chart(fig, use_container_width=True)
+# --- Debug ---
+if DEBUG:
+    with st.expander("🐞 Debug: Rerun Timings"):
+        dc1, dc2 = st.columns(2)
+        dc1.toggle("Time engine phases (reruns the simulations uncached)", key='debug_phases')
+        dc2.toggle("Profile reruns (cProfile)", key='debug_profile')
+        st.dataframe(timer.frame(), hide_index=True, column_config={
+            'Ms': st.column_config.NumberColumn(format="%.1f"),
+            'Share': st.column_config.ProgressColumn("Share (%)", min_value=0, max_value=100, format="%.0f"),
+        })
+        st.caption(f"Last full rerun: {timer.elapsed * 1000:,.0f} ms. Reruns of a single tab or control are "
+                   "only logged (`mstr_sim.profiling`).")
+        if profiler:
+            st.code(profiler.report(), language=None)
+            st.download_button("Download Profile (.prof)", profiler.dump(), "rerun.prof")
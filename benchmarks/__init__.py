@@ -0,0 +1,6 @@
+"""
+Benchmarks for the simulation engine and the app rerun path.
+
+    python -m benchmarks -o bench.json
+    python -m benchmarks --quick --compare bench.json
+"""
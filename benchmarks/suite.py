@@ -0,0 +1,313 @@
+"""
+Reproducible timing suite.
+
+Each case is timed with an auto-calibrated loop count (roughly
+``--min-time`` seconds per repeat) and reports the best and median time
+per call plus throughput in simulated months x paths per second. Results
+are written as JSON together with the git revision and library versions,
+and ``--compare`` prints the ratio against an earlier results file.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# -----------------------------
+# Timing
+# -----------------------------
+@dataclass
+class CaseResult:
+    name: str
+    params: Dict[str, float]
+    best_s: float
+    median_s: float
+    loops: int
+    repeats: int
+    months_x_paths: Optional[int] = None
+    throughput: Optional[float] = None  # months x paths per second (best)
+
+
+def time_call(fn: Callable[[], object], min_time: float, repeats: int):
+    """Best and median seconds per call, calibrating the loop count first."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+    samples = [elapsed / loops]
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - start) / loops)
+    return min(samples), statistics.median(samples), loops
+
+# -----------------------------
+# Inputs
+# -----------------------------
+def make_inputs(n_years: int, n_tranches: int = 3) -> dict:
+    """App-default inputs with a synthetic book of ``n_tranches`` notes plus STRK/STRF/STRD-like preferreds."""
+    from mstr_sim import ConvertibleDebt, PreferredStock
+    from mstr_sim.scenario import DEFAULT_INPUTS
+
+    n_months = n_years * 12
+    debts = [
+        ConvertibleDebt(f"Note {j}", 4e9 / n_tranches, 12 + (j * 7) % max(n_months, 1),
+                        0.00625 * (j % 4), 300.0 + 10.0 * (j % 50))
+        for j in range(n_tranches)
+    ]
+    prefs = [
+        PreferredStock("STRK", 1.4e9, 0.08),
+        PreferredStock("STRF", 1.2e9, 0.10),
+        PreferredStock("STRD", 1.0e9, 0.10),
+    ]
+    return dict(DEFAULT_INPUTS, n_months=n_months, convertible_debts=debts, preferred_stocks=prefs)
+
+# -----------------------------
+# Cases
+# -----------------------------
+def engine_cases(quick: bool):
+    from mstr_sim import simulate_mstr_events, simulate_mstr_monthly, simulate_mstr_paths
+
+    horizons = [1, 5, 10, 30, 50] if not quick else [1, 10, 50]
+    tranches = [3, 30, 100, 500] if not quick else [3, 500]
+    paths = [100, 1000, 10000] if not quick else [100, 1000]
+
+    for years in horizons:
+        inputs = make_inputs(years)
+        yield ("scalar_full", {"years": years, "tranches": 3, "paths": 1},
+               lambda inputs=inputs: simulate_mstr_monthly(**inputs), inputs["n_months"])
+        yield ("scalar_summary", {"years": years, "tranches": 3, "paths": 1},
+               lambda inputs=inputs: simulate_mstr_monthly(**inputs, full_history=False), inputs["n_months"])
+
+    for years in ([10, 30] if not quick else [30]):
+        inputs = make_inputs(years)
+        yield ("event_daily", {"years": years, "tranches": 3, "paths": 1},
+               lambda inputs=inputs: simulate_mstr_events(**inputs), inputs["n_months"])
+
+    for n in tranches:
+        inputs = make_inputs(10, n)
+        yield ("scalar_full", {"years": 10, "tranches": n, "paths": 1},
+               lambda inputs=inputs: simulate_mstr_monthly(**inputs), inputs["n_months"])
+
+    for years in (10, 50):
+        for n in paths:
+            inputs = make_inputs(years)
+            yield ("batched_paths", {"years": years, "tranches": 3, "paths": n},
+                   lambda inputs=inputs, n=n: simulate_mstr_paths(n_paths=n, seed=0, **inputs),
+                   inputs["n_months"] * n)
+
+    from mstr_sim import MarketImpact
+
+    for n in paths:
+        inputs = make_inputs(10)
+        yield ("paths_reflexive", {"years": 10, "tranches": 3, "paths": n},
+               lambda inputs=inputs, n=n: simulate_mstr_paths(
+                   n_paths=n, seed=0, market_impact=MarketImpact(), **dict(inputs, premium_drawdown=0.5)),
+               inputs["n_months"] * n)
+
+    from mstr_sim import BlockBootstrap, RegimeSwitching
+
+    closes = 98000.0 * np.exp(np.cumsum(np.random.default_rng(0).normal(0.001, 0.03, 10 * 365)))
+    for generator in (BlockBootstrap(closes), RegimeSwitching()):
+        for n in paths:
+            inputs = make_inputs(10)
+            yield (f"paths_{type(generator).__name__.lower()}", {"years": 10, "tranches": 3, "paths": n},
+                   lambda inputs=inputs, n=n, generator=generator: simulate_mstr_paths(
+                       n_paths=n, seed=0, generator=generator, **dict(inputs, premium_drawdown=0.5)),
+                   inputs["n_months"] * n)
+
+    from mstr_sim import sensitivity_report
+
+    for n in paths:
+        inputs = make_inputs(10)
+        yield ("sensitivity", {"years": 10, "tranches": 3, "paths": n},
+               lambda inputs=inputs, n=n: sensitivity_report(inputs, n_paths=n, seed=0),
+               inputs["n_months"] * n)
+
+    from mstr_sim import Company, simulate_portfolio
+
+    inputs = make_inputs(10)
+    companies = [Company.from_inputs(f"Company {k}", dict(inputs, btc_holdings_start=inputs["btc_holdings_start"] / (k + 1)))
+                 for k in range(12)]
+    for n in paths:
+        yield ("portfolio", {"years": 10, "tranches": 3, "paths": n, "companies": len(companies)},
+               lambda inputs=inputs, n=n: simulate_portfolio(
+                   companies, n, inputs["n_months"], inputs["btc_price_start"], inputs["btc_growth_annual"],
+                   inputs["btc_volatility_annual"], seed=0),
+               inputs["n_months"] * n * len(companies))
+
+    from mstr_sim import simulate_mstr_bands
+
+    for n in ([10000, 100000] if not quick else [10000]):
+        inputs = make_inputs(10)
+        yield ("streamed_bands", {"years": 10, "tranches": 3, "paths": n},
+               lambda inputs=inputs, n=n: simulate_mstr_bands(n_paths=n, seed=0, **inputs),
+               inputs["n_months"] * n)
+
+
+def frame_cases(quick: bool):
+    import pandas as pd
+    from mstr_sim import simulate_mstr_monthly
+
+    for years in ([10, 50] if not quick else [50]):
+        df, _, _ = simulate_mstr_monthly(**make_inputs(years))
+        columns = {name: df[name].to_numpy() for name in df.columns}
+        yield ("dataframe_build", {"years": years, "columns": len(columns)},
+               lambda columns=columns: pd.DataFrame(columns), None)
+
+
+def figure_cases(quick: bool):
+    try:
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+    except ImportError:
+        return
+    from mstr_sim import render, simulate_mstr_events, simulate_mstr_monthly
+
+    def build(df):
+        # Same figures the app builds for its deterministic tabs
+        figs = []
+        fig = make_subplots(specs=[[{"secondary_y": True}]])
+        fig.add_trace(render.line(df['Year'], df['BTC_Price'], "BTC Price"), secondary_y=False)
+        fig.add_trace(render.line(df['Year'], df['MSTR_Price'], "MSTR Price"), secondary_y=True)
+        figs.append(fig)
+        figs.append(go.Figure(render.line(df['Year'], df['Premium'], "Premium")))
+        fig = go.Figure()
+        fig.add_trace(render.line(df['Year'], df['BTC_Holdings'], "BTC Holdings", fill='tozeroy'))
+        fig.add_trace(render.line(df['Year'], df['Shares'], "Shares", yaxis="y2"))
+        figs.append(fig)
+        figs.append(go.Figure(render.line(df['Year'], df['Debt'], "Debt")))
+        fig = go.Figure()
+        fig.add_trace(render.bars(df['Year'], df['Inflows'], "Inflows"))
+        fig.add_trace(render.bars(df['Year'], -df['Outflows'], "Outflows"))
+        figs.append(fig)
+        return figs
+
+    for years in ([10, 50] if not quick else [50]):
+        df, _, _ = simulate_mstr_monthly(**make_inputs(years))
+        yield ("figure_build", {"years": years, "figures": 5}, lambda df=df: build(df), None)
+        yield ("figure_serialize", {"years": years, "figures": 5},
+               lambda figs=build(df): [f.to_json() for f in figs], None)
+
+    # Daily resolution: payload should not grow with the number of points
+    df, _, _ = simulate_mstr_events(**make_inputs(50))
+    yield ("figure_serialize", {"years": 50, "figures": 5, "daily": 1},
+           lambda figs=build(df): [f.to_json() for f in figs], None)
+
+    bands = np.sort(np.random.default_rng(0).lognormal(0, 1, (5, 50 * 365)), axis=0)
+    years = np.arange(bands.shape[1]) / 365
+    yield ("fan_chart", {"years": 50, "daily": 1},
+           lambda: render.fan_chart(years, bands, (5, 25, 50, 75, 95), "Median").to_json(), None)
+
+
+def app_cases(quick: bool):
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return
+
+    # Warm rerun: the shared result/quote caches are populated by the warm-up call
+    def rerun():
+        at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=300).run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+
+    yield ("app_rerun", {}, rerun, None)
+
+# -----------------------------
+# Runner
+# -----------------------------
+def _metadata() -> dict:
+    def version(module):
+        try:
+            return __import__(module).__version__
+        except Exception:
+            return None
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        revision = None
+    return {
+        "revision": revision,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": version("pandas"),
+        "plotly": version("plotly"),
+    }
+
+
+def _key(name: str, params: dict) -> str:
+    return name + "[" + ",".join(f"{k}={v}" for k, v in sorted(params.items())) + "]"
+
+
+def run(quick: bool, min_time: float, repeats: int, include_app: bool, pattern: Optional[str]) -> List[CaseResult]:
+    groups = [engine_cases, frame_cases, figure_cases] + ([app_cases] if include_app else [])
+    results = []
+    for group in groups:
+        for name, params, fn, work in group(quick):
+            if pattern and pattern not in _key(name, params):
+                continue
+            fn()  # warm-up (imports, caches)
+            best, median, loops = time_call(fn, min_time, repeats)
+            result = CaseResult(name, params, best, median, loops, repeats)
+            if work:
+                result.months_x_paths = work
+                result.throughput = work / best
+            results.append(result)
+            rate = f"{result.throughput:>14,.0f} months*paths/s" if result.throughput else ""
+            print(f"{_key(name, params):<55} {best*1e3:>10.3f} ms {rate}", file=sys.stderr)
+    return results
+
+
+def compare(results: List[CaseResult], baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {_key(c["name"], c["params"]): c["best_s"] for c in baseline["cases"]}
+    print(f"\nvs {baseline_path} (revision {baseline['meta'].get('revision')}): ratio > 1 means slower now", file=sys.stderr)
+    for r in results:
+        key = _key(r.name, r.params)
+        if key in previous:
+            print(f"{key:<55} {r.best_s / previous[key]:>7.2f}x", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-o", "--output", help="Write results as JSON")
+    parser.add_argument("--compare", metavar="JSON", help="Compare against an earlier results file")
+    parser.add_argument("--quick", action="store_true", help="Smaller grid for a fast check")
+    parser.add_argument("--app", action="store_true", help="Also time a full app.py rerun (needs streamlit)")
+    parser.add_argument("-k", dest="pattern", help="Only run cases whose key contains this text")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timing repeat")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    results = run(args.quick, args.min_time, args.repeats, args.app, args.pattern)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"meta": _metadata(), "cases": [asdict(r) for r in results]}, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+    return 0
@@ -0,0 +1,54 @@
+"""
+Headless simulation engine for the MSTR Goes Boom app.
+
+Names are loaded lazily on first access, so ``import mstr_sim`` is cheap
+and pandas is only imported when a DataFrame is actually built. Run
+``python -m mstr_sim --help`` for the command-line runner.
+"""
+
+import importlib
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "ConvertibleDebt": "instruments",
+    "PreferredStock": "instruments",
+    "TrancheBook": "book",
+    "SimulationSummary": "engine",
+    "simulate_mstr_monthly": "engine",
+    "simulate_mstr_events": "events",
+    "IncrementalSimulator": "incremental",
+    "PathResults": "montecarlo",
+    "MarketImpact": "montecarlo",
+    "generate_btc_paths": "montecarlo",
+    "simulate_mstr_paths": "montecarlo",
+    "GBM": "paths",
+    "BlockBootstrap": "paths",
+    "RegimeSwitching": "paths",
+    "BandResults": "streaming",
+    "simulate_mstr_bands": "streaming",
+    "SensitivityResult": "sensitivity",
+    "sensitivity_report": "sensitivity",
+    "Company": "portfolio",
+    "PortfolioResults": "portfolio",
+    "simulate_portfolio": "portfolio",
+    "load_portfolio": "portfolio",
+    "ServiceClient": "client",
+    "RunArchive": "archive",
+    "PreviewRenderer": "preview",
+    "load_scenario": "scenario",
+    "scenario_inputs": "scenario",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,283 @@
+"""
+Append-only archive of simulation runs.
+
+Every run is one immutable Arrow IPC file named by the hash of its inputs
+(``<key>.arrow``): the per-month series as columns, and the inputs
+(``mstr_sim.wire`` JSON), collapse info and label in the schema metadata.
+Archiving the same inputs again is a no-op, files are never rewritten
+(only the oldest are removed once ``max_runs`` is exceeded), and they are
+written uncompressed so ``load`` memory-maps them and the columns are
+read without copying. ``export`` writes any set of runs to
+one Parquet file for sharing.
+
+Two kinds are archived: ``monthly`` (the ``simulate_mstr_monthly``
+table) and ``bands`` (a ``BandResults`` table: percentiles, means and
+collapse counts per month; the raw sample paths are not kept).
+"""
+
+import dataclasses
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from . import wire
+from .cache import input_key
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+KINDS = ("monthly", "bands")
+
+
+def _reference(value):
+    """
+    An option as stored in a run's metadata. Dataclasses holding arrays
+    (e.g. a bootstrap's full price history) are kept as their type and
+    hash only; the run's key already covers their contents.
+    """
+    if dataclasses.is_dataclass(value) and not isinstance(value, type) and any(
+            isinstance(getattr(value, f.name), np.ndarray) for f in dataclasses.fields(value)):
+        return {"type": type(value).__name__, "key": input_key("archive.option", value=value)}
+    return value
+
+# -----------------------------
+# Archived Runs
+# -----------------------------
+@dataclass
+class ArchivedRun:
+    """One run: metadata plus the memory-mapped per-month table."""
+    key: str
+    kind: str
+    label: str
+    created: float
+    inputs: Dict[str, Any]
+    collapse_month: Optional[int]
+    collapse_reason: Optional[str]
+    extra: Dict[str, Any]
+    table: "pa.Table"
+
+    def column(self, name: str) -> np.ndarray:
+        """One series as a (read-only, zero-copy) numpy array."""
+        return self.table.column(name).to_numpy()
+
+    def frame(self) -> "pd.DataFrame":
+        import pandas as pd
+
+        return pd.DataFrame({name: self.column(name) for name in self.table.column_names})
+
+    def result(self):
+        """The archived value in the shape the engine returned it."""
+        if self.kind == "monthly":
+            return self.frame(), self.collapse_month, self.collapse_reason
+        from .montecarlo import PathResults
+        from .streaming import _COLUMNS, BandResults
+
+        quantiles = tuple(self.extra["quantiles"])
+        series = self.extra["series"]
+        bands = {s: np.vstack([self.column(f"{_COLUMNS.get(s, s)}_P{q:g}") for q in quantiles]) for s in series}
+        means = {s: self.column(f"{_COLUMNS.get(s, s)}_Mean") for s in series}
+        n_months = self.table.num_rows
+        empty = {name: np.zeros((0, n_months)) for name in PathResults.__dataclass_fields__}
+        empty.update(collapse_month=np.zeros(0, dtype=np.int64), collapse_code=np.zeros(0, dtype=np.int8))
+        return BandResults(
+            n_paths=self.extra["n_paths"],
+            n_months=n_months,
+            quantiles=quantiles,
+            bands=bands,
+            means=means,
+            collapse_counts=self.column("Collapses"),
+            collapse_reasons=self.extra["collapse_reasons"],
+            sample=PathResults(**empty),
+        )
+
+# -----------------------------
+# Archive
+# -----------------------------
+class RunArchive:
+    """
+    Directory of archived runs.
+
+    ``save`` returns the run's key (the same for the same kind, inputs and
+    options); ``index`` lists runs from their file footers only. With
+    ``max_runs`` set, saving removes the oldest runs beyond that many.
+    """
+
+    def __init__(self, directory: str, max_runs: Optional[int] = None):
+        self.directory = directory
+        self.max_runs = max_runs
+        self._index: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(kind: str, inputs: dict, **options) -> str:
+        return input_key(f"archive.{kind}", inputs=inputs, options=options)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".arrow")
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def save(self, kind: str, inputs: dict, result, label: str = "", **options) -> str:
+        """Archive ``result`` of ``kind`` for ``inputs`` (and any options such as ``n_paths``)."""
+        import pyarrow as pa
+
+        if kind not in KINDS:
+            raise ValueError(f"Unknown kind {kind!r}; choose from {KINDS}")
+        key = self.key(kind, inputs, **options)
+        if key in self:
+            return key
+
+        extra: Dict[str, Any] = {name: _reference(value) for name, value in options.items()}
+        if kind == "monthly":
+            frame, collapse_month, collapse_reason = result
+        else:
+            frame, collapse_month, collapse_reason = result.frame(), None, None
+            extra.update(n_paths=result.n_paths, quantiles=list(result.quantiles), series=list(result.bands),
+                         collapse_reasons=result.collapse_reasons)
+        meta = {
+            "kind": kind,
+            "label": label,
+            "created": repr(time.time()),
+            "inputs": wire.dumps(inputs).decode(),
+            "collapse_month": json.dumps(None if collapse_month is None else int(collapse_month)),
+            "collapse_reason": json.dumps(collapse_reason),
+            "extra": wire.dumps(extra).decode(),
+        }
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        table = table.replace_schema_metadata(meta)
+
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".arrow.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f, pa.ipc.new_file(f, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        if self.max_runs is not None:
+            self._prune(self.max_runs)
+        return key
+
+    def _prune(self, max_runs: int):
+        """Remove the oldest runs (by file time) beyond ``max_runs``."""
+        keys = self.keys()
+        if len(keys) <= max_runs:
+            return
+        times = {}
+        for key in keys:
+            try:
+                times[key] = os.stat(self._path(key)).st_mtime
+            except FileNotFoundError:
+                pass # Removed concurrently
+        for key in sorted(times, key=times.get)[:max(len(times) - max_runs, 0)]:
+            try:
+                os.unlink(self._path(key))
+            except FileNotFoundError:
+                pass
+            with self._lock:
+                self._index.pop(key, None)
+
+    def _read(self, key: str):
+        import pyarrow as pa
+
+        return pa.ipc.open_file(pa.memory_map(self._path(key), "r"))
+
+    @staticmethod
+    def _meta(schema: "pa.Schema") -> Dict[str, str]:
+        return {k.decode(): v.decode() for k, v in (schema.metadata or {}).items()}
+
+    def load(self, key: str) -> ArchivedRun:
+        """Memory-map one run (raises ``KeyError`` if it is not archived)."""
+        if key not in self:
+            raise KeyError(key)
+        reader = self._read(key)
+        meta = self._meta(reader.schema)
+        return ArchivedRun(
+            key=key,
+            kind=meta["kind"],
+            label=meta["label"],
+            created=float(meta["created"]),
+            inputs=wire.loads(meta["inputs"].encode()),
+            collapse_month=json.loads(meta["collapse_month"]),
+            collapse_reason=json.loads(meta["collapse_reason"]),
+            extra=wire.loads(meta["extra"].encode()),
+            table=reader.read_all(),
+        )
+
+    def get(self, kind: str, inputs: dict, **options):
+        """The archived result for these inputs, or None."""
+        key = self.key(kind, inputs, **options)
+        return self.load(key).result() if key in self else None
+
+    def resolve(self, prefix: str) -> str:
+        """Full key from a unique prefix (as shown abbreviated in listings)."""
+        matches = [key for key in self.keys() if key.startswith(prefix)]
+        if len(matches) != 1:
+            raise KeyError(f"{prefix!r} matches {len(matches)} archived runs")
+        return matches[0]
+
+    def keys(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-len(".arrow")] for name in os.listdir(self.directory) if name.endswith(".arrow"))
+
+    def index(self) -> "pd.DataFrame":
+        """One row per run, newest first (only schemas are read, and each file once)."""
+        import pandas as pd
+
+        rows = []
+        for key in self.keys():
+            with self._lock:
+                row = self._index.get(key)
+            if row is None:
+                meta = self._meta(self._read(key).schema)
+                extra = wire.loads(meta["extra"].encode())
+                row = {
+                    "Key": key,
+                    "Kind": meta["kind"],
+                    "Label": meta["label"],
+                    "Created": pd.Timestamp(float(meta["created"]), unit="s"),
+                    "Months": wire.loads(meta["inputs"].encode())["n_months"],
+                    "Paths": extra.get("n_paths", 1),
+                    "Collapse_Month": json.loads(meta["collapse_month"]),
+                }
+                with self._lock:
+                    self._index[key] = row
+            rows.append(row)
+        columns = ["Key", "Kind", "Label", "Created", "Months", "Paths", "Collapse_Month"]
+        frame = pd.DataFrame(rows, columns=columns)
+        return frame.sort_values("Created", ascending=False, ignore_index=True)
+
+    def compare(self, keys: Sequence[str], column: str = "MSTR_Price") -> "pd.DataFrame":
+        """``column`` of every run side by side, indexed by month (runs may differ in length)."""
+        import pandas as pd
+
+        series = {}
+        for key in keys:
+            run = self.load(key)
+            name = run.label or key[:8]
+            series[name if name not in series else f"{name} ({key[:8]})"] = pd.Series(run.column(column))
+        frame = pd.DataFrame(series)
+        frame.index.name = "Month"
+        return frame
+
+    def export(self, keys: Sequence[str], path: str):
+        """Write runs to one Parquet file in long format (a ``Key`` column per row)."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        tables = []
+        for key in keys:
+            table = self.load(key).table.replace_schema_metadata(None)
+            tables.append(table.append_column("Key", pa.array([key] * table.num_rows)))
+        pq.write_table(pa.concat_tables(tables, promote_options="default"), path)
@@ -0,0 +1,92 @@
+"""
+Array-backed capital-structure book.
+
+Holds convertible notes and preferreds as struct-of-arrays with running
+totals and a month -> maturing-tranches index, so the per-month cost of
+the simulation does not grow with the number of instruments.
+"""
+
+import numpy as np
+from typing import Dict, List
+
+from .instruments import ConvertibleDebt, PreferredStock
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+
+class TrancheBook:
+    """
+    Struct-of-arrays view of ``ConvertibleDebt`` and ``PreferredStock`` lists.
+
+    ``debt_total``, ``annual_interest``, ``pref_total`` and
+    ``annual_dividends`` are kept up to date as tranches are retired, and
+    ``maturing(month)`` is a dictionary lookup rather than a scan.
+
+    Totals are summed in list order over the outstanding tranches (only
+    when the book changes), exactly as the original per-month list scan
+    did, so results match it bit for bit.
+    """
+
+    def __init__(self, convertible_debts: List[ConvertibleDebt], preferred_stocks: List[PreferredStock]):
+        self.names = [d.name for d in convertible_debts]
+        self.principal = np.array([d.principal for d in convertible_debts], dtype=float)
+        self.coupon_rate = np.array([d.coupon_rate for d in convertible_debts], dtype=float)
+        self.conversion_price = np.array([d.conversion_price for d in convertible_debts], dtype=float)
+        self.maturity_month = np.array([d.maturity_month for d in convertible_debts], dtype=np.int64)
+        self.put_month = np.array([-1 if d.put_month is None else d.put_month
+                                   for d in convertible_debts], dtype=np.int64)
+        self.outstanding = np.ones(len(convertible_debts), dtype=bool)
+
+        self.pref_names = [p.name for p in preferred_stocks]
+        self.pref_principal = np.array([p.principal for p in preferred_stocks], dtype=float)
+        self.pref_dividend_rate = np.array([p.dividend_rate for p in preferred_stocks], dtype=float)
+
+        # Running totals
+        self._sum_debt()
+        self.pref_total = float(sum(self.pref_principal.tolist()))
+        self.annual_dividends = float(sum((self.pref_principal * self.pref_dividend_rate).tolist()))
+
+        # Maturity index: month -> tranche indices, built once with a sort
+        self._maturities: Dict[int, np.ndarray] = {}
+        if len(self.maturity_month):
+            order = np.argsort(self.maturity_month, kind='stable')
+            months, starts = np.unique(self.maturity_month[order], return_index=True)
+            for month, idx in zip(months, np.split(order, starts[1:])):
+                self._maturities[int(month)] = idx
+
+    def _sum_debt(self):
+        # Sequential sums in list order (not numpy's pairwise sum, and not
+        # subtracting retired tranches), matching a scan of the remaining list
+        outstanding = self.outstanding
+        self.debt_total = float(sum(self.principal[outstanding].tolist()))
+        self.annual_interest = float(sum((self.principal[outstanding] * self.coupon_rate[outstanding]).tolist()))
+
+    def __len__(self) -> int:
+        return len(self.principal)
+
+    @property
+    def n_outstanding(self) -> int:
+        return int(self.outstanding.sum())
+
+    def maturing(self, month: int) -> np.ndarray:
+        """Indices of outstanding tranches that mature in ``month``."""
+        idx = self._maturities.get(month, _EMPTY)
+        if idx.size:
+            idx = idx[self.outstanding[idx]]
+        return idx
+
+    def retire(self, idx: np.ndarray):
+        """Remove tranches from the book (repaid or converted)."""
+        if not idx.size:
+            return
+        self.outstanding[idx] = False
+        self._sum_debt()
+
+    def snapshot(self):
+        """Outstanding mask and running totals, for ``restore``."""
+        return self.outstanding.copy(), self.debt_total, self.annual_interest
+
+    def restore(self, snapshot):
+        """Reset to a ``snapshot()`` taken from a book with the same tranches."""
+        outstanding, self.debt_total, self.annual_interest = snapshot
+        self.outstanding = outstanding.copy()
@@ -0,0 +1,288 @@
+"""
+Result caching for simulations and live-data fetches.
+
+``input_key`` hashes simulation inputs (including the ``ConvertibleDebt`` /
+``PreferredStock`` lists) into a canonical key. ``ResultCache`` is a
+bounded, thread-safe LRU with an optional on-disk tier that can be shared
+by every session and server worker pointing at the same directory.
+``TTLCache`` serves fresh values for a fixed time and falls back to the
+last known good value when a refresh fails.
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+# -----------------------------
+# Canonical Keys
+# -----------------------------
+def _canonical(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {"__type__": type(value).__name__,
+                **{f.name: _canonical(getattr(value, f.name)) for f in dataclasses.fields(value)}}
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return {"__ndarray__": str(value.dtype), "shape": list(value.shape),
+                "sha256": hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()}
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        # repr round-trips exactly; 1 and 1.0 hash the same
+        return repr(float(value))
+    if value is None or isinstance(value, str):
+        return value
+    raise TypeError(f"Cannot build a cache key from {type(value).__name__}")
+
+
+def input_key(namespace: str, **inputs) -> str:
+    """Stable hex digest of ``inputs``, independent of keyword order."""
+    payload = json.dumps({"ns": namespace, "inputs": _canonical(inputs)},
+                         sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+# -----------------------------
+# Disk Tier
+# -----------------------------
+def _write_atomic(path: str, value: Any):
+    """Pickle to a temp file and rename, so concurrent readers never see partial files."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _read(path: str) -> Any:
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _load(path: str) -> Any:
+    """Contents of ``path``, or ``_MISSING`` if it is absent or unreadable.
+
+    Truncated or foreign pickles, or ones naming classes this release no
+    longer has, can raise almost anything; such files are removed so the
+    caller recomputes.
+    """
+    try:
+        return _read(path)
+    except FileNotFoundError:
+        return _MISSING
+    except Exception:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        return _MISSING
+
+
+_MISSING = object()
+
+# -----------------------------
+# LRU Result Cache
+# -----------------------------
+class ResultCache:
+    """
+    Bounded LRU cache keyed by ``input_key``.
+
+    With ``directory`` set, misses fall through to pickled results on disk
+    and new results are written there too; the disk tier keeps about
+    ``max_disk_entries`` files. Writes are counted in memory and the
+    directory is only scanned once the count passes the cap; the least
+    recently used tenth is then evicted in one batch.
+    Concurrent ``get_or_compute`` misses on the same key compute once: later
+    callers wait for the first one's result (counted in ``coalesced``).
+    """
+
+    def __init__(self, max_entries: int = 128, directory: Optional[str] = None,
+                 max_disk_entries: int = 4096):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_entries = max_disk_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._disk_entries: Optional[int] = None  # counted on the first write
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".pkl")
+
+    def _remember(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        if self.directory:
+            path = self._path(key)
+            value = _load(path)
+            if value is not _MISSING:
+                try:
+                    os.utime(path)  # mark as recently used for disk eviction
+                except OSError:
+                    pass
+                self._remember(key, value)
+                with self._lock:
+                    self.hits += 1
+                return value
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def put(self, key: str, value: Any):
+        self._remember(key, value)
+        if self.directory:
+            path = self._path(key)
+            new = not os.path.exists(path)
+            _write_atomic(path, value)
+            with self._lock:
+                if self._disk_entries is not None:
+                    self._disk_entries += new
+                scan = self._disk_entries is None or self._disk_entries > self.max_disk_entries
+            if scan:
+                self._evict_disk()
+
+    def _evict_disk(self):
+        """Rescan the directory (other processes may write to it too) and evict in a batch."""
+        files = []
+        for root, _, names in os.walk(self.directory):
+            files.extend(os.path.join(root, n) for n in names if n.endswith(".pkl"))
+        keep = len(files)
+        if keep > self.max_disk_entries:
+            # Evict down to 90% of the cap so the next scan is many writes away
+            keep = self.max_disk_entries - self.max_disk_entries // 10
+            stamped = []
+            for path in files:
+                try:
+                    stamped.append((os.stat(path).st_mtime, path))
+                except OSError:
+                    pass
+            for _, path in sorted(stamped)[:len(stamped) - keep]:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+        with self._lock:
+            self._disk_entries = keep
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            if key in self._entries:  # finished by another caller since get()
+                return self._entries[key]
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            value = compute()
+            self.put(key, value)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return value
+
+    @staticmethod
+    def call_key(fn: Callable, **inputs) -> str:
+        """Key ``call`` caches ``fn(**inputs)`` under."""
+        return input_key(f"{fn.__module__}.{fn.__qualname__}", **inputs)
+
+    def call(self, fn: Callable, **inputs) -> Any:
+        """``fn(**inputs)``, cached under the function name and its inputs."""
+        return self.get_or_compute(self.call_key(fn, **inputs), lambda: fn(**inputs))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+# -----------------------------
+# TTL Cache With Fallback
+# -----------------------------
+class TTLCache:
+    """
+    Time-to-live cache for live data.
+
+    ``get_or_fetch`` returns ``(value, stale)``. A value younger than
+    ``ttl_seconds`` is served without calling ``fetch``. If a refresh
+    raises, the last known good value is returned with ``stale=True``;
+    with ``directory`` set it survives restarts and is shared on disk.
+    """
+
+    def __init__(self, ttl_seconds: float, directory: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self.directory = directory
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.lkg.pkl")
+
+    def _last_known(self, key: str) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None and self.directory:
+            entry = _load(self._path(key))
+            if entry is _MISSING:
+                entry = None
+        return entry
+
+    def fetched_at(self, key: str) -> Optional[float]:
+        entry = self._last_known(key)
+        return entry[0] if entry else None
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], Any]) -> Tuple[Any, bool]:
+        entry = self._last_known(key)
+        if entry is not None and time.time() - entry[0] < self.ttl_seconds:
+            return entry[1], False
+        try:
+            value = fetch()
+        except Exception:
+            if entry is None:
+                raise
+            return entry[1], True
+        entry = (time.time(), value)
+        with self._lock:
+            self._entries[key] = entry
+        if self.directory:
+            _write_atomic(self._path(key), entry)
+        return value, False
@@ -0,0 +1,367 @@
+"""
+Command-line runner.
+
+    python -m mstr_sim run scenario.json -o results.csv
+    python -m mstr_sim run scenario.yaml --paths 10000 --seed 1 -o paths.parquet
+    python -m mstr_sim sensitivity scenario.json --paths 2000 -o sensitivity.csv
+    python -m mstr_sim portfolio portfolio.json --paths 10000 -o companies.csv
+    python -m mstr_sim preview scenario.json -o preview.png
+    python -m mstr_sim serve --port 8765 --workers 4
+
+A deterministic run writes the per-month table of ``simulate_mstr_monthly``.
+With ``--paths`` the batched Monte Carlo engine runs instead and one row
+per path is written (collapse month/reason and final values).
+With ``--bands`` the paths are streamed in chunks and only per-month
+percentile bands, means and collapse counts are written, so memory stays
+flat in the number of paths.
+``--path-model`` picks the BTC path generator for ``--paths``: ``gbm``
+(default), ``bootstrap`` (blocks of the local BTC history) or ``regimes``.
+``--impact-depth`` turns on the reflexive market-impact mode for
+``--paths`` (see ``MarketImpact``): the company's BTC sales and purchases
+move the BTC price and a compressed premium throttles issuance.
+``--steps-per-year 365`` runs the event-driven engine at daily resolution
+(coupons, dividends, puts and maturities on their actual dates).
+
+``sensitivity`` writes one row per input with survival probability and
+final NAV/share at a low and high bump, from common random numbers.
+
+``portfolio`` runs several treasury companies on the same BTC paths (see
+``mstr_sim.portfolio``) and writes one row per company; ``--correlation``
+writes the pairwise collapse correlation matrix instead.
+
+``--archive DIR`` keeps deterministic runs and ``--bands`` studies in a
+run archive (see ``mstr_sim.archive``) and reopens them from there when
+the inputs match; ``archive DIR`` lists, shows and compares them.
+``--timings`` prints the time spent in each phase of the engine loop and
+``--profile FILE`` writes a cProfile dump of the run (top functions are
+printed too).
+
+``preview`` renders the scenario's 1200x630 share-preview card (see
+``mstr_sim.preview``).
+
+``serve`` runs the local HTTP/JSON simulation service (see
+``mstr_sim.service``).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List, Optional
+
+
+def _parse_override(text: str):
+    key, sep, value = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"Expected KEY=VALUE, got {text!r}")
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+
+def _write(frame, path: str):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet":
+        frame.to_parquet(path, index=False)
+    elif ext == ".csv":
+        frame.to_csv(path, index=False)
+    else:
+        raise SystemExit(f"Unsupported output format {ext!r}; use .csv or .parquet")
+
+
+def _path_generator(name: str, inputs: dict):
+    from .paths import GBM, BlockBootstrap, RegimeSwitching
+
+    if name == "bootstrap":
+        from .marketdata import MarketData
+
+        return BlockBootstrap.from_history(MarketData().load_history(),
+                                           btc_growth_annual=inputs["btc_growth_annual"])
+    if name == "regimes":
+        return RegimeSwitching()
+    return GBM(inputs["btc_growth_annual"], inputs["btc_volatility_annual"])
+
+
+def _run(args) -> int:
+    from .scenario import load_scenario, scenario_inputs
+
+    inputs = load_scenario(args.scenario)
+    if args.set:
+        inputs = scenario_inputs({**inputs, **dict(args.set)})
+
+    generator = _path_generator(args.path_model, inputs) if args.paths else None
+    market_impact = None
+    if args.impact_depth:
+        from .montecarlo import MarketImpact
+
+        if not args.paths:
+            raise ValueError("--impact-depth needs --paths")
+        market_impact = MarketImpact(args.impact_depth, args.impact_recovery, args.issuance_elasticity)
+    archive = archived = None
+    if args.archive:
+        from .archive import RunArchive
+
+        if (args.paths and not args.bands) or args.steps_per_year:
+            raise ValueError("--archive keeps deterministic monthly runs and --bands studies")
+        archive = RunArchive(args.archive)
+        kind, options = ("bands", dict(n_paths=args.paths, seed=args.seed, generator=generator)) if args.paths \
+            else ("monthly", {})
+        if market_impact is not None:
+            options["market_impact"] = market_impact
+        archived = archive.get(kind, inputs, **options)
+
+    phase_times = {} if args.timings else None
+    profiler = None
+    if args.profile:
+        from .profiling import Profiler
+
+        profiler = Profiler()
+        profiler.start()
+    start = time.perf_counter()
+    if args.paths and args.bands:
+        from .streaming import simulate_mstr_bands
+
+        result = archived if archived is not None else \
+            simulate_mstr_bands(n_paths=args.paths, seed=args.seed, generator=generator,
+                                market_impact=market_impact, phase_times=phase_times, **inputs)
+        frame = result.frame()
+        summary = (f"{result.n_paths:,} paths x {result.n_months} months (streamed): "
+                   f"collapse probability {result.collapse_probability()*100:.1f}%")
+    elif args.paths:
+        import pandas as pd
+        from .montecarlo import COLLAPSE_REASONS, simulate_mstr_paths
+
+        result = simulate_mstr_paths(n_paths=args.paths, seed=args.seed, generator=generator,
+                                     market_impact=market_impact, phase_times=phase_times, **inputs)
+        frame = pd.DataFrame({
+            'Path': range(result.n_paths),
+            'Collapse_Month': result.collapse_month,
+            'Collapse_Reason': [COLLAPSE_REASONS.get(int(c), "") for c in result.collapse_code],
+            'Final_BTC_Price': result.btc_price[:, -1],
+            'Final_MSTR_Price': result.mstr_price[:, -1],
+            'Final_BTC_Holdings': result.btc_holdings[:, -1],
+            'Final_Shares': result.shares[:, -1],
+        })
+        summary = (f"{result.n_paths:,} paths x {result.n_months} months: "
+                   f"collapse probability {result.collapse_probability()*100:.1f}%")
+    elif args.steps_per_year:
+        from .events import simulate_mstr_events
+
+        frame, collapse_step, collapse_reason = simulate_mstr_events(
+            **inputs, steps_per_year=args.steps_per_year)
+        if collapse_step is None:
+            summary = f"{len(frame)} steps: survived"
+        else:
+            summary = (f"{len(frame)} steps: collapse at step {collapse_step} "
+                       f"(month {frame['Month'].iloc[collapse_step]:.1f}, {collapse_reason})")
+    else:
+        from .engine import simulate_mstr_monthly
+
+        result = archived if archived is not None else simulate_mstr_monthly(**inputs, phase_times=phase_times)
+        frame, collapse_month, collapse_reason = result
+        if collapse_month is None:
+            summary = f"{inputs['n_months']} months: survived"
+        else:
+            summary = f"{inputs['n_months']} months: collapse in month {collapse_month} ({collapse_reason})"
+    elapsed = time.perf_counter() - start
+    if profiler is not None:
+        profiler.stop()
+        profiler.dump(args.profile)
+        print(profiler.report(limit=25), file=sys.stderr)
+
+    if archive is not None:
+        key = archive.save(kind, inputs, result, label=args.label or os.path.basename(args.scenario), **options)
+        summary += f" ({'reopened' if archived else 'archived'} as {key[:12]})"
+    if args.output:
+        _write(frame, args.output)
+    else:
+        frame.to_csv(sys.stdout, index=False)
+    print(f"{summary} [{elapsed*1000:.0f} ms]", file=sys.stderr)
+    if phase_times:
+        from .profiling import PHASES
+
+        for phase in PHASES:
+            if phase in phase_times:
+                print(f"  {phase:<14}{phase_times[phase]*1000:10.1f} ms ({phase_times[phase] / elapsed:.0%})",
+                      file=sys.stderr)
+    return 0
+
+
+def _sensitivity(args) -> int:
+    from .scenario import load_scenario, scenario_inputs
+    from .sensitivity import sensitivity_report
+
+    inputs = load_scenario(args.scenario)
+    if args.set:
+        inputs = scenario_inputs({**inputs, **dict(args.set)})
+
+    start = time.perf_counter()
+    report = sensitivity_report(inputs, n_paths=args.paths, seed=args.seed, rel_step=args.step,
+                                maturity_step=args.maturity_step,
+                                generator=_path_generator(args.path_model, inputs))
+    elapsed = time.perf_counter() - start
+
+    frame = report.frame()
+    if args.output:
+        _write(frame, args.output)
+    else:
+        frame.to_csv(sys.stdout, index=False)
+    print(f"{len(frame)} inputs x {report.n_paths:,} common paths: base survival "
+          f"{report.base_survival*100:.1f}% [{elapsed*1000:.0f} ms]", file=sys.stderr)
+    return 0
+
+
+def _portfolio(args) -> int:
+    from .portfolio import load_portfolio, simulate_portfolio
+
+    inputs = load_portfolio(args.portfolio)
+    start = time.perf_counter()
+    result = simulate_portfolio(n_paths=args.paths, seed=args.seed,
+                                generator=_path_generator(args.path_model, inputs), **inputs)
+    elapsed = time.perf_counter() - start
+
+    frame = result.correlation_frame().reset_index(names="Company") if args.correlation else result.frame()
+    if args.output:
+        _write(frame, args.output)
+    else:
+        frame.to_csv(sys.stdout, index=False)
+    counts = ", ".join(f"{k}: {p*100:.1f}%" for k, p in enumerate(result.collapse_count_distribution()))
+    print(f"{result.n_companies} companies x {result.n_paths:,} common paths, companies collapsed "
+          f"({counts}) [{elapsed*1000:.0f} ms]", file=sys.stderr)
+    return 0
+
+
+def _preview(args) -> int:
+    from .preview import PreviewRenderer
+    from .scenario import load_scenario, scenario_inputs
+
+    inputs = load_scenario(args.scenario)
+    if args.set:
+        inputs = scenario_inputs({**inputs, **dict(args.set)})
+
+    start = time.perf_counter()
+    png = PreviewRenderer().render(inputs)
+    elapsed = time.perf_counter() - start
+    with open(args.output, "wb") as f:
+        f.write(png)
+    print(f"{args.output}: 1200x630 preview [{elapsed*1000:.0f} ms]", file=sys.stderr)
+    return 0
+
+
+def _archive(args) -> int:
+    from .archive import RunArchive
+
+    archive = RunArchive(args.directory)
+    if args.compare:
+        frame = archive.compare([archive.resolve(k) for k in args.compare], args.series).reset_index()
+    elif args.show:
+        frame = archive.load(archive.resolve(args.show)).frame()
+    else:
+        frame = archive.index()
+    if args.output and args.output.lower().endswith(".parquet") and not (args.compare or args.show):
+        archive.export(frame['Key'].tolist(), args.output)
+    elif args.output:
+        _write(frame, args.output)
+    else:
+        frame.to_csv(sys.stdout, index=False)
+    return 0
+
+
+def _serve(args) -> int:
+    from .service import serve
+
+    print(f"Serving simulations on http://{args.host}:{args.port} "
+          f"({args.workers or 'all'} workers, store {args.store or 'in memory'})", file=sys.stderr)
+    serve(args.host, args.port, store_directory=args.store, max_workers=args.workers, max_pending=args.max_pending)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m mstr_sim", description="Headless MSTR capital-structure simulator.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Simulate a JSON/YAML scenario file")
+    run.add_argument("scenario", help="Scenario file (.json, .yaml or .yml)")
+    run.add_argument("-o", "--output", help="Output file (.csv or .parquet); CSV to stdout if omitted")
+    run.add_argument("--paths", type=int, default=0, help="Run N Monte Carlo paths instead of the deterministic path")
+    run.add_argument("--bands", action="store_true",
+                     help="With --paths: write per-month percentile bands instead of one row per path")
+    run.add_argument("--path-model", choices=["gbm", "bootstrap", "regimes"], default="gbm",
+                     help="BTC path generator for --paths (bootstrap resamples the local BTC history)")
+    run.add_argument("--steps-per-year", type=int, default=0, metavar="N",
+                     help="Event-driven run with N steps per year (e.g. 365 for daily; not with --paths)")
+    run.add_argument("--seed", type=int, default=None, help="Random seed for --paths")
+    run.add_argument("--impact-depth", type=float, default=0.0, metavar="BTC",
+                     help="With --paths: market impact on, net BTC sold per month that moves the BTC price by -1 log point")
+    run.add_argument("--impact-recovery", type=float, default=0.0,
+                     help="Fraction of the accumulated price impact that fades each month (default 0, permanent)")
+    run.add_argument("--issuance-elasticity", type=float, default=1.0,
+                     help="Issuance capacity scales with (premium / target) ** this under market impact (default 1)")
+    run.add_argument("--archive", metavar="DIR",
+                     help="Run archive: reopen this run from DIR if archived, else archive it there")
+    run.add_argument("--label", help="Label of the archived run (default: the scenario file name)")
+    run.add_argument("--timings", action="store_true", help="Print the time spent in each engine phase")
+    run.add_argument("--profile", metavar="FILE", help="Write a cProfile dump of the run to FILE (e.g. run.prof)")
+    run.add_argument("--set", type=_parse_override, action="append", metavar="KEY=VALUE",
+                     help="Override a scenario input (repeatable; VALUE is parsed as JSON)")
+    run.set_defaults(handler=_run)
+
+    sens = commands.add_parser("sensitivity", help="Survival/NAV sensitivity to every input (common random numbers)")
+    sens.add_argument("scenario", help="Scenario file (.json, .yaml or .yml)")
+    sens.add_argument("-o", "--output", help="Output file (.csv or .parquet); CSV to stdout if omitted")
+    sens.add_argument("--paths", type=int, default=1000, help="Monte Carlo paths shared by every bump")
+    sens.add_argument("--seed", type=int, default=None, help="Random seed")
+    sens.add_argument("--step", type=float, default=0.1, help="Relative bump of continuous inputs (default 0.1)")
+    sens.add_argument("--maturity-step", type=int, default=6, help="Maturity bump in months (default 6)")
+    sens.add_argument("--path-model", choices=["gbm", "bootstrap", "regimes"], default="gbm",
+                      help="BTC path generator (bootstrap resamples the local BTC history)")
+    sens.add_argument("--set", type=_parse_override, action="append", metavar="KEY=VALUE",
+                      help="Override a scenario input (repeatable; VALUE is parsed as JSON)")
+    sens.set_defaults(handler=_sensitivity)
+
+    port = commands.add_parser("portfolio", help="Several treasury companies on the same BTC paths")
+    port.add_argument("portfolio", help="Portfolio file (.json, .yaml or .yml) with a 'companies' list")
+    port.add_argument("-o", "--output", help="Output file (.csv or .parquet); CSV to stdout if omitted")
+    port.add_argument("--paths", type=int, default=10000, help="Monte Carlo paths shared by every company")
+    port.add_argument("--seed", type=int, default=None, help="Random seed")
+    port.add_argument("--path-model", choices=["gbm", "bootstrap", "regimes"], default="gbm",
+                      help="BTC path generator (bootstrap resamples the local BTC history)")
+    port.add_argument("--correlation", action="store_true",
+                      help="Write the pairwise collapse correlation matrix instead of one row per company")
+    port.set_defaults(handler=_portfolio)
+
+    prev = commands.add_parser("preview", help="Render a scenario's share-preview image (1200x630 PNG)")
+    prev.add_argument("scenario", help="Scenario file (.json, .yaml or .yml)")
+    prev.add_argument("-o", "--output", default="preview.png", help="Output PNG (default preview.png)")
+    prev.add_argument("--set", type=_parse_override, action="append", metavar="KEY=VALUE",
+                      help="Override a scenario input (repeatable; VALUE is parsed as JSON)")
+    prev.set_defaults(handler=_preview)
+
+    arc = commands.add_parser("archive", help="List, show or compare archived runs")
+    arc.add_argument("directory", help="Run archive directory")
+    arc.add_argument("--show", metavar="KEY", help="Write one run's per-month table (KEY may be a prefix)")
+    arc.add_argument("--compare", nargs="+", metavar="KEY", help="Write one series of several runs side by side")
+    arc.add_argument("--series", default="MSTR_Price", help="Series for --compare (default MSTR_Price)")
+    arc.add_argument("-o", "--output",
+                     help="Output file (.csv or .parquet; a listing to .parquet exports every run); CSV to stdout if omitted")
+    arc.set_defaults(handler=_archive)
+
+    srv = commands.add_parser("serve", help="Run the local HTTP/JSON simulation service")
+    srv.add_argument("--host", default="127.0.0.1", help="Interface to bind (default 127.0.0.1)")
+    srv.add_argument("--port", type=int, default=8765, help="Port (default 8765)")
+    srv.add_argument("--workers", type=int, default=None, help="Process pool size (default: every core)")
+    srv.add_argument("--max-pending", type=int, default=64, help="Queued/running jobs before refusing with 503")
+    srv.add_argument("--store", default=os.environ.get("MSTR_SIM_SERVICE_STORE"),
+                     help="Directory of the shared result store (default: memory only)")
+    srv.set_defaults(handler=_serve)
+
+    args = parser.parse_args(argv)
+    if args.command == "run" and args.paths and args.steps_per_year:
+        run.error("--steps-per-year runs the deterministic event engine and cannot be combined with --paths")
+    try:
+        return args.handler(args)
+    except (OSError, ValueError, TypeError, ImportError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
@@ -0,0 +1,100 @@
+"""
+Client for the local simulation service (``mstr_sim.service``).
+
+    client = ServiceClient("http://127.0.0.1:8765")
+    df, collapse_month, reason = client.run("monthly", inputs)
+    bands = client.run("bands", inputs, n_paths=50_000, seed=1, on_progress=print)
+
+Results come back as the same objects the engines return in-process.
+Uses only the standard library.
+"""
+
+import json
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Callable, Optional
+
+from . import wire
+
+
+class ServiceError(RuntimeError):
+    """The service refused or failed a request."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class ServiceClient:
+    """
+    Thin HTTP client: submits jobs and polls them until done.
+
+    Polling starts at ``poll_interval`` seconds and backs off to
+    ``max_poll_interval``; a busy service (503) is retried until
+    ``timeout``.
+    """
+
+    def __init__(self, url: str, timeout: float = 600.0, poll_interval: float = 0.05,
+                 max_poll_interval: float = 1.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+
+    def _request(self, method: str, path: str, payload: Any = None) -> dict:
+        data = None if payload is None else wire.dumps(payload)
+        request = urllib.request.Request(self.url + path, data=data, method=method,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return wire.loads(response.read())
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error", e.reason)
+            except ValueError:
+                message = e.reason
+            raise ServiceError(str(message), e.code) from None
+        except urllib.error.URLError as e:
+            raise ServiceError(f"Simulation service unreachable at {self.url}: {e.reason}") from None
+
+    def health(self) -> dict:
+        return self._request("GET", "/health")
+
+    def submit(self, kind: str, inputs: dict, **options) -> dict:
+        """Queue a job (or attach to an identical one) and return its status."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                return self._request("POST", f"/jobs/{kind}", {"inputs": inputs, "options": options})
+            except ServiceError as e:
+                if e.status != 503 or time.monotonic() > deadline:
+                    raise
+            time.sleep(self.max_poll_interval)
+
+    def status(self, job_id: str, result: bool = True) -> dict:
+        return self._request("GET", f"/jobs/{job_id}" + ("" if result else "?result=0"))
+
+    def wait(self, job_id: str, on_progress: Optional[Callable[[float], None]] = None) -> Any:
+        """Poll a job until it finishes and return its result."""
+        deadline = time.monotonic() + self.timeout
+        interval = self.poll_interval
+        while True:
+            status = self.status(job_id, result=False)
+            if on_progress is not None:
+                on_progress(status["progress"])
+            if status["state"] == "done":
+                return self.status(job_id)["result"]
+            if status["state"] == "error":
+                raise ServiceError(status.get("error", "Simulation failed"))
+            if time.monotonic() > deadline:
+                raise ServiceError(f"Timed out waiting for job {job_id}")
+            time.sleep(interval)
+            interval = min(interval * 2, self.max_poll_interval)
+
+    def run(self, kind: str, inputs: dict, on_progress: Optional[Callable[[float], None]] = None, **options) -> Any:
+        """Result of ``kind`` for ``inputs``, e.g. ``run("bands", inputs, n_paths=1000)``."""
+        status = self.submit(kind, inputs, **options)
+        if status["state"] == "done":
+            return self.status(status["job"])["result"]
+        return self.wait(status["job"], on_progress)
@@ -0,0 +1,424 @@
+"""
+Deterministic monthly simulation of an MSTR-style capital structure.
+"""
+
+import time
+
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .book import TrancheBook
+from .instruments import ConvertibleDebt, PreferredStock
+
+# -----------------------------
+# Results
+# -----------------------------
+@dataclass
+class SimulationSummary:
+    """Compact result of ``simulate_mstr_monthly(..., full_history=False)``.
+
+    The run stops stepping at collapse, so for collapsed runs the
+    ``final_*`` values are those of the collapse month.
+    """
+    collapse_month: Optional[int]
+    collapse_reason: Optional[str]
+    months_simulated: int
+    final_btc_price: float
+    final_mstr_price: float
+    final_btc_holdings: float
+    final_shares: float
+    dilution: float
+    min_cash: float
+
+    @property
+    def survived(self) -> bool:
+        return self.collapse_month is None
+
+@dataclass
+class Checkpoint:
+    """Engine state at the start of ``month``.
+
+    ``history`` holds the run's history columns (only the first ``month``
+    entries belong to this checkpoint); it is ``None`` for summary runs.
+    ``mstr_price`` is the last priced month's stock price, which a summary
+    run resumed from the end-of-run checkpoint reports as final.
+    """
+    month: int
+    btc_price: float
+    btc_peak: float
+    premium_mult: float
+    mstr_price: float
+    btc_holdings: float
+    cash_balance: float
+    shares_outstanding: float
+    min_cash: float
+    book: Tuple
+    collapse_month: Optional[int]
+    collapse_reason: Optional[str]
+    history: Optional[Dict[str, np.ndarray]]
+
+# -----------------------------
+# Core Simulation Logic
+# -----------------------------
+def simulate_mstr_monthly(
+    n_months: int,
+    btc_price_start: float,
+    btc_growth_annual: float,
+    btc_volatility_annual: float,
+    btc_holdings_start: float,
+    cash_start: float,
+    shares_start: float,
+    convertible_debts: List[ConvertibleDebt],
+    preferred_stocks: List[PreferredStock],
+    operating_burn_annual: float,
+    issuance_capacity_pct_annual: float,
+    base_premium: float,
+    dynamic_premium: bool,
+    full_history: bool = True,
+    checkpoint_every: int = 0,
+    checkpoints: Optional[List[Checkpoint]] = None,
+    resume_from: Optional[Checkpoint] = None,
+    btc_path: Optional[np.ndarray] = None,
+    premium_drawdown: Optional[float] = None,
+    phase_times: Optional[Dict[str, float]] = None,
+):
+    """
+    Monthly simulation of MSTR capital structure.
+
+    Returns ``(df, collapse_month, collapse_reason)``. With
+    ``full_history=False`` no per-month history or DataFrame is built,
+    stepping stops at collapse, and a ``SimulationSummary`` is returned.
+
+    With ``checkpoint_every`` set, a ``Checkpoint`` is appended to
+    ``checkpoints`` every that many months and at the end of the run.
+    ``resume_from`` continues from such a checkpoint instead of month 0;
+    the caller must make sure nothing that affects the earlier months has
+    changed (see ``mstr_sim.incremental``).
+
+    ``btc_path`` replaces the growth trend with monthly prices (e.g. one
+    row of a ``mstr_sim.paths`` generator); the dynamic premium then reacts
+    to the realized monthly moves. With ``premium_drawdown`` set the
+    dynamic premium compresses with the drawdown from the running peak
+    instead (see ``montecarlo.drawdown_premium``). Without either, the
+    output is bit for bit that of the original list-scan engine for any
+    tranche set, and a summary run's ``final_*`` values equal the full
+    run's row ``months_simulated - 1`` with or without them.
+
+    ``phase_times`` (a dict) accumulates the seconds spent in each phase
+    of the loop (``pricing``, ``obligations``, ``maturity_scan``,
+    ``funding``) and in building the ``dataframe``; see
+    ``mstr_sim.profiling``. Leave it unset for normal runs.
+    """
+    timed = phase_times is not None
+    if timed:
+        for phase in ("pricing", "obligations", "maturity_scan", "funding", "dataframe"):
+            phase_times.setdefault(phase, 0.0)
+
+    # Pre-allocate arrays (only when the full history is requested)
+    if full_history:
+        btc_price_hist = np.zeros(n_months)
+        mstr_price_hist = np.zeros(n_months)
+        premium_hist = np.zeros(n_months)
+
+        btc_holdings_hist = np.zeros(n_months)
+        cash_hist = np.zeros(n_months)
+        shares_hist = np.zeros(n_months)
+
+        debt_principal = np.zeros(n_months)
+
+        nav_per_share_hist = np.zeros(n_months)
+
+        inflows = np.zeros(n_months)
+        outflows = np.zeros(n_months)
+        btc_sold = np.zeros(n_months)
+
+    # Initial State
+    btc_price = btc_price_start if btc_path is None else float(btc_path[0])
+    btc_peak = btc_price
+    btc_holdings = btc_holdings_start
+    cash_balance = cash_start
+    shares_outstanding = shares_start
+    min_cash = cash_start
+
+    # Capital structure book (running totals, maturities indexed by month)
+    book = TrancheBook(convertible_debts, preferred_stocks)
+
+    # Initial Premium
+    premium_mult = base_premium
+
+    mstr_stock_price = 0.0
+    months_simulated = 0
+    collapse_month = None
+    collapse_reason = None
+
+    start_month = 0
+    if resume_from is not None:
+        if resume_from.month > n_months:
+            raise ValueError(f"Checkpoint at month {resume_from.month} is past n_months={n_months}")
+        start_month = months_simulated = resume_from.month
+        btc_price = resume_from.btc_price
+        btc_peak = resume_from.btc_peak
+        premium_mult = resume_from.premium_mult
+        mstr_stock_price = resume_from.mstr_price
+        btc_holdings = resume_from.btc_holdings
+        cash_balance = resume_from.cash_balance
+        shares_outstanding = resume_from.shares_outstanding
+        min_cash = resume_from.min_cash
+        book.restore(resume_from.book)
+        collapse_month = resume_from.collapse_month
+        collapse_reason = resume_from.collapse_reason
+        if full_history:
+            prefix = resume_from.history
+            btc_price_hist[:start_month] = prefix['btc_price'][:start_month]
+            mstr_price_hist[:start_month] = prefix['mstr_price'][:start_month]
+            premium_hist[:start_month] = prefix['premium'][:start_month]
+            btc_holdings_hist[:start_month] = prefix['btc_holdings'][:start_month]
+            cash_hist[:start_month] = prefix['cash'][:start_month]
+            shares_hist[:start_month] = prefix['shares'][:start_month]
+            debt_principal[:start_month] = prefix['debt'][:start_month]
+            nav_per_share_hist[:start_month] = prefix['nav_per_share'][:start_month]
+            inflows[:start_month] = prefix['inflows'][:start_month]
+            outflows[:start_month] = prefix['outflows'][:start_month]
+            btc_sold[:start_month] = prefix['btc_sold'][:start_month]
+
+    history = None
+    if full_history and checkpoint_every:
+        history = dict(
+            btc_price=btc_price_hist, mstr_price=mstr_price_hist, premium=premium_hist,
+            btc_holdings=btc_holdings_hist, cash=cash_hist, shares=shares_hist,
+            debt=debt_principal, nav_per_share=nav_per_share_hist,
+            inflows=inflows, outflows=outflows, btc_sold=btc_sold,
+        )
+
+    def checkpoint(month: int):
+        checkpoints.append(Checkpoint(
+            month, btc_price, btc_peak, premium_mult, mstr_stock_price, btc_holdings, cash_balance, shares_outstanding,
+            min_cash, book.snapshot(), collapse_month, collapse_reason, history))
+
+    # Monthly growth/volatility
+    # Simple deterministic growth path for now to show trend,
+    # or we could add random walk. Let's stick to deterministic trend for clarity
+    # but allow "scenarios" to define the path shape.
+    monthly_growth = (1 + btc_growth_annual) ** (1/12) - 1
+    monthly_ops_burn = operating_burn_annual / 12.0
+    monthly_issuance = issuance_capacity_pct_annual / 12.0
+
+    for i in range(start_month, n_months):
+        if checkpoint_every and i > start_month and i % checkpoint_every == 0:
+            checkpoint(i)
+        if timed:
+            t0 = time.perf_counter()
+        months_simulated = i + 1
+        if i > 0:
+            # 1. Update BTC Price (holdings, cash and shares carry forward)
+            if btc_path is None:
+                btc_price = btc_price * (1 + monthly_growth)
+                falling = monthly_growth < 0
+            else:
+                falling = btc_path[i] < btc_price
+                btc_price = float(btc_path[i])
+            btc_peak = max(btc_peak, btc_price)
+
+            # Dynamic Premium Logic
+            # If BTC drops significantly from peak or is in drawdown, premium compresses.
+            # Simplified: If BTC growth is negative, premium drops.
+            if dynamic_premium and premium_drawdown:
+                # Linear in the realized drawdown, reaching NAV at premium_drawdown
+                compression = min(1.0, (1.0 - btc_price / btc_peak) / premium_drawdown)
+                premium_mult = base_premium - max(base_premium - 1.0, 0.0) * compression
+            elif dynamic_premium:
+                if falling:
+                    premium_mult = max(1.0, premium_mult * 0.95) # Decay
+                else:
+                    premium_mult = min(base_premium, premium_mult * 1.02) # Recover
+            else:
+                premium_mult = base_premium
+
+        # 2. Calculate NAV and Stock Price
+        # Assets = BTC + Cash
+        assets = btc_price * btc_holdings + cash_balance
+
+        # Liabilities = Debt + Preferreds
+        total_debt = book.debt_total
+        total_pref = book.pref_total
+
+        equity_value = max(0, assets - total_debt - total_pref)
+
+        if shares_outstanding > 0:
+            nav_per_share = equity_value / shares_outstanding
+        else:
+            nav_per_share = 0
+
+        # Stock Price = NAV/share * Premium
+        # If NAV is 0, stock price is theoretically 0 (or option value, but let's say 0 for collapse)
+        if nav_per_share <= 0:
+            mstr_stock_price = 0
+            if collapse_month is None:
+                collapse_month = i
+                collapse_reason = "NAV <= 0 (Insolvency)"
+        else:
+            mstr_stock_price = nav_per_share * premium_mult
+
+        market_cap = mstr_stock_price * shares_outstanding
+
+        if full_history:
+            btc_price_hist[i] = btc_price
+            premium_hist[i] = premium_mult
+            debt_principal[i] = total_debt
+            nav_per_share_hist[i] = nav_per_share
+            mstr_price_hist[i] = mstr_stock_price
+            btc_holdings_hist[i] = btc_holdings
+            cash_hist[i] = cash_balance
+            shares_hist[i] = shares_outstanding
+
+        if timed:
+            t1 = time.perf_counter()
+            phase_times['pricing'] += t1 - t0
+
+        if collapse_month is not None:
+            if not full_history:
+                break # Summary only: nothing left to record
+            continue # Stop simulating logic, just fill arrays
+
+        # 3. Calculate Obligations (Monthly)
+        # Coupon payments
+        monthly_interest = book.annual_interest / 12.0
+        monthly_dividends = book.annual_dividends / 12.0
+        if timed:
+            t2 = time.perf_counter()
+            phase_times['obligations'] += t2 - t1
+
+        # Maturities
+        maturity_payment = 0.0
+        maturing = book.maturing(i)
+
+        if maturing.size:
+            # Check for Conversion!
+            # If Stock Price > Conversion Price, debt converts to shares
+            # and principal is extinguished without cash.
+            principal = book.principal[maturing]
+            conv_price = book.conversion_price[maturing]
+            converts = mstr_stock_price > conv_price
+            # Added one tranche at a time, in list order, as the original scan did
+            for new_shares in (principal[converts] / conv_price[converts]).tolist():
+                shares_outstanding += new_shares
+            # Otherwise it must be repaid in cash
+            for repaid in principal[~converts].tolist():
+                maturity_payment += repaid
+
+            # Remove matured/converted debts
+            book.retire(maturing)
+        if timed:
+            t3 = time.perf_counter()
+            phase_times['maturity_scan'] += t3 - t2
+
+        total_obligations = monthly_ops_burn + monthly_interest + monthly_dividends + maturity_payment
+
+        # 4. Funding & Inflows
+        # Issuance Capacity (Monthly limit)
+        # Max we can raise is % of Market Cap / 12
+        max_issuance = monthly_issuance * market_cap
+
+        # We only raise what we need? Or do we always raise max to buy BTC?
+        # "Ponzi" logic: Raise max, pay obligations, buy BTC with rest.
+        # But let's stick to the previous logic: Raise to cover obligations + maybe buy BTC?
+        # Let's assume aggressive strategy: Always raise max possible to buy BTC,
+        # but first priority is obligations.
+
+        # Actually, to keep it simple and robust:
+        # 1. Pay obligations from Cash.
+        # 2. If Cash < Obligations, raise Capital.
+        # 3. If Capital + Cash < Obligations, Sell BTC.
+        # 4. If Surplus Capital, Buy BTC.
+
+        # Let's model the "Aggressive Accumulation":
+        # We try to raise `max_issuance`.
+        raised_capital = max_issuance
+
+        cash_available = cash_balance + raised_capital
+        sold = 0.0
+
+        if cash_available >= total_obligations:
+            # Pay obligations
+            surplus = cash_available - total_obligations
+            # Buy BTC with surplus?
+            # Let's say we keep a small buffer, but mostly buy BTC.
+            # For simplicity: Buy BTC with 90% of surplus.
+            btc_to_buy = (surplus * 0.9) / btc_price
+            btc_holdings += btc_to_buy
+            cash_balance = surplus * 0.1 # Keep 10% as buffer
+        else:
+            # Shortfall
+            shortfall = total_obligations - cash_available
+            # Must sell BTC
+            btc_needed = shortfall / btc_price
+            if btc_needed > btc_holdings:
+                # Collapse
+                sold = btc_holdings
+                btc_holdings = 0
+                collapse_month = i
+                collapse_reason = "Liquidity Crisis (Ran out of BTC)"
+            else:
+                btc_holdings -= btc_needed
+                sold = btc_needed
+                cash_balance = 0
+
+        min_cash = min(min_cash, cash_balance)
+
+        if full_history:
+            btc_holdings_hist[i] = btc_holdings
+            cash_hist[i] = cash_balance
+            shares_hist[i] = shares_outstanding
+            outflows[i] = total_obligations
+            inflows[i] = raised_capital
+            btc_sold[i] = sold
+        if timed:
+            phase_times['funding'] += time.perf_counter() - t3
+        if not full_history and collapse_month is not None:
+            break
+
+    if checkpoint_every and months_simulated == n_months and (full_history or collapse_month is None):
+        checkpoint(n_months)
+
+    if not full_history:
+        return SimulationSummary(
+            collapse_month=collapse_month,
+            collapse_reason=collapse_reason,
+            months_simulated=months_simulated,
+            final_btc_price=float(btc_price),
+            final_mstr_price=float(mstr_stock_price),
+            final_btc_holdings=float(btc_holdings),
+            final_shares=float(shares_outstanding),
+            dilution=float(shares_outstanding / shares_start) if shares_start else float('nan'),
+            min_cash=float(min_cash),
+        )
+
+    if timed:
+        t0 = time.perf_counter()
+    import pandas as pd
+
+    # Time array
+    months = np.arange(n_months)
+    years = months / 12.0
+
+    # Create DataFrame
+    df = pd.DataFrame({
+        'Month': months,
+        'Year': years,
+        'BTC_Price': btc_price_hist,
+        'MSTR_Price': mstr_price_hist,
+        'BTC_Holdings': btc_holdings_hist,
+        'Debt': debt_principal,
+        'Shares': shares_hist,
+        'Premium': premium_hist,
+        'NAV_Per_Share': nav_per_share_hist,
+        'Cash': cash_hist,
+        'Inflows': inflows,
+        'Outflows': outflows,
+        'BTC_Sold': btc_sold
+    })
+    if timed:
+        phase_times['dataframe'] += time.perf_counter() - t0
+
+    return df, collapse_month, collapse_reason
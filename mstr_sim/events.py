@@ -0,0 +1,329 @@
+"""
+Event-driven simulation at daily (or any) resolution.
+
+Cash flows happen on their actual dates instead of being smeared over
+months: convertible coupons (semi-annual by default), preferred dividends
+(quarterly), monthly operating burn and ATM issuance, holder puts and
+maturities are kept in a ``heapq`` schedule. Between two event days the
+capital structure cannot change, so the quiet days in between are
+advanced in one vectorized slice (NAV, stock price and the insolvency
+check) and only event days run the funding logic.
+
+With ``steps_per_year=12`` and monthly coupons/dividends this reproduces
+``simulate_mstr_monthly``.
+"""
+
+import heapq
+import numpy as np
+from typing import List, Optional
+
+from .book import TrancheBook
+from .engine import SimulationSummary
+from .instruments import ConvertibleDebt, PreferredStock
+from .montecarlo import drawdown_premium
+
+# Event kinds; on a shared day they are handled in this order
+OPS, ISSUANCE, COUPON, DIVIDEND, PUT, MATURITY = range(6)
+
+# Monthly premium decay/recovery factors of the monthly engine
+PREMIUM_DECAY = 0.95
+PREMIUM_RECOVER = 1.02
+
+# -----------------------------
+# Paths
+# -----------------------------
+def _premium_path(btc_price: np.ndarray, base_premium: float, dynamic_premium: bool,
+                  decay: float, recover: float) -> np.ndarray:
+    """Premium per step. It depends only on the BTC path, so it is computed up front."""
+    premium = np.full(len(btc_price), float(base_premium))
+    if not dynamic_premium or len(btc_price) < 2:
+        return premium
+    falling = np.diff(btc_price) < 0
+    if not falling.any():
+        return premium  # Recovering from the base premium stays at the base
+    if falling.all():
+        premium[1:] = np.maximum(1.0, base_premium * decay ** np.arange(1, len(btc_price)))
+        return premium
+    # Mixed path: the clamped recursion is sequential
+    p = float(base_premium)
+    for i, down in enumerate(falling.tolist(), 1):
+        p = max(1.0, p * decay) if down else min(base_premium, p * recover)
+        premium[i] = p
+    return premium
+
+# -----------------------------
+# Core Simulation Logic
+# -----------------------------
+def simulate_mstr_events(
+    n_months: int,
+    btc_price_start: float,
+    btc_growth_annual: float,
+    btc_volatility_annual: float,
+    btc_holdings_start: float,
+    cash_start: float,
+    shares_start: float,
+    convertible_debts: List[ConvertibleDebt],
+    preferred_stocks: List[PreferredStock],
+    operating_burn_annual: float,
+    issuance_capacity_pct_annual: float,
+    base_premium: float,
+    dynamic_premium: bool,
+    steps_per_year: int = 365,
+    coupon_frequency: int = 2,
+    dividend_frequency: int = 4,
+    btc_path: Optional[np.ndarray] = None,
+    premium_drawdown: Optional[float] = None,
+    full_history: bool = True,
+):
+    """
+    Event-driven simulation of MSTR capital structure.
+
+    Takes the ``simulate_mstr_monthly`` inputs plus the step size
+    (``steps_per_year``) and coupon/dividend payments per year. Operating
+    burn and issuance stay monthly. ``btc_path`` replaces the
+    deterministic growth path with per-step prices (e.g. a simulated or
+    historical daily path); ``btc_volatility_annual`` is then unused, as
+    in the monthly engine.
+
+    ``premium_drawdown`` switches the dynamic premium to the
+    drawdown-driven rule of the other engines.
+
+    A tranche with a ``put_month`` is put back at par on that date when
+    the stock trades at or below its conversion price.
+
+    Returns ``(df, collapse_step, collapse_reason)`` with one row per
+    step. With ``full_history=False`` a ``SimulationSummary`` is returned
+    whose ``collapse_month``/``months_simulated`` are the month containing
+    the collapse step.
+    """
+    n_steps = int(round(n_months * steps_per_year / 12))
+    months_per_step = 12.0 / steps_per_year
+
+    def step_of(month: float) -> int:
+        return int(round(month * steps_per_year / 12))
+
+    def month_of(step: int) -> int:
+        """Month containing ``step``: the last month whose first step is at or before it."""
+        month = int(step * months_per_step)
+        while step_of(month + 1) <= step:
+            month += 1
+        while month > 0 and step_of(month) > step:
+            month -= 1
+        return month
+
+    # BTC price and premium for every step
+    if btc_path is None:
+        step_growth = (1 + btc_growth_annual) ** (1 / steps_per_year) - 1
+        btc = btc_price_start * (1 + step_growth) ** np.arange(n_steps)
+    else:
+        btc = np.asarray(btc_path, dtype=float)
+        if len(btc) < n_steps:
+            raise ValueError(f"btc_path has {len(btc)} steps, need {n_steps}")
+        btc = btc[:n_steps]
+    if dynamic_premium and premium_drawdown:
+        premium = drawdown_premium(btc, base_premium, premium_drawdown)
+    else:
+        premium = _premium_path(btc, base_premium, dynamic_premium,
+                                PREMIUM_DECAY ** months_per_step, PREMIUM_RECOVER ** months_per_step)
+
+    if full_history:
+        btc_holdings_hist = np.zeros(n_steps)
+        cash_hist = np.zeros(n_steps)
+        shares_hist = np.zeros(n_steps)
+        debt_principal = np.zeros(n_steps)
+        nav_per_share_hist = np.zeros(n_steps)
+        mstr_price_hist = np.zeros(n_steps)
+        inflows = np.zeros(n_steps)
+        outflows = np.zeros(n_steps)
+        btc_sold = np.zeros(n_steps)
+
+    # Initial State
+    btc_holdings = btc_holdings_start
+    cash_balance = cash_start
+    shares_outstanding = shares_start
+    min_cash = cash_start
+    book = TrancheBook(convertible_debts, preferred_stocks)
+
+    collapse_step = None
+    collapse_reason = None
+    last_price = 0.0
+    mstr_stock_price = 0.0
+
+    # Event schedule: (step, kind, index, occurrence)
+    coupon_period = 12.0 / coupon_frequency
+    dividend_period = 12.0 / dividend_frequency
+    coupon_amount = book.principal * book.coupon_rate / coupon_frequency
+    heap = [(0, OPS, -1, 0), (0, ISSUANCE, -1, 0), (0, DIVIDEND, -1, 0)]
+    for j, maturity in enumerate(book.maturity_month.tolist()):
+        if maturity < 0:
+            continue
+        heap.append((step_of(maturity), MATURITY, j, 0))
+        # Coupons fall on the dates counting back from maturity in whole periods
+        heap.append((step_of(maturity - (maturity // coupon_period) * coupon_period), COUPON, j, 0))
+        put = int(book.put_month[j])
+        if 0 <= put < maturity:
+            heap.append((step_of(put), PUT, j, 0))
+    heapq.heapify(heap)
+
+    def advance(start: int, stop: int) -> Optional[int]:
+        """Fill steps [start, stop) with the current state; first insolvent step, if any."""
+        nonlocal last_price
+        if start >= stop:
+            return None
+        price = btc[start:stop]
+        equity = np.maximum(0, price * btc_holdings + cash_balance - book.debt_total - book.pref_total)
+        nav = equity / shares_outstanding if shares_outstanding > 0 else np.zeros(stop - start)
+        if full_history:
+            btc_holdings_hist[start:stop] = btc_holdings
+            cash_hist[start:stop] = cash_balance
+            shares_hist[start:stop] = shares_outstanding
+            debt_principal[start:stop] = book.debt_total
+            nav_per_share_hist[start:stop] = nav
+            mstr_price_hist[start:stop] = np.where(nav <= 0, 0.0, nav * premium[start:stop])
+        last_price = nav[-1] * premium[stop - 1] if nav[-1] > 0 else 0.0
+        bad = np.flatnonzero(nav <= 0)
+        return start + int(bad[0]) if bad.size else None
+
+    t = 0  # first step not yet filled
+    while heap and heap[0][0] < n_steps:
+        step = heap[0][0]
+
+        # 1. Quiet days up to and including the event day, in bulk
+        collapse_step = advance(t, step + 1)
+        t = step + 1
+        if collapse_step is not None:
+            collapse_reason = "NAV <= 0 (Insolvency)"
+            break
+
+        # 2. Stock price on the event day (before any of its events)
+        equity = max(0, btc[step] * btc_holdings + cash_balance - book.debt_total - book.pref_total)
+        nav_per_share = equity / shares_outstanding if shares_outstanding > 0 else 0.0
+        mstr_stock_price = nav_per_share * premium[step]
+        market_cap = mstr_stock_price * shares_outstanding
+
+        # 3. Obligations and issuance due today
+        total_obligations = 0.0
+        raised_capital = 0.0
+        puts = []
+        maturing = []
+        while heap and heap[0][0] == step:
+            _, kind, j, n = heapq.heappop(heap)
+            if kind == OPS:
+                total_obligations += operating_burn_annual / 12.0
+                heapq.heappush(heap, (step_of(n + 1), OPS, -1, n + 1))
+            elif kind == ISSUANCE:
+                raised_capital += issuance_capacity_pct_annual / 12.0 * market_cap
+                heapq.heappush(heap, (step_of(n + 1), ISSUANCE, -1, n + 1))
+            elif kind == DIVIDEND:
+                total_obligations += book.annual_dividends / dividend_frequency
+                heapq.heappush(heap, (step_of((n + 1) * dividend_period), DIVIDEND, -1, n + 1))
+            elif kind == COUPON:
+                if book.outstanding[j]:
+                    total_obligations += coupon_amount[j]
+                    maturity = book.maturity_month[j]
+                    next_month = maturity - ((maturity // coupon_period) - n - 1) * coupon_period
+                    if next_month <= maturity:
+                        heapq.heappush(heap, (step_of(next_month), COUPON, j, n + 1))
+            elif kind == PUT:
+                puts.append(j)
+            elif kind == MATURITY:
+                maturing.append(j)
+
+        # Holders put back at par when conversion is out of the money
+        if puts:
+            idx = np.array(puts, dtype=np.int64)
+            idx = idx[book.outstanding[idx] & (mstr_stock_price <= book.conversion_price[idx])]
+            total_obligations += float(book.principal[idx].sum())
+            book.retire(idx)
+
+        # Maturities: convert if in the money, otherwise repay in cash
+        if maturing:
+            idx = np.array(maturing, dtype=np.int64)
+            idx = idx[book.outstanding[idx]]
+            principal = book.principal[idx]
+            conv_price = book.conversion_price[idx]
+            converts = mstr_stock_price > conv_price
+            shares_outstanding += (principal[converts] / conv_price[converts]).sum()
+            total_obligations += float(principal[~converts].sum())
+            book.retire(idx)
+
+        # 4. Funding (same policy as the monthly engine)
+        cash_available = cash_balance + raised_capital
+        sold = 0.0
+        if cash_available >= total_obligations:
+            surplus = cash_available - total_obligations
+            btc_holdings += (surplus * 0.9) / btc[step]
+            cash_balance = surplus * 0.1
+        else:
+            btc_needed = (total_obligations - cash_available) / btc[step]
+            if btc_needed > btc_holdings:
+                sold = btc_holdings
+                btc_holdings = 0
+                collapse_step = step
+                collapse_reason = "Liquidity Crisis (Ran out of BTC)"
+            else:
+                btc_holdings -= btc_needed
+                sold = btc_needed
+                cash_balance = 0
+
+        min_cash = min(min_cash, cash_balance)
+
+        if full_history:
+            btc_holdings_hist[step] = btc_holdings
+            cash_hist[step] = cash_balance
+            shares_hist[step] = shares_outstanding
+            outflows[step] = total_obligations
+            inflows[step] = raised_capital
+            btc_sold[step] = sold
+        if collapse_step is not None:
+            break
+
+    # Remaining steps carry the final state forward (and may still go insolvent)
+    if collapse_step is None:
+        collapse_step = advance(t, n_steps)
+        if collapse_step is not None:
+            collapse_reason = "NAV <= 0 (Insolvency)"
+    elif full_history:
+        advance(t, n_steps)
+
+    if not full_history:
+        if collapse_step is None:
+            last = n_steps - 1
+            final_mstr_price = float(last_price)
+        else:
+            last = collapse_step
+            final_mstr_price = 0.0 if collapse_reason.startswith("NAV") else float(mstr_stock_price)
+        collapse_month = None if collapse_step is None else month_of(collapse_step)
+        return SimulationSummary(
+            collapse_month=collapse_month,
+            collapse_reason=collapse_reason,
+            months_simulated=n_months if collapse_month is None else collapse_month + 1,
+            final_btc_price=float(btc[last]) if last >= 0 else float(btc_price_start),
+            final_mstr_price=final_mstr_price,
+            final_btc_holdings=float(btc_holdings),
+            final_shares=float(shares_outstanding),
+            dilution=float(shares_outstanding / shares_start) if shares_start else float('nan'),
+            min_cash=float(min_cash),
+        )
+
+    import pandas as pd
+
+    steps = np.arange(n_steps)
+    df = pd.DataFrame({
+        'Step': steps,
+        'Month': steps * months_per_step,
+        'Year': steps / steps_per_year,
+        'BTC_Price': btc,
+        'MSTR_Price': mstr_price_hist,
+        'BTC_Holdings': btc_holdings_hist,
+        'Debt': debt_principal,
+        'Shares': shares_hist,
+        'Premium': premium,
+        'NAV_Per_Share': nav_per_share_hist,
+        'Cash': cash_hist,
+        'Inflows': inflows,
+        'Outflows': outflows,
+        'BTC_Sold': btc_sold
+    })
+
+    return df, collapse_step, collapse_reason
@@ -0,0 +1,24 @@
+"""
+Capital-structure instruments used by the simulation engines.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+# -----------------------------
+# Data Structures
+# -----------------------------
+@dataclass
+class ConvertibleDebt:
+    name: str
+    principal: float
+    maturity_month: int  # Month index from start (e.g., 36 = 3 years out)
+    coupon_rate: float
+    conversion_price: float
+    put_month: Optional[int] = None  # Holder put date (event engine only)
+
+@dataclass
+class PreferredStock:
+    name: str
+    principal: float
+    dividend_rate: float
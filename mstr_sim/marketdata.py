@@ -0,0 +1,210 @@
+"""
+Market data for the simulator: live quotes and daily BTC/MSTR history.
+
+Quotes and share counts are fetched concurrently with an overall timeout.
+Daily closes are kept in a local Parquet file and a refresh only
+downloads the days after the last stored one (re-fetching that day, since
+its close may have been partial). ``FixtureSource`` reads a local CSV
+instead of Yahoo for tests and offline runs.
+"""
+
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import pandas as pd
+
+BTC_TICKER = "BTC-USD"
+MSTR_TICKER = "MSTR"
+TICKERS = (BTC_TICKER, MSTR_TICKER)
+DEFAULT_SHARES = 275_000_000 # Fallback to ~275M
+
+_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+DEFAULT_HISTORY_PATH = os.path.join(_DATA_DIR, "market_history.parquet")
+DEFAULT_FIXTURE_PATH = os.path.join(_DATA_DIR, "market_fixture.csv")
+
+# -----------------------------
+# Data Structures
+# -----------------------------
+@dataclass
+class Quotes:
+    btc_price: float
+    mstr_price: float
+    shares_outstanding: float
+    as_of: pd.Timestamp
+    source: str
+
+# -----------------------------
+# Sources
+# -----------------------------
+def _daily_closes(frame: pd.DataFrame) -> pd.Series:
+    closes = frame['Close']
+    index = pd.DatetimeIndex(closes.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    closes.index = index.normalize()
+    return closes[~closes.index.duplicated(keep='last')]
+
+
+class YahooSource:
+    """Daily closes and share counts from Yahoo Finance (yfinance)."""
+    name = "yahoo"
+
+    def history(self, ticker: str, start: Optional[pd.Timestamp] = None) -> pd.Series:
+        import yfinance as yf
+        t = yf.Ticker(ticker)
+        if start is None:
+            frame = t.history(period="max", interval="1d")
+        else:
+            frame = t.history(start=start.strftime("%Y-%m-%d"), interval="1d")
+        return _daily_closes(frame)
+
+    def shares_outstanding(self, ticker: str) -> Optional[float]:
+        import yfinance as yf
+        t = yf.Ticker(ticker)
+        # fast_info avoids the very slow .info scrape; fall back to it only if needed
+        try:
+            shares = t.fast_info["shares"]
+        except Exception:
+            shares = None
+        if not shares:
+            shares = t.info.get('sharesOutstanding')
+        return float(shares) if shares else None
+
+
+class FixtureSource:
+    """
+    Stand-in for Yahoo that reads a local CSV fixture.
+
+    The CSV has a ``date`` column, one close column per ticker and an
+    optional ``<ticker>_shares`` column.
+    """
+    name = "fixture"
+
+    def __init__(self, path: str = DEFAULT_FIXTURE_PATH):
+        self.path = path
+        self._frame = pd.read_csv(path, comment='#', parse_dates=['date'], index_col='date')
+
+    def history(self, ticker: str, start: Optional[pd.Timestamp] = None) -> pd.Series:
+        closes = self._frame[ticker].dropna()
+        return closes if start is None else closes[closes.index >= start]
+
+    def shares_outstanding(self, ticker: str) -> Optional[float]:
+        column = f"{ticker}_shares"
+        if column not in self._frame:
+            return None
+        return float(self._frame[column].dropna().iloc[-1])
+
+
+def default_source():
+    """Yahoo, unless ``MSTR_SIM_OFFLINE`` is set (then the bundled fixture)."""
+    if os.environ.get("MSTR_SIM_OFFLINE"):
+        return FixtureSource(os.environ.get("MSTR_SIM_FIXTURE", DEFAULT_FIXTURE_PATH))
+    return YahooSource()
+
+# -----------------------------
+# Loader
+# -----------------------------
+class MarketData:
+    """
+    Concurrent, incrementally persisted market-data loader.
+
+    ``refresh()`` tops up the history file for every ticker and fetches
+    the share count in parallel, and raises ``TimeoutError`` if they do
+    not all finish within ``timeout`` seconds. ``history_path=None``
+    keeps the history in memory only. The loader is safe to share
+    between threads.
+    """
+
+    def __init__(self, source=None, history_path: Optional[str] = DEFAULT_HISTORY_PATH,
+                 timeout: float = 10.0):
+        self.source = source or default_source()
+        if isinstance(self.source, FixtureSource) and history_path == DEFAULT_HISTORY_PATH:
+            history_path = None # Never mix fixture closes into the real history file
+        self.history_path = history_path
+        self.timeout = timeout
+        self._history: Optional[pd.DataFrame] = None
+        self._lock = threading.Lock()
+
+    def load_history(self) -> pd.DataFrame:
+        """Stored daily closes, one column per ticker (empty if none yet)."""
+        if self._history is None:
+            if self.history_path and os.path.exists(self.history_path):
+                self._history = pd.read_parquet(self.history_path)
+            else:
+                self._history = pd.DataFrame(columns=list(TICKERS), index=pd.DatetimeIndex([], name='date'),
+                                             dtype=float)
+        return self._history
+
+    def _save_history(self, history: pd.DataFrame):
+        directory = os.path.dirname(self.history_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".parquet.tmp")
+        os.close(fd)
+        try:
+            history.to_parquet(tmp)
+            os.replace(tmp, self.history_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def refresh(self) -> Quotes:
+        # One refresh at a time; concurrent callers wait and reuse the stored history
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> Quotes:
+        history = self.load_history()
+        starts: Dict[str, Optional[pd.Timestamp]] = {}
+        for ticker in TICKERS:
+            stored = history[ticker].dropna() if ticker in history else pd.Series(dtype=float)
+            starts[ticker] = stored.index.max() if len(stored) else None
+
+        pool = ThreadPoolExecutor(max_workers=len(TICKERS) + 1)
+        try:
+            closes = {t: pool.submit(self.source.history, t, starts[t]) for t in TICKERS}
+            shares = pool.submit(self.source.shares_outstanding, MSTR_TICKER)
+            _, pending = wait([*closes.values(), shares], timeout=self.timeout)
+            if pending:
+                raise TimeoutError(f"Market data did not arrive within {self.timeout:g}s")
+        finally:
+            # Never block the caller on stragglers
+            pool.shutdown(wait=False)
+
+        updated = history
+        changed = False
+        for ticker, future in closes.items():
+            new = future.result().astype(float)
+            if not len(new):
+                continue
+            changed = True
+            # Keep stored closes before the restart date, take the rest from the source
+            old = updated[ticker].dropna() if ticker in updated else pd.Series(dtype=float)
+            if starts[ticker] is not None:
+                old = old[old.index < starts[ticker]]
+            column = pd.concat([old, new])
+            updated = updated.reindex(updated.index.union(column.index))
+            updated[ticker] = column
+        updated = updated.sort_index()
+        updated.index.name = 'date'
+
+        if self.history_path and changed:
+            self._save_history(updated)
+        self._history = updated
+
+        btc = updated[BTC_TICKER].dropna()
+        mstr = updated[MSTR_TICKER].dropna()
+        if not len(btc) or not len(mstr):
+            raise ValueError("No market data available")
+        shares_outstanding = shares.result() or DEFAULT_SHARES
+        return Quotes(
+            btc_price=float(btc.iloc[-1]),
+            mstr_price=float(mstr.iloc[-1]),
+            shares_outstanding=float(shares_outstanding),
+            as_of=max(btc.index[-1], mstr.index[-1]),
+            source=self.source.name,
+        )
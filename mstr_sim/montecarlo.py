@@ -0,0 +1,443 @@
+"""
+Batched Monte Carlo simulation of MSTR capital structure.
+
+Runs many stochastic BTC paths at once as ``[paths, months]`` arrays. The
+per-month logic mirrors ``simulate_mstr_monthly`` exactly, but every branch
+is expressed as a mask over the path axis, so a 1,000-path study costs one
+pass over the months instead of 1,000 scalar runs.
+
+With a ``MarketImpact`` the company's own trading feeds back into the
+market (BTC sales push the next month's BTC price down, a compressed
+premium throttles issuance), still as array updates over the path axis.
+"""
+
+import time
+
+import numpy as np
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+from .book import TrancheBook
+from .instruments import ConvertibleDebt, PreferredStock
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Collapse codes stored per path
+NO_COLLAPSE = -1
+COLLAPSE_NONE = 0
+COLLAPSE_INSOLVENCY = 1
+COLLAPSE_LIQUIDITY = 2
+
+COLLAPSE_REASONS = {
+    COLLAPSE_INSOLVENCY: "NAV <= 0 (Insolvency)",
+    COLLAPSE_LIQUIDITY: "Liquidity Crisis (Ran out of BTC)",
+}
+
+# -----------------------------
+# Results
+# -----------------------------
+@dataclass
+class PathResults:
+    """Per-path, per-month output of ``simulate_mstr_paths``.
+
+    Every series is a ``[paths, months]`` array. ``collapse_month`` is
+    ``NO_COLLAPSE`` (-1) for paths that survived the horizon.
+    """
+    btc_price: np.ndarray
+    mstr_price: np.ndarray
+    btc_holdings: np.ndarray
+    debt: np.ndarray
+    shares: np.ndarray
+    premium: np.ndarray
+    nav_per_share: np.ndarray
+    market_cap: np.ndarray
+    cash: np.ndarray
+    inflows: np.ndarray
+    outflows: np.ndarray
+    btc_sold: np.ndarray
+    collapse_month: np.ndarray
+    collapse_code: np.ndarray
+
+    @property
+    def n_paths(self) -> int:
+        return self.btc_price.shape[0]
+
+    @property
+    def n_months(self) -> int:
+        return self.btc_price.shape[1]
+
+    @property
+    def collapsed(self) -> np.ndarray:
+        return self.collapse_month != NO_COLLAPSE
+
+    def collapse_probability(self) -> float:
+        """Fraction of paths that collapsed within the horizon."""
+        return float(self.collapsed.mean())
+
+    def collapse_reason(self, path: int) -> Optional[str]:
+        return COLLAPSE_REASONS.get(int(self.collapse_code[path]))
+
+    def percentiles(self, series: str, q: Sequence[float] = (5, 50, 95)) -> np.ndarray:
+        """Per-month percentiles of a series, shape ``[len(q), months]``."""
+        return np.percentile(getattr(self, series), q, axis=0)
+
+    def path_frame(self, path: int) -> "pd.DataFrame":
+        """One path in the same layout as ``simulate_mstr_monthly``."""
+        import pandas as pd
+
+        months = np.arange(self.n_months)
+        return pd.DataFrame({
+            'Month': months,
+            'Year': months / 12.0,
+            'BTC_Price': self.btc_price[path],
+            'MSTR_Price': self.mstr_price[path],
+            'BTC_Holdings': self.btc_holdings[path],
+            'Debt': self.debt[path],
+            'Shares': self.shares[path],
+            'Premium': self.premium[path],
+            'NAV_Per_Share': self.nav_per_share[path],
+            'Cash': self.cash[path],
+            'Inflows': self.inflows[path],
+            'Outflows': self.outflows[path],
+            'BTC_Sold': self.btc_sold[path],
+        })
+
+# -----------------------------
+# BTC Paths
+# -----------------------------
+def generate_btc_paths(
+    n_paths: int,
+    n_months: int,
+    btc_price_start: float,
+    btc_growth_annual: float,
+    btc_volatility_annual: float,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    Geometric Brownian motion BTC price paths, shape ``[paths, months]``.
+
+    The drift is set so the expected price follows the deterministic
+    ``(1 + btc_growth_annual) ** (t / 12)`` trend; with zero volatility
+    every path equals the deterministic path. Inputs may be scalars or
+    ``[paths]`` arrays.
+    """
+    start = np.asarray(btc_price_start, dtype=float)[..., None]
+    growth = np.asarray(btc_growth_annual, dtype=float)[..., None]
+    volatility = np.asarray(btc_volatility_annual, dtype=float)[..., None]
+
+    paths = np.empty((n_paths, n_months))
+    paths[:, :1] = start
+    if n_months < 2:
+        return paths
+
+    monthly_vol = volatility / np.sqrt(12.0)
+    drift = np.log1p(growth) / 12.0 - 0.5 * monthly_vol ** 2
+    log_returns = drift + monthly_vol * rng.standard_normal((n_paths, n_months - 1))
+    paths[:, 1:] = start * np.exp(np.cumsum(log_returns, axis=1))
+    return paths
+
+# -----------------------------
+# Premium
+# -----------------------------
+def drawdown_premium(btc_price: np.ndarray, base_premium, premium_drawdown: float) -> np.ndarray:
+    """
+    Premium that compresses with each path's realized drawdown.
+
+    The premium over NAV shrinks linearly from ``base_premium`` at a new
+    high to 1.0x (NAV) once BTC is ``premium_drawdown`` (e.g. 0.5 = 50%)
+    below its running peak. A base premium at or below 1.0x is left as is.
+    ``btc_price`` is ``[..., months]``.
+    """
+    btc_price = np.asarray(btc_price, dtype=float)
+    base = np.asarray(base_premium, dtype=float)
+    if base.ndim:
+        base = base[..., None]
+    drawdown = 1.0 - btc_price / np.maximum.accumulate(btc_price, axis=-1)
+    compression = np.minimum(1.0, drawdown / premium_drawdown)
+    return base - np.maximum(base - 1.0, 0.0) * compression
+
+# -----------------------------
+# Market Impact
+# -----------------------------
+@dataclass
+class MarketImpact:
+    """
+    Reflexive coupling between the company and the BTC market.
+
+    - BTC flow -> price: every month's net BTC sold (sold minus bought)
+      shifts the log BTC price of the following months by
+      ``-net_sold / depth_btc`` (10,000 BTC on a 1,000,000 BTC depth is
+      about -1%). The accumulated shift fades by ``recovery`` per month
+      (0 = permanent). Purchases lift the price unless
+      ``purchases_move_price`` is off.
+    - Premium -> issuance: issuance capacity scales with
+      ``(premium / base_premium) ** issuance_elasticity``, so a premium
+      compressed towards NAV raises less (0 = no coupling).
+    - Issuance -> purchases: what is raised above obligations buys BTC as
+      usual, and those purchases count in the next month's flow.
+
+    The dynamic premium then reacts to the impacted BTC price.
+    """
+    depth_btc: float = 1_000_000.0
+    recovery: float = 0.0
+    issuance_elasticity: float = 1.0
+    purchases_move_price: bool = True
+
+# -----------------------------
+# Batched Simulation
+# -----------------------------
+def simulate_mstr_paths(
+    n_paths: int,
+    n_months: int,
+    btc_price_start: float,
+    btc_growth_annual: float,
+    btc_volatility_annual: float,
+    btc_holdings_start: float,
+    cash_start: float,
+    shares_start: float,
+    convertible_debts: List[ConvertibleDebt],
+    preferred_stocks: List[PreferredStock],
+    operating_burn_annual: float,
+    issuance_capacity_pct_annual: float,
+    base_premium: float,
+    dynamic_premium: bool,
+    seed: Optional[int] = None,
+    btc_paths: Optional[np.ndarray] = None,
+    generator=None,
+    premium_drawdown: Optional[float] = None,
+    tranche_weights: Optional[np.ndarray] = None,
+    pref_weights: Optional[np.ndarray] = None,
+    market_impact: Optional[MarketImpact] = None,
+    phase_times: Optional[Dict[str, float]] = None,
+) -> PathResults:
+    """
+    Monte Carlo version of ``simulate_mstr_monthly``.
+
+    Takes the same inputs plus ``n_paths`` and an optional ``seed``. BTC
+    paths are drawn from ``generator`` (see ``mstr_sim.paths``; GBM from
+    the growth/volatility inputs by default) unless ``btc_paths`` is
+    given. The dynamic premium decays on months where a path's BTC price
+    fell and recovers otherwise, which reduces to the scalar rule when
+    volatility is zero. With ``premium_drawdown`` set it follows each
+    path's realized drawdown instead (see ``drawdown_premium``).
+
+    The scalar inputs (prices, growth, holdings, cash, shares, burn,
+    issuance capacity, premium) may also be ``[paths]`` arrays, giving
+    every path its own value; the breakeven solver relies on this.
+    ``tranche_weights`` (``[paths, tranches]``) scales each tranche's
+    principal per path, so paths can hold different variants of the same
+    note (e.g. a 0/1 choice between two conversion prices); the
+    sensitivity report relies on this. ``pref_weights`` (``[paths, prefs]``)
+    does the same for the preferreds, so paths can also be different
+    issuers with their own books (see ``mstr_sim.portfolio``).
+
+    ``market_impact`` couples the company's trading to the BTC price and
+    its premium to issuance (see ``MarketImpact``); ``btc_price`` in the
+    results is then the impacted path. Paths do not move each other's
+    price.
+
+    ``phase_times`` accumulates seconds per phase as in
+    ``simulate_mstr_monthly``, plus ``paths`` for drawing the BTC paths.
+    """
+    timed = phase_times is not None
+    if timed:
+        for phase in ("paths", "pricing", "obligations", "maturity_scan", "funding"):
+            phase_times.setdefault(phase, 0.0)
+        t0 = time.perf_counter()
+    if btc_paths is None:
+        rng = np.random.default_rng(seed)
+        if generator is not None:
+            btc = generator.generate(n_paths, n_months, btc_price_start, rng)
+        else:
+            btc = generate_btc_paths(n_paths, n_months, btc_price_start,
+                                     btc_growth_annual, btc_volatility_annual, rng)
+    else:
+        btc = np.asarray(btc_paths, dtype=float)
+        n_paths, n_months = btc.shape
+    if market_impact is not None:
+        # The drawn paths are the exogenous market; btc becomes the impacted price
+        exogenous, btc = btc, btc.copy()
+        log_impact = np.zeros(n_paths)
+        bought = np.zeros(n_paths)
+        peak = btc[:, 0].copy()
+    if timed:
+        phase_times['paths'] += time.perf_counter() - t0
+
+    shape = (n_paths, n_months)
+    mstr_price = np.zeros(shape)
+    premium = np.zeros(shape)
+    holdings = np.zeros(shape)
+    cash = np.zeros(shape)
+    shares = np.zeros(shape)
+    debt = np.zeros(shape)
+    nav_per_share = np.zeros(shape)
+    market_cap = np.zeros(shape)
+    inflows = np.zeros(shape)
+    outflows = np.zeros(shape)
+    btc_sold = np.zeros(shape)
+
+    holdings[:, 0] = btc_holdings_start
+    cash[:, 0] = cash_start
+    shares[:, 0] = shares_start
+    premium[:, 0] = base_premium
+    if dynamic_premium and premium_drawdown and market_impact is None:
+        # Depends only on the BTC path, so the whole matrix is computed up front
+        premium[:] = drawdown_premium(btc, base_premium, premium_drawdown)
+
+    # A path settles a tranche only if it is still alive at maturity, so the
+    # shared book index plus running per-path totals are enough.
+    book = TrancheBook(convertible_debts, preferred_stocks)
+    if tranche_weights is None:
+        debt_total = np.full(n_paths, book.debt_total)
+        interest_total = np.full(n_paths, book.annual_interest)
+    else:
+        tranche_weights = np.asarray(tranche_weights, dtype=float)
+        debt_total = tranche_weights @ book.principal
+        interest_total = tranche_weights @ (book.principal * book.coupon_rate)
+    if pref_weights is None:
+        pref_total = book.pref_total
+        monthly_dividends = book.annual_dividends / 12.0
+    else:
+        pref_weights = np.asarray(pref_weights, dtype=float)
+        pref_total = pref_weights @ book.pref_principal
+        monthly_dividends = pref_weights @ (book.pref_principal * book.pref_dividend_rate) / 12.0
+    monthly_ops_burn = operating_burn_annual / 12.0
+    monthly_issuance = issuance_capacity_pct_annual / 12.0
+    if market_impact is not None and market_impact.issuance_elasticity:
+        base = np.broadcast_to(np.asarray(base_premium, dtype=float), (n_paths,))
+        inv_base_premium = np.divide(1.0, base, out=np.zeros(n_paths), where=base > 0)
+
+    alive = np.ones(n_paths, dtype=bool)
+    collapse_month = np.full(n_paths, NO_COLLAPSE, dtype=np.int64)
+    collapse_code = np.full(n_paths, COLLAPSE_NONE, dtype=np.int8)
+
+    for i in range(n_months):
+        if timed:
+            t0 = time.perf_counter()
+        if i > 0:
+            holdings[:, i] = holdings[:, i-1]
+            cash[:, i] = cash[:, i-1]
+            shares[:, i] = shares[:, i-1]
+
+            if market_impact is not None:
+                # Last month's net flow moves this month's price
+                net_sold = btc_sold[:, i-1] - bought if market_impact.purchases_move_price else btc_sold[:, i-1]
+                log_impact = log_impact * (1.0 - market_impact.recovery) - net_sold / market_impact.depth_btc
+                btc[:, i] = exogenous[:, i] * np.exp(log_impact)
+                bought[:] = 0.0
+
+            if dynamic_premium and premium_drawdown and market_impact is not None:
+                # Same rule as drawdown_premium, one month at a time on the impacted price
+                np.maximum(peak, btc[:, i], out=peak)
+                compression = np.minimum(1.0, (1.0 - btc[:, i] / peak) / premium_drawdown)
+                premium[:, i] = base_premium - np.maximum(np.asarray(base_premium) - 1.0, 0.0) * compression
+            elif dynamic_premium and premium_drawdown:
+                pass # Precomputed from the drawdown above
+            elif dynamic_premium:
+                prev = premium[:, i-1]
+                falling = btc[:, i] < btc[:, i-1]
+                premium[:, i] = np.where(falling,
+                                         np.maximum(1.0, prev * 0.95),
+                                         np.minimum(base_premium, prev * 1.02))
+            else:
+                premium[:, i] = base_premium
+
+        # NAV and stock price
+        assets = btc[:, i] * holdings[:, i] + cash[:, i]
+        debt[:, i] = debt_total
+        equity = np.maximum(0.0, assets - debt_total - pref_total)
+        nav = np.divide(equity, shares[:, i], out=np.zeros(n_paths), where=shares[:, i] > 0)
+        nav_per_share[:, i] = nav
+
+        insolvent = nav <= 0
+        newly_insolvent = insolvent & alive
+        collapse_month[newly_insolvent] = i
+        collapse_code[newly_insolvent] = COLLAPSE_INSOLVENCY
+        alive &= ~insolvent
+
+        mstr_price[:, i] = np.where(insolvent, 0.0, nav * premium[:, i])
+        market_cap[:, i] = mstr_price[:, i] * shares[:, i]
+        if timed:
+            t1 = time.perf_counter()
+            phase_times['pricing'] += t1 - t0
+
+        if not alive.any():
+            continue
+
+        # Obligations (interest is charged before maturing tranches leave the book)
+        obligations = monthly_ops_burn + interest_total / 12.0 + monthly_dividends
+        if timed:
+            t2 = time.perf_counter()
+            phase_times['obligations'] += t2 - t1
+
+        maturing = book.maturing(i)
+        if maturing.size:
+            principal = book.principal[maturing]
+            conv_price = book.conversion_price[maturing]
+            converts = alive[:, None] & (mstr_price[:, i, None] > conv_price)
+            repays = alive[:, None] & ~converts
+            if tranche_weights is None:
+                shares[:, i] += converts @ (principal / conv_price)
+                obligations = obligations + repays @ principal
+                debt_total[alive] -= principal.sum()
+                interest_total[alive] -= (principal * book.coupon_rate[maturing]).sum()
+            else:
+                # Per-path principal: [paths, maturing]
+                principal = tranche_weights[:, maturing] * principal
+                shares[:, i] += (converts * principal) @ (1.0 / conv_price)
+                obligations = obligations + (repays * principal).sum(axis=1)
+                debt_total[alive] -= principal[alive].sum(axis=1)
+                interest_total[alive] -= principal[alive] @ book.coupon_rate[maturing]
+        if timed:
+            t3 = time.perf_counter()
+            phase_times['maturity_scan'] += t3 - t2
+
+        outflows[:, i] = np.where(alive, obligations, 0.0)
+
+        # Funding
+        raised = monthly_issuance * market_cap[:, i]
+        if market_impact is not None and market_impact.issuance_elasticity:
+            # A premium compressed below its target raises less
+            raised = raised * np.minimum(1.0, premium[:, i] * inv_base_premium) ** market_impact.issuance_elasticity
+        inflows[:, i] = np.where(alive, raised, 0.0)
+        cash_available = cash[:, i] + raised
+
+        covered = alive & (cash_available >= obligations)
+        surplus = cash_available - obligations
+        holdings[:, i] = np.where(covered, holdings[:, i] + surplus * 0.9 / btc[:, i], holdings[:, i])
+        if market_impact is not None:
+            bought[:] = np.where(covered, surplus * 0.9 / btc[:, i], 0.0)
+        cash[:, i] = np.where(covered, surplus * 0.1, cash[:, i])
+
+        short = alive & ~covered
+        btc_needed = -surplus / btc[:, i]
+        ran_out = short & (btc_needed > holdings[:, i])
+        sells = short & ~ran_out
+
+        btc_sold[:, i] = np.where(ran_out, holdings[:, i], np.where(sells, btc_needed, 0.0))
+        holdings[:, i] = np.where(ran_out, 0.0, np.where(sells, holdings[:, i] - btc_needed, holdings[:, i]))
+        cash[:, i] = np.where(sells, 0.0, cash[:, i])
+
+        collapse_month[ran_out] = i
+        collapse_code[ran_out] = COLLAPSE_LIQUIDITY
+        alive &= ~ran_out
+        if timed:
+            phase_times['funding'] += time.perf_counter() - t3
+
+    return PathResults(
+        btc_price=btc,
+        mstr_price=mstr_price,
+        btc_holdings=holdings,
+        debt=debt,
+        shares=shares,
+        premium=premium,
+        nav_per_share=nav_per_share,
+        market_cap=market_cap,
+        cash=cash,
+        inflows=inflows,
+        outflows=outflows,
+        btc_sold=btc_sold,
+        collapse_month=collapse_month,
+        collapse_code=collapse_code,
+    )
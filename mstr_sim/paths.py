@@ -0,0 +1,225 @@
+"""
+Pluggable BTC path generators.
+
+Every generator is a small dataclass with
+``generate(n_paths, n_months, btc_price_start, rng)`` returning a
+``[paths, months]`` price array, vectorized over paths:
+
+- ``GBM``: geometric Brownian motion (the default of ``simulate_mstr_paths``)
+- ``BlockBootstrap``: resampled blocks of historical monthly returns
+- ``RegimeSwitching``: two-state bull/bear Markov model
+
+``CachedGenerator`` wraps any of them and stores the generated paths as
+``.npy`` files (up to a size cap) that are reloaded memory-mapped, so
+repeated studies with the same seed reuse them instead of regenerating.
+
+Being dataclasses, generators hash into ``input_key`` like any other
+simulation input.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+from dataclasses import dataclass
+from typing import Optional
+
+from .cache import input_key
+from .montecarlo import generate_btc_paths
+
+DAYS_PER_MONTH = 30
+
+# -----------------------------
+# Generators
+# -----------------------------
+@dataclass
+class GBM:
+    """Geometric Brownian motion around a ``(1 + growth) ** (t / 12)`` trend."""
+    btc_growth_annual: float
+    btc_volatility_annual: float
+
+    def generate(self, n_paths: int, n_months: int, btc_price_start, rng: np.random.Generator) -> np.ndarray:
+        return generate_btc_paths(n_paths, n_months, btc_price_start,
+                                  self.btc_growth_annual, self.btc_volatility_annual, rng)
+
+
+@dataclass
+class BlockBootstrap:
+    """
+    Block bootstrap of historical monthly log returns.
+
+    ``closes`` are daily closes (e.g. the ``BTC-USD`` column of
+    ``MarketData.load_history()``). Monthly returns are taken over every
+    ``days_per_month``-day window, and each path is stitched together from
+    randomly started blocks of ``block_months`` consecutive months, which
+    keeps volatility clustering and momentum within a block. With
+    ``btc_growth_annual`` set, returns are re-centred on that growth rate
+    so the history supplies only the shape of the moves.
+    """
+    closes: np.ndarray
+    block_months: int = 6
+    days_per_month: int = DAYS_PER_MONTH
+    btc_growth_annual: Optional[float] = None
+
+    @classmethod
+    def from_history(cls, history, ticker: str = "BTC-USD", **kwargs) -> "BlockBootstrap":
+        """From a ``MarketData.load_history()`` frame."""
+        closes = history[ticker].dropna().to_numpy(dtype=float)
+        return cls(closes=closes, **kwargs)
+
+    def monthly_returns(self) -> np.ndarray:
+        log_close = np.log(np.asarray(self.closes, dtype=float))
+        d = self.days_per_month
+        return log_close[d:] - log_close[:-d]
+
+    def generate(self, n_paths: int, n_months: int, btc_price_start, rng: np.random.Generator) -> np.ndarray:
+        start = np.asarray(btc_price_start, dtype=float)[..., None]
+        paths = np.empty((n_paths, n_months))
+        paths[:, :1] = start
+        if n_months < 2:
+            return paths
+
+        returns = self.monthly_returns()
+        d = self.days_per_month
+        n_starts = len(returns) - (self.block_months - 1) * d
+        if n_starts <= 0:
+            raise ValueError(f"BTC history too short for {self.block_months}-month blocks "
+                             f"({len(self.closes)} daily closes)")
+        if self.btc_growth_annual is not None:
+            returns = returns - returns.mean() + np.log1p(self.btc_growth_annual) / 12.0
+
+        # Block starts [paths, blocks] -> day offsets of every month in each block
+        n_blocks = -(-(n_months - 1) // self.block_months)
+        starts = rng.integers(0, n_starts, (n_paths, n_blocks), dtype=np.int32)
+        offsets = (np.arange(self.block_months, dtype=np.int32) * d)
+        idx = (starts[:, :, None] + offsets).reshape(n_paths, -1)[:, :n_months - 1]
+        paths[:, 1:] = start * np.exp(np.cumsum(returns[idx], axis=1))
+        return paths
+
+
+@dataclass
+class RegimeSwitching:
+    """
+    Two-state (bull/bear) regime model.
+
+    Each month a path stays in its regime or switches with the given
+    monthly probabilities; returns are lognormal with the regime's annual
+    growth and volatility. Paths start in the bull regime unless
+    ``start_in_bull`` is False.
+    """
+    bull_growth_annual: float = 0.8
+    bull_volatility_annual: float = 0.5
+    bear_growth_annual: float = -0.5
+    bear_volatility_annual: float = 0.8
+    p_bull_to_bear: float = 1 / 30
+    p_bear_to_bull: float = 1 / 12
+    start_in_bull: bool = True
+
+    def generate(self, n_paths: int, n_months: int, btc_price_start, rng: np.random.Generator) -> np.ndarray:
+        start = np.asarray(btc_price_start, dtype=float)[..., None]
+        paths = np.empty((n_paths, n_months))
+        paths[:, :1] = start
+        if n_months < 2:
+            return paths
+
+        # Regime per path and month: only the switch decision is sequential
+        switch = rng.random((n_paths, n_months - 1))
+        bull = np.empty((n_paths, n_months - 1), dtype=bool)
+        state = np.full(n_paths, self.start_in_bull)
+        for i in range(n_months - 1):
+            state = np.where(state, switch[:, i] >= self.p_bull_to_bear, switch[:, i] < self.p_bear_to_bull)
+            bull[:, i] = state
+
+        vol = np.where(bull, self.bull_volatility_annual, self.bear_volatility_annual) / np.sqrt(12.0)
+        drift = np.where(bull, np.log1p(self.bull_growth_annual), np.log1p(self.bear_growth_annual)) / 12.0
+        log_returns = drift - 0.5 * vol ** 2 + vol * rng.standard_normal((n_paths, n_months - 1))
+        paths[:, 1:] = start * np.exp(np.cumsum(log_returns, axis=1))
+        return paths
+
+# -----------------------------
+# Path Cache
+# -----------------------------
+@dataclass
+class CachedGenerator:
+    """
+    Stores another generator's paths under ``directory`` and memory-maps them back.
+
+    Files are keyed by the generator, the shape, the start price and the
+    state of ``rng`` when ``generate`` is called, so the same seed always
+    maps to the same file. The returned array is read-only. Next to the
+    paths the state ``rng`` is left in is stored, and a cache hit restores
+    it, so later draws from ``rng`` do not depend on the cache. At most
+    ``max_bytes`` of paths are kept; the least recently used files are
+    evicted first.
+    """
+    generator: object
+    directory: str
+    max_bytes: int = 2**30
+
+    def _path(self, n_paths, n_months, btc_price_start, rng: np.random.Generator) -> str:
+        state = json.dumps(rng.bit_generator.state, sort_keys=True, default=str)
+        key = input_key("btc_paths", generator=self.generator, n_paths=n_paths, n_months=n_months,
+                        btc_price_start=btc_price_start,
+                        rng=hashlib.sha256(state.encode()).hexdigest())
+        return os.path.join(self.directory, key + ".npy")
+
+    def generate(self, n_paths: int, n_months: int, btc_price_start, rng: np.random.Generator) -> np.ndarray:
+        path = self._path(n_paths, n_months, btc_price_start, rng)
+        try:
+            with open(path + ".rng") as f:
+                state = json.load(f)
+            paths = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            pass
+        else:
+            rng.bit_generator.state = state
+            try:
+                os.utime(path)  # mark as recently used for eviction
+            except OSError:
+                pass
+            return paths
+        paths = self.generator.generate(n_paths, n_months, btc_price_start, rng)
+        os.makedirs(self.directory, exist_ok=True)
+        # The rng state goes first: paths without it are treated as a miss
+        _write_atomic(path + ".rng", lambda f: f.write(json.dumps(rng.bit_generator.state).encode()))
+        _write_atomic(path, lambda f: np.save(f, paths))
+        self._evict(keep=path)
+        return np.load(path, mmap_mode='r')
+
+    def _evict(self, keep: str):
+        """Drop the least recently used paths files until at most ``max_bytes`` remain."""
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npy"):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            for stale in (path, path + ".rng"):
+                try:
+                    os.unlink(stale)
+                except OSError:
+                    pass
+            total -= size
+
+
+def _write_atomic(path: str, write):
+    """Call ``write`` on a temp file and rename it to ``path``."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
@@ -0,0 +1,348 @@
+"""
+Portfolio mode: several Bitcoin treasury companies on the same BTC paths.
+
+    portfolio = load_portfolio("scenarios/treasury_portfolio.json")
+    result = simulate_portfolio(**portfolio, n_paths=10000, seed=1)
+    result.frame()               # per-company collapse probability, final NAV
+    result.correlation_frame()   # pairwise collapse correlation
+
+Each company has its own holdings, cash, share count, burn, issuance
+capacity, premium and capital structure; the BTC market (start price,
+growth, volatility or a path generator) is shared. The company axis is
+folded into the path axis of a single ``simulate_mstr_paths`` call per
+chunk: every company gets a copy of the chunk's BTC paths, its scalars
+become ``[paths]`` arrays and the notes/preferreds of all companies form
+one book in which each row only weights its own company's instruments
+(``tranche_weights`` / ``pref_weights``). Companies with different
+premium rules run as separate calls on the same paths.
+
+A portfolio file holds the market inputs and a ``companies`` list of
+scenario-style mappings::
+
+    {
+        "n_years": 10,
+        "btc_volatility_annual": 0.6,
+        "companies": [
+            {"name": "MSTR", "btc_holdings_start": 386000, "shares_start": 225e6,
+             "convertible_debts": [{"name": "Notes 2028", "principal": 1e9, ...}]},
+            {"name": "Smaller Co", "btc_holdings_start": 5000, ...}
+        ]
+    }
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .instruments import ConvertibleDebt, PreferredStock
+from .montecarlo import COLLAPSE_REASONS, NO_COLLAPSE, generate_btc_paths, simulate_mstr_paths
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Shared by every company
+MARKET_INPUTS = ("n_months", "btc_price_start", "btc_growth_annual", "btc_volatility_annual")
+
+# Per-company scalars the batched engine accepts as [paths] arrays
+SCALAR_INPUTS = (
+    "btc_holdings_start",
+    "cash_start",
+    "shares_start",
+    "operating_burn_annual",
+    "issuance_capacity_pct_annual",
+    "base_premium",
+)
+
+# -----------------------------
+# Companies
+# -----------------------------
+@dataclass
+class Company:
+    """One treasury company: everything ``simulate_mstr_paths`` takes except the BTC market."""
+    name: str
+    btc_holdings_start: float
+    shares_start: float
+    cash_start: float = 0.0
+    convertible_debts: List[ConvertibleDebt] = field(default_factory=list)
+    preferred_stocks: List[PreferredStock] = field(default_factory=list)
+    operating_burn_annual: float = 0.0
+    issuance_capacity_pct_annual: float = 0.25
+    base_premium: float = 1.0
+    dynamic_premium: bool = True
+    premium_drawdown: Optional[float] = None
+
+    @classmethod
+    def from_inputs(cls, name: str, inputs: Dict[str, Any]) -> "Company":
+        """Company from ``simulate_mstr_monthly`` keyword arguments (market inputs are ignored)."""
+        fields = {k: v for k, v in inputs.items() if k in cls.__dataclass_fields__}
+        return cls(name=name, **fields)
+
+    def inputs(self) -> Dict[str, Any]:
+        """The company's keyword arguments for ``simulate_mstr_paths``."""
+        out = {k: getattr(self, k) for k in self.__dataclass_fields__ if k != "name"}
+        out["convertible_debts"] = list(self.convertible_debts)
+        out["preferred_stocks"] = list(self.preferred_stocks)
+        return out
+
+
+def portfolio_inputs(portfolio: Dict[str, Any]) -> Dict[str, Any]:
+    """Keyword arguments for ``simulate_portfolio`` built from a portfolio mapping."""
+    from .scenario import DEFAULT_INPUTS
+
+    portfolio = dict(portfolio)
+    companies = portfolio.pop("companies", None)
+    if not companies:
+        raise ValueError("A portfolio needs a non-empty 'companies' list")
+    n_years = portfolio.pop("n_years", None)
+    unknown = sorted(set(portfolio) - set(MARKET_INPUTS))
+    if unknown:
+        raise ValueError(f"Unknown portfolio keys: {unknown} (company inputs go under 'companies')")
+
+    inputs = {k: DEFAULT_INPUTS[k] for k in MARKET_INPUTS}
+    inputs.update(portfolio)
+    if n_years is not None:
+        inputs["n_months"] = int(round(float(n_years) * 12))
+    inputs["n_months"] = int(inputs["n_months"])
+
+    parsed = []
+    for i, company in enumerate(companies):
+        if isinstance(company, Company):
+            parsed.append(company)
+            continue
+        company = dict(company)
+        company.setdefault("name", f"Company {i + 1}")
+        company["convertible_debts"] = [d if isinstance(d, ConvertibleDebt) else ConvertibleDebt(**d)
+                                        for d in company.get("convertible_debts", [])]
+        company["preferred_stocks"] = [p if isinstance(p, PreferredStock) else PreferredStock(**p)
+                                       for p in company.get("preferred_stocks", [])]
+        unknown = sorted(set(company) - set(Company.__dataclass_fields__))
+        if unknown:
+            raise ValueError(f"Unknown keys for company {company['name']!r}: {unknown}")
+        parsed.append(Company(**company))
+    names = [c.name for c in parsed]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Company names must be unique, got {names}")
+    inputs["companies"] = parsed
+    return inputs
+
+
+def load_portfolio(path: str) -> Dict[str, Any]:
+    """Read a JSON or YAML portfolio file and return ``simulate_portfolio`` inputs."""
+    with open(path) as f:
+        if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Reading YAML portfolios requires PyYAML (pip install pyyaml)") from None
+            data = yaml.safe_load(f) or {}
+        else:
+            data = json.load(f)
+    return portfolio_inputs(data)
+
+# -----------------------------
+# Results
+# -----------------------------
+@dataclass
+class PortfolioResults:
+    """
+    Per-company outcomes on common BTC paths.
+
+    Arrays are ``[companies, paths]`` in the order of ``names``; path ``p``
+    is the same BTC path for every company. ``final_nav_per_share`` and
+    ``final_mstr_price`` are 0 once a company collapsed.
+    """
+    names: List[str]
+    n_months: int
+    collapse_month: np.ndarray
+    collapse_code: np.ndarray
+    final_nav_per_share: np.ndarray
+    final_mstr_price: np.ndarray
+    final_btc_price: np.ndarray  # [paths]
+
+    @property
+    def n_companies(self) -> int:
+        return len(self.names)
+
+    @property
+    def n_paths(self) -> int:
+        return self.collapse_month.shape[1]
+
+    @property
+    def collapsed(self) -> np.ndarray:
+        return self.collapse_month != NO_COLLAPSE
+
+    def collapsed_by(self, month: int) -> np.ndarray:
+        """``[companies, paths]``: collapsed at or before ``month``."""
+        return self.collapsed & (self.collapse_month <= month)
+
+    def collapse_probability(self) -> np.ndarray:
+        """Per-company fraction of paths that collapsed within the horizon."""
+        return self.collapsed.mean(axis=1)
+
+    def joint_collapse_probability(self) -> np.ndarray:
+        """``[companies, companies]``: fraction of paths where both collapsed."""
+        collapsed = self.collapsed.astype(float)
+        return collapsed @ collapsed.T / max(self.n_paths, 1)
+
+    def collapse_correlation(self) -> np.ndarray:
+        """
+        ``[companies, companies]`` correlation of the collapse indicators
+        (phi coefficient); NaN for a company that always or never collapses.
+        """
+        p = self.collapse_probability()
+        cov = self.joint_collapse_probability() - np.outer(p, p)
+        sd = np.sqrt(p * (1.0 - p))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.outer(sd, sd)
+        corr[np.outer(sd, sd) == 0] = np.nan
+        return corr
+
+    def collapse_count_distribution(self) -> np.ndarray:
+        """Probability that exactly ``k`` companies collapse, for ``k = 0..companies``."""
+        counts = self.collapsed.sum(axis=0)
+        return np.bincount(counts, minlength=self.n_companies + 1) / max(self.n_paths, 1)
+
+    def frame(self) -> "pd.DataFrame":
+        """One row per company."""
+        import pandas as pd
+
+        median_month, main_reason = [], []
+        for months, codes in zip(self.collapse_month, self.collapse_code):
+            hit = months != NO_COLLAPSE
+            median_month.append(float(np.median(months[hit])) if hit.any() else np.nan)
+            main_reason.append(COLLAPSE_REASONS[int(np.bincount(codes[hit]).argmax())] if hit.any() else "")
+        return pd.DataFrame({
+            'Company': self.names,
+            'Collapse_Probability': self.collapse_probability(),
+            'Median_Collapse_Month': median_month,
+            'Main_Reason': main_reason,
+            'Mean_Final_NAV_Per_Share': self.final_nav_per_share.mean(axis=1),
+            'Median_Final_MSTR_Price': np.median(self.final_mstr_price, axis=1),
+        })
+
+    def correlation_frame(self) -> "pd.DataFrame":
+        import pandas as pd
+
+        return pd.DataFrame(self.collapse_correlation(), index=self.names, columns=self.names)
+
+# -----------------------------
+# Simulation
+# -----------------------------
+def _group(companies: Sequence[Company]) -> tuple:
+    """Union book, tranche/pref weights and scalar arrays for companies sharing a premium rule."""
+    debts: List[ConvertibleDebt] = []
+    prefs: List[PreferredStock] = []
+    tranche_weights = np.zeros((len(companies), sum(len(c.convertible_debts) for c in companies)))
+    pref_weights = np.zeros((len(companies), sum(len(c.preferred_stocks) for c in companies)))
+    for k, company in enumerate(companies):
+        tranche_weights[k, len(debts):len(debts) + len(company.convertible_debts)] = 1.0
+        pref_weights[k, len(prefs):len(prefs) + len(company.preferred_stocks)] = 1.0
+        debts += company.convertible_debts
+        prefs += company.preferred_stocks
+    scalars = {name: np.array([float(getattr(c, name)) for c in companies]) for name in SCALAR_INPUTS}
+    return debts, prefs, tranche_weights, pref_weights, scalars
+
+
+def simulate_portfolio(
+    companies: Sequence[Company],
+    n_paths: int,
+    n_months: int,
+    btc_price_start: float,
+    btc_growth_annual: float,
+    btc_volatility_annual: float,
+    seed: Optional[int] = None,
+    generator=None,
+    btc_paths: Optional[np.ndarray] = None,
+    chunk_size: Optional[int] = None,
+    memory_budget_mb: float = 256.0,
+) -> PortfolioResults:
+    """
+    Simulate every company in ``companies`` on the same ``n_paths`` BTC
+    paths (GBM from the market inputs, ``generator`` if given, or the
+    explicit ``[paths, months]`` ``btc_paths``).
+
+    Paths are processed in chunks of ``chunk_size`` (sized from
+    ``memory_budget_mb`` by default), each one batched over companies and
+    paths at once. A company's results equal ``simulate_mstr_paths`` run
+    alone on the same BTC paths.
+    """
+    companies = list(companies)
+    if not companies:
+        raise ValueError("simulate_portfolio needs at least one company")
+    if btc_paths is not None:
+        btc_paths = np.asarray(btc_paths, dtype=float)
+        n_paths, n_months = btc_paths.shape
+    n_companies = len(companies)
+
+    # Companies with the same premium rule share one engine call
+    groups: Dict[tuple, List[int]] = {}
+    for k, company in enumerate(companies):
+        rule = (bool(company.dynamic_premium), company.premium_drawdown or None)
+        groups.setdefault(rule, []).append(k)
+    batches = [(rule, members, _group([companies[k] for k in members])) for rule, members in groups.items()]
+
+    if chunk_size is None:
+        # PathResults holds 12 float series plus the BTC paths and temporaries
+        bytes_per_path = n_companies * max(n_months, 1) * 8 * 16
+        chunk_size = max(1, int(memory_budget_mb * 2**20 // bytes_per_path))
+    chunk_size = min(chunk_size, max(n_paths, 1))
+
+    collapse_month = np.empty((n_companies, n_paths), dtype=np.int64)
+    collapse_code = np.empty((n_companies, n_paths), dtype=np.int8)
+    final_nav = np.empty((n_companies, n_paths))
+    final_price = np.empty((n_companies, n_paths))
+    final_btc = np.empty(n_paths)
+
+    starts = range(0, n_paths, chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    for start, chunk_seed in zip(starts, seeds):
+        n = min(chunk_size, n_paths - start)
+        cols = slice(start, start + n)
+        if btc_paths is not None:
+            btc = btc_paths[cols]
+        else:
+            rng = np.random.default_rng(chunk_seed)
+            if generator is not None:
+                btc = generator.generate(n, n_months, btc_price_start, rng)
+            else:
+                btc = generate_btc_paths(n, n_months, btc_price_start, btc_growth_annual,
+                                         btc_volatility_annual, rng)
+        final_btc[cols] = btc[:, -1]
+
+        for (dynamic_premium, premium_drawdown), members, (debts, prefs, tw, pw, scalars) in batches:
+            m = len(members)
+            # Company-major rows: row k * n + p is company k on path p
+            result = simulate_mstr_paths(
+                n_paths=m * n,
+                n_months=n_months,
+                btc_price_start=btc_price_start,
+                btc_growth_annual=btc_growth_annual,
+                btc_volatility_annual=0.0,
+                btc_paths=np.broadcast_to(btc, (m, n, n_months)).reshape(m * n, n_months),
+                convertible_debts=debts,
+                preferred_stocks=prefs,
+                dynamic_premium=dynamic_premium,
+                premium_drawdown=premium_drawdown,
+                tranche_weights=np.repeat(tw, n, axis=0),
+                pref_weights=np.repeat(pw, n, axis=0),
+                **{name: np.repeat(values, n) for name, values in scalars.items()},
+            )
+            collapse_month[members, cols] = result.collapse_month.reshape(m, n)
+            collapse_code[members, cols] = result.collapse_code.reshape(m, n)
+            # A liquidity collapse can leave a positive NAV behind; report it as 0
+            alive = (result.collapse_month == NO_COLLAPSE).reshape(m, n)
+            final_nav[members, cols] = np.where(alive, result.nav_per_share[:, -1].reshape(m, n), 0.0)
+            final_price[members, cols] = np.where(alive, result.mstr_price[:, -1].reshape(m, n), 0.0)
+
+    return PortfolioResults(
+        names=[c.name for c in companies],
+        n_months=n_months,
+        collapse_month=collapse_month,
+        collapse_code=collapse_code,
+        final_nav_per_share=final_nav,
+        final_mstr_price=final_price,
+        final_btc_price=final_btc,
+    )
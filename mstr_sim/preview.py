@@ -0,0 +1,194 @@
+"""
+Share-preview images (1200x630 PNG) for any scenario.
+
+    renderer = PreviewRenderer()
+    png = renderer.render(inputs)                     # simulates if needed
+    png = renderer.render(inputs, (df, month, why))   # reuses a result at hand
+
+Each card shows whether and when the scenario collapses, a sparkline of
+the MSTR price and the headline inputs. The matplotlib figure is built
+once per renderer: its static parts (background, title, stripes) are
+rasterized once and every render only restores that raster, redraws the
+text and sparkline and encodes the PNG. PNGs are cached by scenario hash
+in a bounded LRU ``ResultCache`` (optionally on disk), so repeated
+requests for a scenario neither simulate nor draw.
+
+matplotlib (and Pillow, which it depends on) is imported lazily.
+"""
+
+import io
+import threading
+from typing import Callable, Optional
+
+import numpy as np
+
+from .cache import ResultCache, input_key
+from .render import downsample
+
+WIDTH, HEIGHT, DPI = 1200, 630, 100
+
+BACKGROUND = '#0e1117'
+RED = '#ff4b4b'
+GREEN = '#21c354'
+ORANGE = '#ffa500'
+GREY = '#a3a8b8'
+
+# Sparkline points; a card is only 1200 pixels wide
+SPARKLINE_POINTS = 300
+
+# Inputs the monthly engine (and so the card) does not use
+_IGNORED = ("btc_volatility_annual",)
+
+# -----------------------------
+# Figure Template
+# -----------------------------
+class _Template:
+    """The card figure with its dynamic artists; not thread-safe."""
+
+    def __init__(self):
+        import matplotlib.patches as mpatches
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        from matplotlib.patheffects import withStroke
+
+        self.fig = Figure(figsize=(WIDTH / DPI, HEIGHT / DPI), dpi=DPI, facecolor=BACKGROUND)
+        self.canvas = FigureCanvasAgg(self.fig)
+        ax = self.ax = self.fig.add_axes((0, 0, 1, 1))
+        ax.set_xlim(0, 1)
+        ax.set_ylim(0, 1)
+        ax.axis('off')
+
+        # Static: title, call to action, grid and danger stripes
+        title = ax.text(0.05, 0.88, 'MSTR Goes Boom?', fontsize=40, ha='left', va='center',
+                        color=RED, weight='bold', family='sans-serif')
+        title.set_path_effects([withStroke(linewidth=3, foreground='white', alpha=0.3)])
+        ax.text(0.95, 0.88, 'Run Interactive Scenarios ▶', fontsize=18, ha='right', va='center',
+                color=ORANGE, weight='bold', family='monospace', style='italic')
+        for y in (0.2, 0.4, 0.6, 0.8):
+            ax.axhline(y=y, color='#262730', linewidth=0.5, alpha=0.3, linestyle='--')
+        for x in (0.2, 0.4, 0.6, 0.8):
+            ax.axvline(x=x, color='#262730', linewidth=0.5, alpha=0.3, linestyle='--')
+        num_stripes = 30
+        for i in range(num_stripes):
+            ax.add_patch(mpatches.Rectangle((i / num_stripes, 0), 1 / num_stripes, 0.05, edgecolor='none',
+                                            facecolor=RED if i % 2 == 0 else '#ffff00', alpha=0.6))
+
+        # Dynamic: verdict, detail, inputs and the sparkline
+        self.headline = ax.text(0.05, 0.71, '', fontsize=46, ha='left', va='center', weight='bold',
+                                family='sans-serif')
+        self.detail = ax.text(0.05, 0.59, '', fontsize=22, ha='left', va='center', color='white',
+                              family='sans-serif')
+        self.caption = ax.text(0.05, 0.11, '', fontsize=15, ha='left', va='center', color=GREY,
+                               family='sans-serif')
+        spark = self.spark = self.fig.add_axes((0.05, 0.2, 0.9, 0.28))
+        spark.axis('off')
+        self.line, = spark.plot([], [], color=ORANGE, linewidth=3, solid_capstyle='round')
+        self.marker, = spark.plot([], [], 'o', color=RED, markersize=14)
+        self.drop = spark.axvline(0, color=RED, linewidth=2, linestyle=':')
+        self.dynamic = [self.headline, self.detail, self.caption, self.line, self.drop, self.marker]
+
+        # Rasterize the static parts once
+        for artist in self.dynamic:
+            artist.set_visible(False)
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        for artist in self.dynamic:
+            artist.set_visible(True)
+
+    def draw(self, headline: str, color: str, detail: str, caption: str, x: np.ndarray, y: np.ndarray,
+             collapse_x: Optional[float]) -> bytes:
+        from PIL import Image  # A matplotlib dependency
+
+        self.headline.set_text(headline)
+        self.headline.set_color(color)
+        self.detail.set_text(detail)
+        self.caption.set_text(caption)
+        self.line.set_data(x, y)
+        top = float(np.nanmax(y)) if len(y) and np.nanmax(y) > 0 else 1.0
+        self.spark.set_xlim(x[0], max(x[-1], x[0] + 1e-9))
+        self.spark.set_ylim(-0.05 * top, 1.05 * top)
+        collapsed = collapse_x is not None
+        self.drop.set_visible(collapsed)
+        self.marker.set_visible(collapsed)
+        if collapsed:
+            self.drop.set_xdata([collapse_x, collapse_x])
+            self.marker.set_data([collapse_x], [0.0])
+
+        self.canvas.restore_region(self.background)
+        for artist in self.dynamic:
+            if artist.get_visible():
+                artist.axes.draw_artist(artist)
+        out = io.BytesIO()
+        # Fast zlib level: the card is mostly flat colour, so size barely changes
+        Image.fromarray(np.asarray(self.canvas.buffer_rgba())[..., :3]).save(out, 'PNG', compress_level=1)
+        return out.getvalue()
+
+# -----------------------------
+# Renderer
+# -----------------------------
+class PreviewRenderer:
+    """
+    Cached preview cards.
+
+    ``simulate`` runs a scenario when no result is passed
+    (``simulate_mstr_monthly`` by default; the service passes its own
+    store-backed runner). At most ``max_entries`` PNGs are kept in memory
+    (least recently used are dropped), and on disk under ``directory`` if
+    given. Safe to share between threads.
+    """
+
+    def __init__(self, max_entries: int = 256, directory: Optional[str] = None,
+                 simulate: Optional[Callable] = None):
+        self.cache = ResultCache(max_entries=max_entries, directory=directory)
+        self.simulate = simulate
+        self._template: Optional[_Template] = None
+        self._lock = threading.Lock()
+        self.renders = 0  # Cards actually drawn
+
+    @staticmethod
+    def key(inputs: dict) -> str:
+        """Scenario hash the card is cached under (and a good ETag); unused inputs are left out."""
+        return input_key("preview", inputs={k: v for k, v in inputs.items() if k not in _IGNORED})
+
+    def render(self, inputs: dict, result=None) -> bytes:
+        """PNG card for ``inputs``; ``result`` is their ``simulate_mstr_monthly`` result if already known."""
+        return self.cache.get_or_compute(self.key(inputs), lambda: self._render(inputs, result))
+
+    def warm(self):
+        """Build the figure template now (imports matplotlib) instead of on the first render."""
+        with self._lock:
+            if self._template is None:
+                self._template = _Template()
+
+    def _render(self, inputs: dict, result) -> bytes:
+        if result is None:
+            if self.simulate is None:
+                from .engine import simulate_mstr_monthly
+
+                self.simulate = simulate_mstr_monthly
+            result = self.simulate(**inputs)
+        card = card_text(inputs, result)
+        self.warm()
+        with self._lock:
+            self.renders += 1
+            return self._template.draw(*card)
+
+
+def card_text(inputs: dict, result):
+    """Headline, colour, detail, caption, sparkline x/y (years) and collapse year of a result."""
+    df, collapse_month, collapse_reason = result
+    years = inputs["n_months"] / 12
+    if collapse_month is None:
+        headline, color = f"SURVIVES {years:g} YEARS", GREEN
+        detail = (f"Final MSTR ${df['MSTR_Price'].iloc[-1]:,.2f}, "
+                  f"{df['Shares'].iloc[-1] / inputs['shares_start']:.2f}x dilution")
+        collapse_x = None
+    else:
+        headline, color = f"COLLAPSE IN MONTH {collapse_month}", RED
+        detail = f"Year {collapse_month / 12:.1f}: {collapse_reason}"
+        collapse_x = collapse_month / 12
+    caption = (f"BTC {inputs['btc_growth_annual']:+.0%}/yr  ·  {inputs['base_premium']:.1f}x premium  ·  "
+               f"{inputs['issuance_capacity_pct_annual']:.0%} issuance cap  ·  "
+               f"${inputs['cash_start'] / 1e6:,.0f}M cash  ·  MSTR price over {years:g} years")
+    x, y = downsample(df['Year'].to_numpy(), df['MSTR_Price'].to_numpy(), SPARKLINE_POINTS)
+    return headline, color, detail, caption, x, y, collapse_x
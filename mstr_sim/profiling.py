@@ -0,0 +1,159 @@
+"""
+Stage timing and profiling for app reruns and CLI runs.
+
+    timer = StageTimer("rerun")
+    with timer.stage("live_fetch"):
+        quotes = fetch()
+    with timer.stage("simulation", kind="monthly") as stage:
+        stage.details["source"] = "archive"
+        timer.add_phases(phase_times)   # engine phases, see below
+    timer.frame()   # one row per stage, nested stages indented
+    timer.log()     # one structured (JSON) log record
+
+The engines take an optional ``phase_times`` dict and accumulate the
+seconds spent in each phase of their monthly loop (``PHASES``); passing
+it to ``add_phases`` inside a stage shows them under that stage.
+``Profiler`` wraps ``cProfile`` for a full call profile of one run.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import marshal
+import pstats
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Engine phases, in loop order (``paths`` and ``aggregation`` are Monte Carlo only)
+PHASES = ("paths", "pricing", "obligations", "maturity_scan", "funding", "aggregation", "dataframe")
+
+# -----------------------------
+# Stage Timing
+# -----------------------------
+@dataclass
+class Stage:
+    """One timed stage; ``depth`` is its nesting level."""
+    name: str
+    depth: int
+    seconds: float = 0.0
+    details: Dict[str, Any] = field(default_factory=dict)
+
+
+class StageTimer:
+    """
+    Wall-clock timings of the named stages of one run.
+
+    Stages nest: a stage opened inside another is recorded one level
+    deeper. Not thread-safe; use one timer per run.
+    """
+
+    def __init__(self, label: str = "run"):
+        self.label = label
+        self.stages: List[Stage] = []
+        self._depth = 0
+        self._start = time.perf_counter()
+        self._end: Optional[float] = None
+
+    @contextmanager
+    def stage(self, name: str, **details) -> Iterator[Stage]:
+        """Time the block; extra ``details`` (and any set on the yielded stage) are logged with it."""
+        record = Stage(name, self._depth, details=dict(details))
+        self.stages.append(record)
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            self._depth -= 1
+
+    def add(self, name: str, seconds: float, **details):
+        """Record a stage measured elsewhere, at the current nesting level."""
+        self.stages.append(Stage(name, self._depth, seconds, dict(details)))
+
+    def add_phases(self, phase_times: Dict[str, float]):
+        """Record engine ``phase_times`` (see ``PHASES``) as stages at the current nesting level."""
+        for phase in PHASES:
+            if phase in phase_times:
+                self.add(phase, phase_times[phase])
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds from creating the timer to ``log`` (or to now, before that)."""
+        return (self._end or time.perf_counter()) - self._start
+
+    def record(self) -> Dict[str, Any]:
+        """JSON-compatible summary: the label, total and every stage in order."""
+        return {
+            "event": self.label,
+            "total_ms": round(self.elapsed * 1000, 3),
+            "stages": [{"stage": s.name, "depth": s.depth, "ms": round(s.seconds * 1000, 3), **s.details}
+                       for s in self.stages],
+        }
+
+    def frame(self) -> "pd.DataFrame":
+        import pandas as pd
+
+        total = self.elapsed
+        return pd.DataFrame({
+            'Stage': ["  " * s.depth + s.name for s in self.stages],
+            'Ms': [s.seconds * 1000 for s in self.stages],
+            'Share': [s.seconds / total * 100 if total else 0.0 for s in self.stages],
+            'Details': [", ".join(f"{k}={v}" for k, v in s.details.items()) for s in self.stages],
+        })
+
+    def log(self, level: int = logging.INFO):
+        """Stop the clock and emit the summary as one JSON log record (also attached as ``record.timings``)."""
+        if self._end is None:
+            self._end = time.perf_counter()
+        record = self.record()
+        logger.log(level, json.dumps(record, default=str), extra={"timings": record})
+
+# -----------------------------
+# Profiling
+# -----------------------------
+class Profiler:
+    """
+    ``cProfile`` capture that can start and stop anywhere (e.g. the top
+    and bottom of a Streamlit script) or be used as a context manager.
+    Only the calling thread is profiled.
+    """
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def report(self, sort: str = "cumulative", limit: int = 40) -> str:
+        """The ``limit`` top functions by ``sort``, as ``pstats`` prints them."""
+        out = io.StringIO()
+        pstats.Stats(self._profile, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def dump(self, path: Optional[str] = None) -> bytes:
+        """The raw stats (``.prof``, for snakeviz and friends); also written to ``path`` if given."""
+        self._profile.create_stats()
+        data = marshal.dumps(self._profile.stats)
+        if path:
+            with open(path, "wb") as f:
+                f.write(data)
+        return data
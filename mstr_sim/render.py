@@ -0,0 +1,118 @@
+"""
+Plotly rendering helpers for long horizons and many paths.
+
+Every trace is downsampled to a point budget before it is sent to the
+browser (LTTB for lines, bucket sums for flows) and drawn with WebGL
+(``Scattergl``), so the payload and render time stay flat however many
+months or paths were simulated. Percentile bands are drawn as filled
+areas from precomputed quantiles (see ``mstr_sim.streaming``).
+
+Plotly is imported lazily.
+"""
+
+import numpy as np
+from typing import TYPE_CHECKING, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+# Points per trace; roughly one per horizontal pixel of a wide chart
+DEFAULT_POINT_BUDGET = 800
+
+# -----------------------------
+# Downsampling
+# -----------------------------
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last point and, from each of ``n_out - 2`` equal
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the mean of the next bucket, which preserves
+    peaks and crashes that plain striding would drop.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 2 < len(edges):
+            nxt = slice(edges[b + 1], edges[b + 2])
+            cx, cy = x[nxt].mean(), y[nxt].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.nanargmax(area)) if np.isfinite(area).any() else lo
+        kept[b + 1] = a
+    return kept
+
+
+def downsample(x: np.ndarray, y: np.ndarray, n_out: int = DEFAULT_POINT_BUDGET) -> Tuple[np.ndarray, np.ndarray]:
+    idx = lttb_indices(x, y, n_out)
+    return np.asarray(x)[idx], np.asarray(y)[idx]
+
+
+def aggregate(x: np.ndarray, y: np.ndarray, n_out: int = DEFAULT_POINT_BUDGET) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum flows into at most ``n_out`` equal buckets (for bar charts); x is each bucket's start."""
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    if len(y) <= n_out:
+        return x, y
+    starts = np.unique(np.linspace(0, len(y), n_out, endpoint=False).astype(np.int64))
+    return x[starts], np.add.reduceat(y, starts)
+
+# -----------------------------
+# Traces & Figures
+# -----------------------------
+def line(x, y, name: str, budget: int = DEFAULT_POINT_BUDGET, **kwargs) -> "go.Scattergl":
+    """WebGL line trace of at most ``budget`` points."""
+    import plotly.graph_objects as go
+
+    xs, ys = downsample(np.asarray(x), np.asarray(y), budget)
+    return go.Scattergl(x=xs, y=ys, name=name, mode='lines', **kwargs)
+
+
+def bars(x, y, name: str, budget: int = DEFAULT_POINT_BUDGET, **kwargs) -> "go.Bar":
+    """Bar trace with flows summed into at most ``budget`` buckets."""
+    import plotly.graph_objects as go
+
+    xs, ys = aggregate(x, y, budget)
+    return go.Bar(x=xs, y=ys, name=name, **kwargs)
+
+
+def fan_chart(x, bands: Sequence[np.ndarray], quantiles: Sequence[float], name: str,
+              budget: int = DEFAULT_POINT_BUDGET, color: str = "99, 110, 250") -> "go.Figure":
+    """
+    Filled percentile bands around the median.
+
+    ``bands`` are ``[len(quantiles), months]`` in increasing quantile
+    order (e.g. 5/25/50/75/95); pairs from the outside in become filled
+    areas and the middle quantile is drawn as a line. All bands share the
+    indices LTTB picks for the median so the fills stay aligned.
+    """
+    import plotly.graph_objects as go
+
+    bands = np.asarray(bands)
+    x = np.asarray(x)
+    mid = len(quantiles) // 2
+    idx = lttb_indices(x, bands[mid], budget)
+    xs = x[idx]
+
+    fig = go.Figure()
+    for k in range(mid):
+        lo, hi = bands[k][idx], bands[-1 - k][idx]
+        opacity = 0.15 + 0.2 * k
+        fig.add_trace(go.Scattergl(x=xs, y=hi, mode='lines', line=dict(width=0),
+                                   showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scattergl(x=xs, y=lo, mode='lines', line=dict(width=0), fill='tonexty',
+                                   fillcolor=f"rgba({color}, {opacity:.2f})",
+                                   name=f"{quantiles[k]:g}th-{quantiles[-1 - k]:g}th pct"))
+    fig.add_trace(go.Scattergl(x=xs, y=bands[mid][idx], mode='lines', name=name,
+                               line=dict(color=f"rgb({color})")))
+    return fig
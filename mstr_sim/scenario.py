@@ -0,0 +1,94 @@
+"""
+Scenario files: JSON or YAML descriptions of simulation inputs.
+
+A scenario is a mapping of ``simulate_mstr_monthly`` keyword arguments.
+Anything left out takes the app's default, ``n_years`` may be given
+instead of ``n_months``, and debts/preferreds are lists of mappings with
+the dataclass fields::
+
+    {
+        "n_years": 10,
+        "btc_growth_annual": 0.0,
+        "issuance_capacity_pct_annual": 0.0,
+        "convertible_debts": [
+            {"name": "Notes 2028", "principal": 1e9, "maturity_month": 36,
+             "coupon_rate": 0.0, "conversion_price": 300.0}
+        ]
+    }
+"""
+
+import dataclasses
+import json
+import os
+from typing import Any, Dict
+
+from .instruments import ConvertibleDebt, PreferredStock
+
+# Defaults match the Streamlit sidebar
+DEFAULT_INPUTS: Dict[str, Any] = dict(
+    n_months=60,
+    btc_price_start=98000.0,
+    btc_growth_annual=0.15,
+    btc_volatility_annual=0.5,
+    btc_holdings_start=386000.0,
+    cash_start=50e6,
+    shares_start=225_000_000,
+    operating_burn_annual=100e6,
+    issuance_capacity_pct_annual=0.25,
+    base_premium=2.0,
+    dynamic_premium=True,
+    premium_drawdown=None,
+)
+
+DEFAULT_DEBTS = [
+    ConvertibleDebt("Notes 2028", 1e9, 36, 0.0, 300.0),
+    ConvertibleDebt("Notes 2030", 2e9, 60, 0.0, 400.0),
+    ConvertibleDebt("Notes 2032", 1e9, 84, 0.0, 500.0),
+]
+
+DEFAULT_PREFS = [PreferredStock("Series A", 0.0, 0.0)]
+
+
+def scenario_inputs(scenario: Dict[str, Any]) -> Dict[str, Any]:
+    """Keyword arguments for ``simulate_mstr_monthly`` built from a scenario mapping."""
+    scenario = dict(scenario)
+    inputs = dict(DEFAULT_INPUTS)
+
+    n_years = scenario.pop("n_years", None)
+    debts = scenario.pop("convertible_debts", None)
+    prefs = scenario.pop("preferred_stocks", None)
+    inputs["convertible_debts"] = list(DEFAULT_DEBTS) if debts is None else [
+        d if isinstance(d, ConvertibleDebt) else ConvertibleDebt(**d) for d in debts]
+    inputs["preferred_stocks"] = list(DEFAULT_PREFS) if prefs is None else [
+        p if isinstance(p, PreferredStock) else PreferredStock(**p) for p in prefs]
+
+    unknown = sorted(set(scenario) - set(DEFAULT_INPUTS))
+    if unknown:
+        raise ValueError(f"Unknown scenario keys: {unknown}")
+    inputs.update(scenario)
+    if n_years is not None:
+        inputs["n_months"] = int(round(float(n_years) * 12))
+    inputs["n_months"] = int(inputs["n_months"])
+    return inputs
+
+
+def scenario_dict(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of ``scenario_inputs``: plain JSON-serialisable mapping."""
+    out = dict(inputs)
+    out["convertible_debts"] = [dataclasses.asdict(d) for d in inputs["convertible_debts"]]
+    out["preferred_stocks"] = [dataclasses.asdict(p) for p in inputs["preferred_stocks"]]
+    return out
+
+
+def load_scenario(path: str) -> Dict[str, Any]:
+    """Read a JSON or YAML scenario file and return simulation inputs."""
+    with open(path) as f:
+        if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Reading YAML scenarios requires PyYAML (pip install pyyaml)") from None
+            data = yaml.safe_load(f) or {}
+        else:
+            data = json.load(f)
+    return scenario_inputs(data)
@@ -0,0 +1,310 @@
+"""
+Sensitivity report: survival probability and final NAV per share against
+every input, from one batched evaluation with common random numbers.
+
+Each parameter is bumped down and up around the base inputs, giving
+``1 + 2 * parameters`` scenarios. Every scenario runs on the *same* BTC
+paths (drawn once per chunk and tiled along the path axis of a single
+``simulate_mstr_paths`` call), so the central differences see only the
+effect of the bump and not independent Monte Carlo noise. Standard
+errors are taken from the paired per-path differences.
+
+Scalar inputs become ``[paths]`` arrays; tranche conversion prices and
+maturities become extra variants of the tranche selected per path with
+``tranche_weights``. BTC growth and start price bumps tilt/scale the
+shared paths, which is exact for GBM.
+"""
+
+import dataclasses
+import numpy as np
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+from .montecarlo import NO_COLLAPSE, MarketImpact, generate_btc_paths, simulate_mstr_paths
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Scalar inputs the batched engine accepts as per-path arrays
+SCALAR_PARAMETERS = (
+    "btc_price_start",
+    "btc_growth_annual",
+    "btc_holdings_start",
+    "cash_start",
+    "shares_start",
+    "operating_burn_annual",
+    "issuance_capacity_pct_annual",
+    "base_premium",
+)
+
+LABELS = {
+    "btc_price_start": "BTC start price",
+    "btc_growth_annual": "BTC annual growth",
+    "btc_holdings_start": "BTC holdings",
+    "cash_start": "Initial cash",
+    "shares_start": "Shares outstanding",
+    "operating_burn_annual": "Annual ops burn",
+    "issuance_capacity_pct_annual": "Issuance cap",
+    "base_premium": "Base premium",
+}
+
+# Tranche fields bumped per note
+TRANCHE_FIELDS = ("conversion_price", "maturity_month")
+
+# Bumps used where a relative step would be zero (base value of 0)
+ABSOLUTE_STEPS = {
+    "btc_price_start": 1000.0,
+    "btc_growth_annual": 0.05,
+    "btc_holdings_start": 1000.0,
+    "cash_start": 10e6,
+    "shares_start": 1e6,
+    "operating_burn_annual": 10e6,
+    "issuance_capacity_pct_annual": 0.01,
+    "base_premium": 0.1,
+    "conversion_price": 10.0,
+}
+
+# -----------------------------
+# Results
+# -----------------------------
+@dataclass
+class SensitivityResult:
+    """Central differences of survival probability and final NAV/share.
+
+    Per-parameter arrays share the order of ``parameters``. ``lo``/``hi``
+    are the bumped values actually used (bumps are clamped at zero and BTC
+    growth stays above -100%), and the ``*_se`` arrays are standard errors
+    of the slopes from the paired per-path differences.
+    """
+    n_paths: int
+    n_months: int
+    base_survival: float
+    base_nav_per_share: float
+    parameters: List[str]
+    labels: List[str]
+    base: np.ndarray
+    lo: np.ndarray
+    hi: np.ndarray
+    survival_lo: np.ndarray
+    survival_hi: np.ndarray
+    nav_lo: np.ndarray
+    nav_hi: np.ndarray
+    survival_slope: np.ndarray
+    survival_se: np.ndarray
+    nav_slope: np.ndarray
+    nav_se: np.ndarray
+
+    def frame(self) -> "pd.DataFrame":
+        """One row per parameter, largest survival swing first."""
+        import pandas as pd
+
+        frame = pd.DataFrame({
+            'Parameter': self.parameters,
+            'Label': self.labels,
+            'Base': self.base,
+            'Low': self.lo,
+            'High': self.hi,
+            'Survival_Low': self.survival_lo,
+            'Survival_High': self.survival_hi,
+            'dSurvival': self.survival_slope,
+            'dSurvival_SE': self.survival_se,
+            'NAV_Low': self.nav_lo,
+            'NAV_High': self.nav_hi,
+            'dNAV': self.nav_slope,
+            'dNAV_SE': self.nav_se,
+        })
+        swing = (frame['Survival_High'] - frame['Survival_Low']).abs()
+        order = np.lexsort(((frame['NAV_High'] - frame['NAV_Low']).abs().to_numpy(), swing.to_numpy()))[::-1]
+        return frame.iloc[order].reset_index(drop=True)
+
+# -----------------------------
+# Scenarios
+# -----------------------------
+def _bump(value: float, rel_step: float, abs_step: float) -> float:
+    return rel_step * abs(value) if value else abs_step
+
+
+def _scenarios(base_inputs: dict, parameters: Optional[Sequence[str]], rel_step: float, maturity_step: int):
+    """(parameter, label, base, lo, hi) for every requested bump."""
+    debts = base_inputs["convertible_debts"]
+    available = list(SCALAR_PARAMETERS) + [
+        f"convertible_debts[{j}].{field}" for j in range(len(debts)) for field in TRANCHE_FIELDS]
+    if parameters is None:
+        parameters = available
+    unknown = sorted(set(parameters) - set(available))
+    if unknown:
+        raise ValueError(f"Cannot bump {unknown}; choose from {available}")
+
+    bumps = []
+    for name in parameters:
+        if name in SCALAR_PARAMETERS:
+            value = float(base_inputs[name])
+            step = _bump(value, rel_step, ABSOLUTE_STEPS[name])
+            if name == "btc_growth_annual":
+                if value <= -1.0:
+                    raise ValueError(f"btc_growth_annual must be above -1, got {value}")
+                lo = max(value - step, (value - 1.0) / 2) # Halfway to -100% at most
+            else:
+                lo = max(0.0, value - step)
+            bumps.append((name, LABELS[name], value, lo, value + step))
+        else:
+            j = int(name[name.index("[") + 1:name.index("]")])
+            field = name.rsplit(".", 1)[1]
+            value = float(getattr(debts[j], field))
+            if field == "maturity_month":
+                lo, hi = max(0.0, value - maturity_step), value + maturity_step
+            else:
+                step = _bump(value, rel_step, ABSOLUTE_STEPS[field])
+                lo, hi = max(step, value - step), value + step # Conversion price must stay positive
+            bumps.append((name, f"{debts[j].name} {field.replace('_', ' ')}", value, lo, hi))
+    return bumps
+
+
+def _batch(base_inputs: dict, bumps) -> tuple:
+    """Per-scenario scalar inputs, the extended note list and tranche weights.
+
+    Scenario 0 is the base; scenarios ``2k + 1`` and ``2k + 2`` are the
+    low and high bump of parameter ``k``.
+    """
+    debts = list(base_inputs["convertible_debts"])
+    n_scenarios = 1 + 2 * len(bumps)
+    scalars = {name: np.full(n_scenarios, float(base_inputs[name])) for name in SCALAR_PARAMETERS}
+
+    # Tranche variants are appended after the original notes and swapped in per scenario
+    variants = []
+    weights = np.ones((n_scenarios, len(debts)))
+    for k, (name, _, _, lo, hi) in enumerate(bumps):
+        for s, value in ((2 * k + 1, lo), (2 * k + 2, hi)):
+            if name in scalars:
+                scalars[name][s] = value
+                continue
+            j = int(name[name.index("[") + 1:name.index("]")])
+            field = name.rsplit(".", 1)[1]
+            value = int(round(value)) if field == "maturity_month" else value
+            variants.append((s, j, dataclasses.replace(debts[j], **{field: value})))
+
+    if variants:
+        extra = np.zeros((n_scenarios, len(variants)))
+        for v, (s, j, _) in enumerate(variants):
+            weights[s, j] = 0.0
+            extra[s, v] = 1.0
+        weights = np.hstack([weights, extra])
+        debts += [debt for _, _, debt in variants]
+    return scalars, debts, weights
+
+
+def _btc_factors(base_inputs: dict, scalars: Dict[str, np.ndarray], n_months: int) -> np.ndarray:
+    """``[scenarios, months]`` multipliers of the shared BTC paths (start price and growth bumps)."""
+    t = np.arange(n_months) / 12.0
+    growth = np.log1p(scalars["btc_growth_annual"]) - np.log1p(float(base_inputs["btc_growth_annual"]))
+    start = scalars["btc_price_start"] / float(base_inputs["btc_price_start"])
+    return start[:, None] * np.exp(growth[:, None] * t)
+
+# -----------------------------
+# Report
+# -----------------------------
+def sensitivity_report(
+    base_inputs: dict,
+    n_paths: int = 1000,
+    seed: Optional[int] = None,
+    parameters: Optional[Sequence[str]] = None,
+    rel_step: float = 0.1,
+    maturity_step: int = 6,
+    generator=None,
+    chunk_size: Optional[int] = None,
+    memory_budget_mb: float = 256.0,
+    market_impact: Optional[MarketImpact] = None,
+) -> SensitivityResult:
+    """
+    Bump every input of ``simulate_mstr_monthly`` down and up and measure
+    survival probability and mean final NAV per share (0 once collapsed).
+
+    ``base_inputs`` holds the usual keyword arguments. ``parameters``
+    defaults to every scalar input plus each tranche's
+    ``convertible_debts[j].conversion_price`` and ``.maturity_month``.
+    Continuous inputs move by ``rel_step`` of their value (or by
+    ``ABSOLUTE_STEPS`` when zero), maturities by ``maturity_step`` months.
+    BTC paths come from ``generator`` (GBM from the base inputs by
+    default); with zero volatility the report is deterministic.
+    ``market_impact`` runs every scenario in the reflexive mode of
+    ``simulate_mstr_paths``.
+    """
+    n_months = int(base_inputs["n_months"])
+    bumps = _scenarios(base_inputs, parameters, rel_step, maturity_step)
+    scalars, debts, weights = _batch(base_inputs, bumps)
+    factors = _btc_factors(base_inputs, scalars, n_months)
+    n_scenarios = len(weights)
+
+    if chunk_size is None:
+        # PathResults holds 12 float series plus the BTC paths and temporaries
+        bytes_per_path = n_scenarios * max(n_months, 1) * 8 * 16
+        chunk_size = max(1, int(memory_budget_mb * 2**20 // bytes_per_path))
+    chunk_size = min(chunk_size, max(n_paths, 1))
+
+    inputs = {k: v for k, v in base_inputs.items() if k not in SCALAR_PARAMETERS}
+    inputs.update(convertible_debts=debts, n_months=n_months)
+    inputs.pop("btc_volatility_annual", None)
+
+    survived: List[np.ndarray] = []
+    nav: List[np.ndarray] = []
+    starts = range(0, n_paths, chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    for start, chunk_seed in zip(starts, seeds):
+        n = min(chunk_size, n_paths - start)
+        rng = np.random.default_rng(chunk_seed)
+        if generator is not None:
+            btc = generator.generate(n, n_months, base_inputs["btc_price_start"], rng)
+        else:
+            btc = generate_btc_paths(n, n_months, base_inputs["btc_price_start"], base_inputs["btc_growth_annual"],
+                                     base_inputs["btc_volatility_annual"], rng)
+        # Common random numbers: every scenario sees the same n paths
+        tiled = (factors[:, None, :] * btc[None, :, :]).reshape(n_scenarios * n, n_months)
+        result = simulate_mstr_paths(
+            n_paths=n_scenarios * n,
+            btc_volatility_annual=0.0,
+            btc_paths=tiled,
+            tranche_weights=np.repeat(weights, n, axis=0),
+            market_impact=market_impact,
+            **{name: np.repeat(values, n) for name, values in scalars.items()},
+            **inputs,
+        )
+        alive = result.collapse_month == NO_COLLAPSE
+        survived.append(alive.reshape(n_scenarios, n))
+        # A liquidity collapse can leave positive NAV behind; count it as 0
+        nav.append(np.where(alive, result.nav_per_share[:, -1], 0.0).reshape(n_scenarios, n))
+
+    survived = np.hstack(survived).astype(float)
+    nav = np.hstack(nav)
+
+    lo_rows = slice(1, None, 2)
+    hi_rows = slice(2, None, 2)
+    lo = np.array([b[3] for b in bumps], dtype=float)
+    hi = np.array([b[4] for b in bumps], dtype=float)
+    width = np.where(hi > lo, hi - lo, np.nan)
+
+    def slope(values: np.ndarray):
+        diff = values[hi_rows] - values[lo_rows]
+        se = diff.std(axis=1, ddof=1) / np.sqrt(n_paths) if n_paths > 1 else np.full(len(bumps), np.nan)
+        return diff.mean(axis=1) / width, se / width
+
+    survival_slope, survival_se = slope(survived)
+    nav_slope, nav_se = slope(nav)
+    return SensitivityResult(
+        n_paths=n_paths,
+        n_months=n_months,
+        base_survival=float(survived[0].mean()),
+        base_nav_per_share=float(nav[0].mean()),
+        parameters=[b[0] for b in bumps],
+        labels=[b[1] for b in bumps],
+        base=np.array([b[2] for b in bumps], dtype=float),
+        lo=lo,
+        hi=hi,
+        survival_lo=survived[lo_rows].mean(axis=1),
+        survival_hi=survived[hi_rows].mean(axis=1),
+        nav_lo=nav[lo_rows].mean(axis=1),
+        nav_hi=nav[hi_rows].mean(axis=1),
+        survival_slope=survival_slope,
+        survival_se=survival_se,
+        nav_slope=nav_slope,
+        nav_se=nav_se,
+    )
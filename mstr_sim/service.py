@@ -0,0 +1,430 @@
+"""
+Local HTTP/JSON simulation service.
+
+    python -m mstr_sim serve --port 8765 --workers 4 --store /var/cache/mstr-sim/service
+
+One process owns the engines for every client (the Streamlit app sets
+``MSTR_SIM_SERVICE_URL`` and becomes a thin client):
+
+- identical requests share one job: a request for a job that is already
+  queued or running attaches to it instead of simulating again
+  ("coalescing"), and finished results are served from a shared
+  ``ResultCache`` (optionally on disk, so several service processes can
+  share it)
+- heavy kinds (Monte Carlo bands, sweeps, breakeven, sensitivity) run on a
+  bounded process pool; bands and sweeps are split into chunks whose
+  completion is reported as job progress
+- at most ``max_pending`` jobs are queued or running; beyond that
+  requests are refused with 503 and ``Retry-After``
+
+Endpoints (bodies are ``mstr_sim.wire`` JSON)::
+
+    POST /run/<kind>    {"inputs": {...}, "options": {...}} -> finished job with "result"
+    POST /jobs/<kind>   same body -> 202 and the job's status (poll it)
+    GET  /jobs/<id>     status: state, progress, "result" once done (?result=0 omits it)
+    GET  /health        job counts, store hits/misses, coalesced requests
+    GET  /preview.png   share-preview card of the scenario in the query string (image/png)
+
+``inputs`` is a scenario mapping (see ``mstr_sim.scenario``; omitted
+inputs take the defaults) and ``options`` the extra keyword arguments of
+the kind, e.g. ``{"n_paths": 10000, "seed": 1}`` for ``bands``; unknown or
+missing options are refused with 400. A sweep's ``max_workers`` is capped
+at the service's pool. A job id is the store key of its result, so it
+stays valid after restarts.
+
+``/preview.png`` takes the scenario as query parameters with JSON values
+(``?n_years=10&btc_growth_annual=-0.2``) and serves the card of
+``mstr_sim.preview``, so a shared scenario link can unfurl with its own
+verdict and sparkline. Cards are cached by scenario hash and their
+simulations go through the same store, so repeated unfurls neither
+simulate nor draw.
+"""
+
+import inspect
+import itertools
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from . import wire
+from .cache import ResultCache, input_key
+from .incremental import IncrementalSimulator
+from .preview import PreviewRenderer
+from .scenario import scenario_inputs
+from .sensitivity import sensitivity_report
+from .solver import solve_breakeven
+from .streaming import BandAccumulator, band_chunks, run_band_chunk, simulate_mstr_bands
+from .sweep import SweepResult, grid_points, run_points, sweep_grid
+
+DEFAULT_PORT = 8765
+
+# Seconds a finished job stays in the job table (its result stays in the store)
+FINISHED_JOB_TTL = 600.0
+
+# -----------------------------
+# Jobs
+# -----------------------------
+@dataclass
+class Job:
+    """A queued, running or finished simulation."""
+    id: str
+    kind: str
+    state: str = "queued"  # queued, running, done or error
+    progress: float = 0.0
+    result: Any = None
+    error: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    finished: Optional[float] = None
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def status(self, include_result: bool = True) -> dict:
+        status = {"job": self.id, "kind": self.kind, "state": self.state, "progress": self.progress}
+        if self.error is not None:
+            status["error"] = self.error
+        if include_result and self.state == "done":
+            status["result"] = self.result
+        return status
+
+
+class ServiceBusy(RuntimeError):
+    """Too many jobs are queued or running."""
+
+# -----------------------------
+# Service
+# -----------------------------
+class SimulationService:
+    """
+    Coalescing job runner behind the HTTP handler (usable in-process too).
+
+    ``store`` holds finished results by job id; ``max_workers`` bounds
+    the process pool (every core by default). The pool uses spawn, so
+    scripts that create a service need an ``if __name__ == "__main__"``
+    guard.
+    """
+
+    def __init__(self, store: Optional[ResultCache] = None, max_workers: Optional[int] = None,
+                 max_pending: int = 64, chunks_per_worker: int = 4):
+        self.store = store if store is not None else ResultCache(max_entries=256)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.chunks_per_worker = chunks_per_worker
+        # spawn: forking a threaded server can copy held locks into the workers
+        self.pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        self.incremental = IncrementalSimulator()
+        self.previews = PreviewRenderer(directory=os.path.join(self.store.directory, "previews")
+                                        if self.store.directory else None, simulate=self._preview_result)
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+        self.kinds: Dict[str, Callable[[Job, dict, dict], Any]] = {
+            "monthly": self._monthly,
+            "bands": self._bands,
+            "sweep": self._sweep,
+            "breakeven": self._breakeven,
+            "sensitivity": self._sensitivity,
+        }
+        # Functions whose keyword arguments each kind accepts as options
+        self._signatures = {
+            "monthly": None, "bands": simulate_mstr_bands, "sweep": sweep_grid,
+            "breakeven": solve_breakeven, "sensitivity": sensitivity_report,
+        }
+
+    def _validate(self, kind: str, inputs: dict, options: dict) -> dict:
+        if kind not in self.kinds:
+            raise ValueError(f"Unknown kind {kind!r}; choose from {sorted(self.kinds)}")
+        inputs = scenario_inputs(inputs)
+        fn = self._signatures[kind]
+        parameters = inspect.signature(fn).parameters if fn else {}
+        allowed = set(parameters) - set(inputs) - {"base_inputs"}
+        unknown = sorted(set(options) - allowed)
+        if unknown:
+            raise ValueError(f"Unknown options for {kind!r}: {unknown}")
+        missing = sorted(k for k in allowed - set(options) if parameters[k].default is inspect.Parameter.empty)
+        if missing:
+            raise ValueError(f"Missing options for {kind!r}: {missing}")
+        for name in ("max_workers", "chunks_per_worker"):
+            value = options.get(name)
+            if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 1):
+                raise ValueError(f"{name} must be a positive integer, got {value!r}")
+        return inputs
+
+    def submit(self, kind: str, inputs: dict, options: Optional[dict] = None) -> Job:
+        """The job for this request: finished from the store, in flight, or newly queued."""
+        options = dict(options or {})
+        inputs = self._validate(kind, inputs, options)
+        job_id = input_key(f"service.{kind}", inputs=inputs, options=options)
+
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+            if job is not None and job.state != "error":
+                self.coalesced += 1
+                return job
+        result = self.store.get(job_id, _MISSING)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.state != "error":
+                self.coalesced += 1
+                return job
+            if result is not _MISSING:
+                job = Job(job_id, kind, state="done", progress=1.0, result=result, finished=time.time())
+                job.done.set()
+                return job
+            if sum(j.state in ("queued", "running") for j in self._jobs.values()) >= self.max_pending:
+                raise ServiceBusy(f"{self.max_pending} jobs already pending")
+            job = self._jobs[job_id] = Job(job_id, kind)
+        threading.Thread(target=self._execute, args=(job, inputs, options), daemon=True,
+                         name=f"job-{job_id[:8]}").start()
+        return job
+
+    def run(self, kind: str, inputs: dict, options: Optional[dict] = None, timeout: Optional[float] = None) -> Job:
+        """``submit`` and wait for the job to finish."""
+        job = self.submit(kind, inputs, options)
+        job.done.wait(timeout)
+        return job
+
+    def job(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            result = self.store.get(job_id, _MISSING)
+            if result is not _MISSING:
+                job = Job(job_id, "", state="done", progress=1.0, result=result)
+                job.done.set()
+        return job
+
+    def preview(self, scenario: dict) -> Tuple[bytes, str]:
+        """Share-preview PNG of a scenario mapping and its ETag (see ``mstr_sim.preview``)."""
+        inputs = scenario_inputs(scenario)
+        return self.previews.render(inputs), self.previews.key(inputs)
+
+    def _preview_result(self, **inputs):
+        job = self.run("monthly", inputs)
+        if job.state == "error":
+            raise RuntimeError(job.error)
+        return job.result
+
+    def health(self) -> dict:
+        with self._lock:
+            states = [j.state for j in self._jobs.values()]
+        return {
+            "status": "ok",
+            "workers": self.max_workers,
+            "jobs": {s: states.count(s) for s in ("queued", "running", "done", "error")},
+            "coalesced": self.coalesced,
+            "store_hits": self.store.hits,
+            "store_misses": self.store.misses,
+            "previews_drawn": self.previews.renders,
+        }
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _prune(self):
+        cutoff = time.time() - FINISHED_JOB_TTL
+        for job_id in [k for k, j in self._jobs.items() if j.finished is not None and j.finished < cutoff]:
+            del self._jobs[job_id]
+
+    def _execute(self, job: Job, inputs: dict, options: dict):
+        job.state = "running"
+        try:
+            result = self.kinds[job.kind](job, inputs, options)
+            self.store.put(job.id, result)
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.state = "error"
+        else:
+            job.result = result
+            job.progress = 1.0
+            job.state = "done"
+        job.finished = time.time()
+        job.done.set()
+
+    def _map(self, job: Job, fn: Callable, tasks: list, limit: Optional[int] = None) -> list:
+        """
+        ``fn(*task)`` for every task on the pool, in order, updating
+        ``job.progress``; at most ``limit`` tasks run at once.
+        """
+        queue = iter(enumerate(tasks))
+        futures: Dict[Any, int] = {}
+        results = [None] * len(tasks)
+        done = 0
+        while True:
+            for k, task in itertools.islice(queue, (limit or len(tasks)) - len(futures)):
+                futures[self.pool.submit(fn, *task)] = k
+            if not futures:
+                return results
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in finished:
+                results[futures.pop(future)] = future.result()
+                done += 1
+                job.progress = done / len(tasks)
+
+    # Kinds
+    def _monthly(self, job: Job, inputs: dict, options: dict):
+        return self.incremental.run(**inputs)
+
+    def _bands(self, job: Job, inputs: dict, options: dict):
+        # Same chunks and seeds as simulate_mstr_bands, so results are identical
+        options = dict(options)
+        n_paths = options.pop("n_paths")
+        chunking = {k: options.pop(k) for k in ("seed", "chunk_size", "memory_budget_mb") if k in options}
+        defaults = inspect.signature(simulate_mstr_bands).parameters
+        aggregate = [options.pop(k, defaults[k].default) for k in ("series", "quantiles", "relative_accuracy", "n_samples")]
+        inputs = dict(inputs, **options) # generator
+        tasks = [(n, seed, inputs, *aggregate) for n, seed in band_chunks(n_paths, inputs["n_months"], **chunking)]
+        accumulator = BandAccumulator(inputs["n_months"], *aggregate)
+        for chunk in self._map(job, run_band_chunk, tasks):
+            accumulator.merge(chunk)
+        return accumulator.result()
+
+    def _sweep(self, job: Job, inputs: dict, options: dict):
+        names, axis_values, points = grid_points(options["axes"])
+        # A sweep may ask for fewer workers than the pool has, never more
+        workers = min(options.get("max_workers") or self.max_workers, self.max_workers)
+        chunks_per_worker = options.get("chunks_per_worker") or self.chunks_per_worker
+        n_chunks = max(1, min(len(points), workers * chunks_per_worker))
+        tasks = [(inputs, names, chunk) for chunk in np.array_split(points, n_chunks)]
+        flat = np.concatenate(self._map(job, run_points, tasks, limit=workers))
+        return SweepResult(axes=dict(zip(names, axis_values)),
+                           collapse_month=flat.reshape(tuple(len(v) for v in axis_values)),
+                           n_months=inputs["n_months"])
+
+    def _breakeven(self, job: Job, inputs: dict, options: dict):
+        return self.pool.submit(solve_breakeven, base_inputs=inputs, **options).result()
+
+    def _sensitivity(self, job: Job, inputs: dict, options: dict):
+        return self.pool.submit(sensitivity_report, base_inputs=inputs, **options).result()
+
+
+_MISSING = object()
+
+# -----------------------------
+# HTTP
+# -----------------------------
+class _Handler(BaseHTTPRequestHandler):
+    service: SimulationService  # set on the per-server subclass
+
+    def _send(self, status: int, payload: Any, headers: Optional[dict] = None):
+        body = wire.dumps(payload)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str, headers: Optional[dict] = None):
+        self._send(status, {"error": message}, headers)
+
+    def _send_png(self, png: bytes, etag: str):
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(png)))
+        self.send_header("Cache-Control", "public, max-age=86400")
+        self.send_header("ETag", f'"{etag}"')
+        self.end_headers()
+        self.wfile.write(png)
+
+    def _preview(self, query: str):
+        scenario = {}
+        for key, values in parse_qs(query).items():
+            try:
+                scenario[key] = json.loads(values[-1])
+            except ValueError:
+                scenario[key] = values[-1]
+        try:
+            inputs = scenario_inputs(scenario)
+            etag = self.service.previews.key(inputs)
+        except (ValueError, TypeError) as e:
+            return self._error(HTTPStatus.BAD_REQUEST, str(e))
+        # The key needs no simulation, so a cached card costs nothing to revalidate
+        if self.headers.get("If-None-Match") == f'"{etag}"':
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", f'"{etag}"')
+            self.end_headers()
+            return
+        try:
+            png = self.service.previews.render(inputs)
+        except ServiceBusy as e:
+            return self._error(HTTPStatus.SERVICE_UNAVAILABLE, str(e), {"Retry-After": "1"})
+        except (ValueError, TypeError) as e:
+            return self._error(HTTPStatus.BAD_REQUEST, str(e))
+        except RuntimeError as e: # The monthly job failed
+            return self._error(HTTPStatus.INTERNAL_SERVER_ERROR, str(e))
+        self._send_png(png, etag)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        if parts == ["health"]:
+            return self._send(HTTPStatus.OK, self.service.health())
+        if parts == ["preview.png"]:
+            return self._preview(url.query)
+        if len(parts) == 2 and parts[0] == "jobs":
+            job = self.service.job(parts[1])
+            if job is None:
+                return self._error(HTTPStatus.NOT_FOUND, f"Unknown job {parts[1]!r}")
+            include = parse_qs(url.query).get("result", ["1"])[0] != "0"
+            return self._send(HTTPStatus.OK, job.status(include))
+        self._error(HTTPStatus.NOT_FOUND, f"No route for GET {url.path}")
+
+    def do_POST(self):
+        parts = urlparse(self.path).path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] not in ("run", "jobs"):
+            return self._error(HTTPStatus.NOT_FOUND, f"No route for POST {self.path}")
+        try:
+            body = wire.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            job = self.service.submit(parts[1], body.get("inputs", {}), body.get("options"))
+        except ServiceBusy as e:
+            return self._error(HTTPStatus.SERVICE_UNAVAILABLE, str(e), {"Retry-After": "1"})
+        except (ValueError, TypeError, AttributeError) as e:
+            return self._error(HTTPStatus.BAD_REQUEST, str(e))
+
+        if parts[0] == "jobs":
+            status = HTTPStatus.OK if job.state == "done" else HTTPStatus.ACCEPTED
+            return self._send(status, job.status(include_result=False))
+        job.done.wait()
+        if job.state == "error":
+            return self._send(HTTPStatus.INTERNAL_SERVER_ERROR, job.status())
+        self._send(HTTPStatus.OK, job.status())
+
+    def log_message(self, format, *args):
+        pass # Quiet; /health has the counters
+
+
+def make_server(service: SimulationService, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    handler = type("Handler", (_Handler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(host: str = "127.0.0.1", port: int = DEFAULT_PORT, store_directory: Optional[str] = None,
+          max_workers: Optional[int] = None, max_pending: int = 64):
+    """Run the service until interrupted."""
+    service = SimulationService(ResultCache(max_entries=256, directory=store_directory),
+                                max_workers=max_workers, max_pending=max_pending)
+    server = make_server(service, host, port)
+    # Build the preview template up front so the first link unfurl is fast too
+    threading.Thread(target=service.previews.warm, daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
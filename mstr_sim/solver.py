@@ -0,0 +1,134 @@
+"""
+Breakeven solver: critical input values that separate survival from collapse.
+
+Every problem (for example "minimum BTC growth to survive N years" for
+several N) is bracketed at once. Each round evaluates a handful of
+candidate values per problem in a single batched call to
+``simulate_mstr_paths`` with zero volatility, which reproduces
+``simulate_mstr_monthly`` path for path, and shrinks every bracket to the
+pair of candidates where survival flips.
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Union
+
+from .montecarlo import NO_COLLAPSE, simulate_mstr_paths
+
+# Inputs the batched engine accepts as per-path arrays
+SOLVABLE = (
+    "btc_price_start",
+    "btc_growth_annual",
+    "btc_holdings_start",
+    "cash_start",
+    "shares_start",
+    "operating_burn_annual",
+    "issuance_capacity_pct_annual",
+    "base_premium",
+)
+
+# -----------------------------
+# Results
+# -----------------------------
+@dataclass
+class BreakevenResult:
+    """Thresholds for each problem, on the surviving side of the flip.
+
+    ``threshold`` is NaN where survival does not change between ``lo`` and
+    ``hi``. ``survives_above`` tells whether larger values are the safe
+    side (True for growth, issuance, premium, cash; False for burn).
+    """
+    parameter: str
+    threshold: np.ndarray
+    survives_above: np.ndarray
+    horizon_months: np.ndarray
+    rounds: int
+
+# -----------------------------
+# Solver
+# -----------------------------
+def _survives(base_inputs: dict, parameter: str, values: np.ndarray,
+              horizons: np.ndarray, overrides: Dict[str, np.ndarray]) -> np.ndarray:
+    """Survival of each candidate value (flattened problems x candidates)."""
+    inputs = dict(base_inputs)
+    inputs.update(overrides)
+    inputs[parameter] = values
+    inputs["btc_volatility_annual"] = 0.0
+    inputs["n_months"] = int(horizons.max())
+    result = simulate_mstr_paths(n_paths=len(values), **inputs)
+    cm = result.collapse_month
+    return (cm == NO_COLLAPSE) | (cm >= horizons)
+
+
+def solve_breakeven(
+    base_inputs: dict,
+    parameter: str,
+    lo: float,
+    hi: float,
+    horizon_months: Union[int, Sequence[int], None] = None,
+    overrides: Optional[Dict[str, Sequence[float]]] = None,
+    points_per_round: int = 16,
+    tol: float = 1e-4,
+    max_rounds: int = 30,
+) -> BreakevenResult:
+    """
+    Find the value of ``parameter`` in ``[lo, hi]`` at which the scenario
+    stops surviving, for one or many problems at once.
+
+    Problems are the broadcast of ``horizon_months`` (defaults to
+    ``base_inputs["n_months"]``) and the per-problem ``overrides`` of other
+    solvable inputs. Survival is assumed monotonic in ``parameter``.
+    """
+    if parameter not in SOLVABLE:
+        raise ValueError(f"Cannot solve for {parameter!r}; choose from {SOLVABLE}")
+
+    if horizon_months is None:
+        horizon_months = base_inputs["n_months"]
+    overrides = overrides or {}
+    arrays = np.broadcast_arrays(np.asarray(horizon_months, dtype=np.int64),
+                                 *(np.asarray(v, dtype=float) for v in overrides.values()))
+    horizons = np.atleast_1d(arrays[0]).ravel()
+    n_problems = len(horizons)
+    fixed = {name: np.atleast_1d(a).ravel() for name, a in zip(overrides, arrays[1:])}
+
+    def evaluate(values: np.ndarray) -> np.ndarray:
+        # values: [problems, candidates] -> survival of the same shape
+        k = values.shape[1]
+        flat = _survives(base_inputs, parameter, values.ravel(), np.repeat(horizons, k),
+                         {name: np.repeat(v, k) for name, v in fixed.items()})
+        return flat.reshape(values.shape)
+
+    # Survival at both ends decides direction and whether a flip exists
+    ends = evaluate(np.column_stack([np.full(n_problems, lo), np.full(n_problems, hi)]))
+    survives_above = ends[:, 1] & ~ends[:, 0]
+    solvable = ends[:, 0] != ends[:, 1]
+
+    low = np.full(n_problems, float(lo))
+    high = np.full(n_problems, float(hi))
+    steps = np.linspace(0.0, 1.0, points_per_round + 2)
+
+    rounds = 0
+    while rounds < max_rounds and solvable.any() and np.max((high - low)[solvable]) > tol:
+        rounds += 1
+        grid = low[:, None] + (high - low)[:, None] * steps
+        alive = evaluate(grid[:, 1:-1])
+        # Which side of the flip each candidate is on, with the known ends included
+        survival = np.column_stack([~survives_above, alive, survives_above])
+        past_flip = survival == survives_above[:, None]
+        # The new bracket is [last candidate before the flip, first one past it]
+        first = np.argmax(past_flip, axis=1)
+        right = np.take_along_axis(grid, first[:, None], axis=1)[:, 0]
+        left = np.take_along_axis(grid, np.maximum(first - 1, 0)[:, None], axis=1)[:, 0]
+        low = np.where(solvable, left, low)
+        high = np.where(solvable, right, high)
+
+    threshold = np.where(survives_above, high, low)
+    threshold = np.where(solvable, threshold, np.nan)
+
+    return BreakevenResult(
+        parameter=parameter,
+        threshold=threshold,
+        survives_above=survives_above,
+        horizon_months=horizons,
+        rounds=rounds,
+    )
@@ -0,0 +1,327 @@
+"""
+Streaming Monte Carlo aggregation.
+
+``simulate_mstr_bands`` runs ``simulate_mstr_paths`` in chunks and folds
+each chunk into mergeable per-month summaries instead of keeping every
+``[paths, months]`` history: quantile sketches for the percentile bands,
+running sums for the means, and collapse-month counts. Only those and a
+small sample of raw paths are returned, so memory is bounded by the chunk
+size rather than the number of paths.
+"""
+
+import time
+
+import numpy as np
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from .instruments import ConvertibleDebt, PreferredStock
+from .montecarlo import COLLAPSE_REASONS, NO_COLLAPSE, MarketImpact, PathResults, simulate_mstr_paths
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_QUANTILES = (5, 25, 50, 75, 95)
+
+# PathResults series that are summarised per month
+SERIES = tuple(f.name for f in fields(PathResults) if f.name not in ("collapse_month", "collapse_code"))
+
+# Column names used by ``simulate_mstr_monthly`` DataFrames
+_COLUMNS = {
+    'btc_price': 'BTC_Price', 'mstr_price': 'MSTR_Price', 'btc_holdings': 'BTC_Holdings',
+    'debt': 'Debt', 'shares': 'Shares', 'premium': 'Premium', 'nav_per_share': 'NAV_Per_Share',
+    'market_cap': 'Market_Cap', 'cash': 'Cash', 'inflows': 'Inflows', 'outflows': 'Outflows',
+    'btc_sold': 'BTC_Sold',
+}
+
+# -----------------------------
+# Quantile Sketch
+# -----------------------------
+class QuantileSketch:
+    """
+    Mergeable per-month quantile sketch for non-negative values.
+
+    Log-spaced buckets in the style of DDSketch: every quantile is returned
+    within ``relative_accuracy`` of a value of the right rank, and two
+    sketches with the same accuracy merge by adding counts. Values at or
+    below ``min_value`` (collapsed prices, zero cash) are counted exactly
+    as zero.
+    """
+
+    def __init__(self, n_months: int, relative_accuracy: float = 0.01, min_value: float = 1e-9):
+        self.n_months = n_months
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+        self.zeros = np.zeros(n_months, dtype=np.int64)
+        self.counts = np.zeros((n_months, 0), dtype=np.int64)
+        self.key_min = 0
+
+    @property
+    def count(self) -> np.ndarray:
+        """Values seen per month."""
+        return self.zeros + self.counts.sum(axis=1)
+
+    def _fit(self, key_min: int, key_max: int):
+        """Widen the bucket range to cover ``[key_min, key_max]``."""
+        if not self.counts.shape[1]:
+            self.key_min = key_min
+            self.counts = np.zeros((self.n_months, key_max - key_min + 1), dtype=np.int64)
+            return
+        key_hi = self.key_min + self.counts.shape[1] - 1
+        lo = max(0, self.key_min - key_min)
+        hi = max(0, key_max - key_hi)
+        if lo or hi:
+            self.counts = np.pad(self.counts, ((0, 0), (lo, hi)))
+            self.key_min -= lo
+
+    def add(self, values: np.ndarray):
+        """Add a ``[paths, months]`` chunk."""
+        values = np.asarray(values, dtype=float)
+        positive = values > self.min_value
+        self.zeros += (~positive).sum(axis=0)
+        if not positive.any():
+            return
+        keys = np.ceil(np.log(values[positive]) / self._log_gamma).astype(np.int64)
+        self._fit(int(keys.min()), int(keys.max()))
+        width = self.counts.shape[1]
+        months = np.broadcast_to(np.arange(self.n_months), values.shape)[positive]
+        flat = months * width + (keys - self.key_min)
+        self.counts += np.bincount(flat, minlength=self.n_months * width).reshape(self.n_months, width)
+
+    def merge(self, other: "QuantileSketch"):
+        """Fold another sketch (same months and accuracy) into this one."""
+        if other.n_months != self.n_months or other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Can only merge sketches with the same months and accuracy")
+        self.zeros += other.zeros
+        if not other.counts.shape[1]:
+            return
+        self._fit(other.key_min, other.key_min + other.counts.shape[1] - 1)
+        start = other.key_min - self.key_min
+        self.counts[:, start:start + other.counts.shape[1]] += other.counts
+
+    def quantiles(self, q: Sequence[float] = DEFAULT_QUANTILES) -> np.ndarray:
+        """Per-month percentiles (``q`` in 0-100), shape ``[len(q), months]``."""
+        q = np.asarray(q, dtype=float) / 100.0
+        rank = q[:, None] * (self.count - 1)[None, :]
+        cumulative = np.cumsum(self.counts, axis=1) + self.zeros[:, None]
+        out = np.zeros((len(q), self.n_months))
+        for j in range(len(q)):
+            # First bucket whose cumulative count passes the rank
+            idx = (cumulative <= rank[j][:, None]).sum(axis=1)
+            value = 2 * self.gamma ** (self.key_min + idx) / (self.gamma + 1)
+            out[j] = np.where(rank[j] < self.zeros, 0.0, value)
+        return out
+
+# -----------------------------
+# Aggregation
+# -----------------------------
+@dataclass
+class BandResults:
+    """Percentile bands, means and collapse counts from ``simulate_mstr_bands``.
+
+    ``bands[series]`` is ``[len(quantiles), months]``, ``means[series]`` is
+    ``[months]``, ``collapse_counts[m]`` is the number of paths that
+    collapsed in month ``m`` and ``sample`` holds the first few raw paths.
+    """
+    n_paths: int
+    n_months: int
+    quantiles: Tuple[float, ...]
+    bands: Dict[str, np.ndarray]
+    means: Dict[str, np.ndarray]
+    collapse_counts: np.ndarray
+    collapse_reasons: Dict[str, int]
+    sample: PathResults
+
+    def band(self, series: str, q: float) -> np.ndarray:
+        return self.bands[series][self.quantiles.index(q)]
+
+    def collapse_probability(self) -> float:
+        """Fraction of paths that collapsed within the horizon."""
+        return float(self.collapse_counts.sum() / self.n_paths) if self.n_paths else 0.0
+
+    def frame(self) -> "pd.DataFrame":
+        """One row per month: ``<Series>_P<q>`` and ``<Series>_Mean`` columns plus collapse counts."""
+        import pandas as pd
+
+        months = np.arange(self.n_months)
+        columns = {'Month': months, 'Year': months / 12.0}
+        for series, band in self.bands.items():
+            name = _COLUMNS.get(series, series)
+            for q, values in zip(self.quantiles, band):
+                columns[f"{name}_P{q:g}"] = values
+            columns[f"{name}_Mean"] = self.means[series]
+        columns['Collapses'] = self.collapse_counts
+        return pd.DataFrame(columns)
+
+
+class BandAccumulator:
+    """Running, mergeable aggregate of ``PathResults`` chunks."""
+
+    def __init__(self, n_months: int, series: Sequence[str] = SERIES,
+                 quantiles: Sequence[float] = DEFAULT_QUANTILES, relative_accuracy: float = 0.01,
+                 n_samples: int = 20):
+        self.n_months = n_months
+        self.series = tuple(series)
+        self.quantiles = tuple(quantiles)
+        self.n_samples = n_samples
+        self.n_paths = 0
+        self.sketches = {s: QuantileSketch(n_months, relative_accuracy) for s in self.series}
+        self.sums = {s: np.zeros(n_months) for s in self.series}
+        self.collapse_counts = np.zeros(n_months, dtype=np.int64)
+        self.reason_counts = np.zeros(max(COLLAPSE_REASONS) + 1, dtype=np.int64)
+        self._samples: List[PathResults] = []
+        self._sampled = 0
+
+    def add(self, chunk: PathResults):
+        for s in self.series:
+            values = getattr(chunk, s)
+            self.sketches[s].add(values)
+            self.sums[s] += values.sum(axis=0)
+        collapsed = chunk.collapse_month != NO_COLLAPSE
+        self.collapse_counts += np.bincount(chunk.collapse_month[collapsed], minlength=self.n_months)
+        self.reason_counts += np.bincount(chunk.collapse_code, minlength=len(self.reason_counts))
+        self.n_paths += chunk.n_paths
+        if self._sampled < self.n_samples:
+            take = min(self.n_samples - self._sampled, chunk.n_paths)
+            self._samples.append(_head(chunk, take))
+            self._sampled += take
+
+    def merge(self, other: "BandAccumulator"):
+        for s in self.series:
+            self.sketches[s].merge(other.sketches[s])
+            self.sums[s] += other.sums[s]
+        self.collapse_counts += other.collapse_counts
+        self.reason_counts += other.reason_counts
+        self.n_paths += other.n_paths
+        for chunk in other._samples:
+            if self._sampled >= self.n_samples:
+                break
+            take = min(self.n_samples - self._sampled, chunk.n_paths)
+            self._samples.append(_head(chunk, take))
+            self._sampled += take
+
+    def result(self) -> BandResults:
+        n = max(self.n_paths, 1)
+        return BandResults(
+            n_paths=self.n_paths,
+            n_months=self.n_months,
+            quantiles=self.quantiles,
+            bands={s: self.sketches[s].quantiles(self.quantiles) for s in self.series},
+            means={s: self.sums[s] / n for s in self.series},
+            collapse_counts=self.collapse_counts.copy(),
+            collapse_reasons={reason: int(self.reason_counts[code]) for code, reason in COLLAPSE_REASONS.items()},
+            sample=_concat(self._samples, self.n_months),
+        )
+
+
+def _head(results: PathResults, n: int) -> PathResults:
+    return PathResults(**{f.name: getattr(results, f.name)[:n].copy() for f in fields(PathResults)})
+
+
+def _concat(chunks: List[PathResults], n_months: int) -> PathResults:
+    if not chunks:
+        empty = {f.name: np.zeros((0, n_months)) for f in fields(PathResults)}
+        empty.update(collapse_month=np.zeros(0, dtype=np.int64), collapse_code=np.zeros(0, dtype=np.int8))
+        return PathResults(**empty)
+    return PathResults(**{f.name: np.concatenate([getattr(c, f.name) for c in chunks])
+                          for f in fields(PathResults)})
+
+# -----------------------------
+# Chunked Simulation
+# -----------------------------
+def band_chunks(n_paths: int, n_months: int, seed: Optional[int] = None, chunk_size: Optional[int] = None,
+                memory_budget_mb: float = 256.0) -> List[Tuple[int, np.random.SeedSequence]]:
+    """``(paths, seed)`` of every chunk ``simulate_mstr_bands`` runs, in order."""
+    if chunk_size is None:
+        # PathResults holds 12 float series plus the BTC paths and temporaries
+        bytes_per_path = max(n_months, 1) * 8 * 16
+        chunk_size = max(1, int(memory_budget_mb * 2**20 // bytes_per_path))
+    chunk_size = min(chunk_size, max(n_paths, 1))
+    starts = range(0, n_paths, chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    return [(min(chunk_size, n_paths - start), chunk_seed) for start, chunk_seed in zip(starts, seeds)]
+
+
+def run_band_chunk(n_paths: int, seed: np.random.SeedSequence, inputs: dict, series: Sequence[str] = SERIES,
+                   quantiles: Sequence[float] = DEFAULT_QUANTILES, relative_accuracy: float = 0.01,
+                   n_samples: int = 20) -> BandAccumulator:
+    """One chunk as its own accumulator, for merging elsewhere (e.g. in a process pool)."""
+    accumulator = BandAccumulator(inputs["n_months"], series, quantiles, relative_accuracy, n_samples)
+    accumulator.add(simulate_mstr_paths(n_paths=n_paths, seed=seed, **inputs))
+    return accumulator
+
+
+def simulate_mstr_bands(
+    n_paths: int,
+    n_months: int,
+    btc_price_start: float,
+    btc_growth_annual: float,
+    btc_volatility_annual: float,
+    btc_holdings_start: float,
+    cash_start: float,
+    shares_start: float,
+    convertible_debts: List[ConvertibleDebt],
+    preferred_stocks: List[PreferredStock],
+    operating_burn_annual: float,
+    issuance_capacity_pct_annual: float,
+    base_premium: float,
+    dynamic_premium: bool,
+    seed: Optional[int] = None,
+    generator=None,
+    premium_drawdown: Optional[float] = None,
+    market_impact: Optional[MarketImpact] = None,
+    quantiles: Sequence[float] = DEFAULT_QUANTILES,
+    series: Sequence[str] = SERIES,
+    n_samples: int = 20,
+    relative_accuracy: float = 0.01,
+    chunk_size: Optional[int] = None,
+    memory_budget_mb: float = 256.0,
+    phase_times: Optional[Dict[str, float]] = None,
+) -> BandResults:
+    """
+    ``simulate_mstr_paths`` aggregated in chunks.
+
+    Takes the same (scalar) inputs, including ``generator``,
+    ``premium_drawdown`` and ``market_impact``. Paths are simulated ``chunk_size`` at a time
+    (by default as many as fit in ``memory_budget_mb``), each chunk from
+    its own child of ``seed``, so results are reproducible for a given
+    seed and chunk size.
+
+    ``phase_times`` accumulates the engine phases of every chunk (see
+    ``simulate_mstr_paths``) plus ``aggregation`` for folding chunks into
+    the bands.
+    """
+    inputs = dict(
+        n_months=n_months,
+        btc_price_start=btc_price_start,
+        btc_growth_annual=btc_growth_annual,
+        btc_volatility_annual=btc_volatility_annual,
+        btc_holdings_start=btc_holdings_start,
+        cash_start=cash_start,
+        shares_start=shares_start,
+        convertible_debts=convertible_debts,
+        preferred_stocks=preferred_stocks,
+        operating_burn_annual=operating_burn_annual,
+        issuance_capacity_pct_annual=issuance_capacity_pct_annual,
+        base_premium=base_premium,
+        dynamic_premium=dynamic_premium,
+        generator=generator,
+        premium_drawdown=premium_drawdown,
+        market_impact=market_impact,
+    )
+    if phase_times is not None:
+        phase_times.setdefault('aggregation', 0.0)
+    accumulator = BandAccumulator(n_months, series, quantiles, relative_accuracy, n_samples)
+    for n, chunk_seed in band_chunks(n_paths, n_months, seed, chunk_size, memory_budget_mb):
+        chunk = simulate_mstr_paths(n_paths=n, seed=chunk_seed, phase_times=phase_times, **inputs)
+        start = time.perf_counter()
+        accumulator.add(chunk)
+        if phase_times is not None:
+            phase_times['aggregation'] += time.perf_counter() - start
+    start = time.perf_counter()
+    result = accumulator.result()
+    if phase_times is not None:
+        phase_times['aggregation'] += time.perf_counter() - start
+    return result
@@ -0,0 +1,142 @@
+"""
+Parallel parameter sweeps over ``simulate_mstr_monthly``.
+
+Grid points are split into contiguous chunks and spread across a process
+pool. The fixed inputs are shipped once per worker via the pool
+initializer, so each task only pickles a small ``[points, axes]`` array of
+swept values and returns a vector of collapse months.
+"""
+
+import inspect
+import itertools
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from .engine import simulate_mstr_monthly
+from .montecarlo import NO_COLLAPSE
+
+# Scalar inputs that can be put on a sweep axis
+SWEEPABLE = tuple(
+    name for name in inspect.signature(simulate_mstr_monthly).parameters
+    if name not in ("n_months", "btc_volatility_annual", "convertible_debts",
+                    "preferred_stocks", "dynamic_premium", "full_history", "checkpoint_every",
+                    "checkpoints", "resume_from", "btc_path", "phase_times")
+)
+
+# -----------------------------
+# Results
+# -----------------------------
+@dataclass
+class SweepResult:
+    """Collapse month for every grid point, shaped like the grid.
+
+    ``axes`` maps each swept input to its values, in grid-dimension order.
+    ``collapse_month`` is ``NO_COLLAPSE`` (-1) where the run survived.
+    """
+    axes: Dict[str, np.ndarray]
+    collapse_month: np.ndarray
+    n_months: int
+
+    @property
+    def survived(self) -> np.ndarray:
+        return self.collapse_month == NO_COLLAPSE
+
+    def _reduce_axes(self, x: str, y: str):
+        names = list(self.axes)
+        other = tuple(k for k, name in enumerate(names) if name not in (x, y))
+        # Order the remaining two dimensions as [y, x] for heatmaps
+        transpose = names.index(y) > names.index(x)
+        return other, transpose
+
+    def survival_surface(self, x: str, y: str) -> np.ndarray:
+        """Fraction of grid points surviving, averaged over the other axes. Shape ``[y, x]``."""
+        other, transpose = self._reduce_axes(x, y)
+        surface = self.survived.mean(axis=other) if other else self.survived.astype(float)
+        return surface.T if transpose else surface
+
+    def collapse_surface(self, x: str, y: str) -> np.ndarray:
+        """Earliest collapse month over the other axes (``n_months`` if none). Shape ``[y, x]``."""
+        other, transpose = self._reduce_axes(x, y)
+        months = np.where(self.survived, self.n_months, self.collapse_month)
+        surface = months.min(axis=other) if other else months
+        return surface.T if transpose else surface
+
+# -----------------------------
+# Worker
+# -----------------------------
+_worker_inputs: dict = {}
+_worker_names: List[str] = []
+
+
+def _init_worker(base_inputs: dict, names: List[str]):
+    global _worker_inputs, _worker_names
+    _worker_inputs = base_inputs
+    _worker_names = names
+
+
+def _run_chunk(values: np.ndarray) -> np.ndarray:
+    out = np.empty(len(values), dtype=np.int64)
+    inputs = dict(_worker_inputs)
+    for k, row in enumerate(values):
+        inputs.update(zip(_worker_names, row.tolist()))
+        summary = simulate_mstr_monthly(**inputs, full_history=False)
+        out[k] = NO_COLLAPSE if summary.collapse_month is None else summary.collapse_month
+    return out
+
+
+def run_points(base_inputs: dict, names: List[str], values: np.ndarray) -> np.ndarray:
+    """Collapse months of ``[points, names]`` values, for pools without the initializer."""
+    _init_worker(base_inputs, names)
+    return _run_chunk(values)
+
+# -----------------------------
+# Sweep
+# -----------------------------
+def grid_points(axes: Dict[str, Sequence[float]]):
+    """Axis names, axis values and the ``[points, axes]`` Cartesian product."""
+    unknown = [name for name in axes if name not in SWEEPABLE]
+    if unknown:
+        raise ValueError(f"Cannot sweep {unknown}; choose from {SWEEPABLE}")
+
+    names = list(axes)
+    axis_values = [np.asarray(axes[name], dtype=float) for name in names]
+    points = np.array(list(itertools.product(*axis_values)), dtype=float).reshape(-1, len(names))
+    return names, axis_values, points
+
+
+def sweep_grid(
+    base_inputs: dict,
+    axes: Dict[str, Sequence[float]],
+    max_workers: Optional[int] = None,
+    chunks_per_worker: int = 4,
+) -> SweepResult:
+    """
+    Run ``simulate_mstr_monthly`` over the Cartesian product of ``axes``.
+
+    ``base_inputs`` holds every keyword argument of ``simulate_mstr_monthly``;
+    each axis overrides one of them (see ``SWEEPABLE``). ``max_workers``
+    defaults to every core, and 1 runs in-process without a pool.
+    """
+    names, axis_values, points = grid_points(axes)
+    shape = tuple(len(v) for v in axis_values)
+
+    workers = max_workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(points)))
+
+    if workers == 1:
+        _init_worker(base_inputs, names)
+        flat = _run_chunk(points)
+    else:
+        chunks = np.array_split(points, workers * chunks_per_worker)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(base_inputs, names)) as pool:
+            flat = np.concatenate(list(pool.map(_run_chunk, chunks)))
+
+    return SweepResult(
+        axes=dict(zip(names, axis_values)),
+        collapse_month=flat.reshape(shape),
+        n_months=base_inputs["n_months"],
+    )
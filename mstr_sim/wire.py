@@ -0,0 +1,107 @@
+"""
+JSON encoding of simulation inputs and results for the local service.
+
+``dumps``/``loads`` round-trip what the engines exchange: numpy arrays
+(base64, bit-exact), DataFrames, tuples, dicts with non-string keys and
+the package's dataclasses (instruments, path generators, result types).
+Only the dataclasses registered in ``_TYPES`` are rebuilt, so a request
+cannot make the server instantiate arbitrary classes.
+"""
+
+import base64
+import dataclasses
+import importlib
+import json
+from typing import Any
+
+import numpy as np
+
+# Dataclasses that may cross the wire: name -> module
+_TYPES = {
+    "ConvertibleDebt": "instruments",
+    "PreferredStock": "instruments",
+    "GBM": "paths",
+    "BlockBootstrap": "paths",
+    "RegimeSwitching": "paths",
+    "SimulationSummary": "engine",
+    "PathResults": "montecarlo",
+    "MarketImpact": "montecarlo",
+    "BandResults": "streaming",
+    "SweepResult": "sweep",
+    "BreakevenResult": "solver",
+    "SensitivityResult": "sensitivity",
+}
+
+
+def _type(name: str) -> type:
+    if name not in _TYPES:
+        raise ValueError(f"Unsupported type {name!r} in payload")
+    return getattr(importlib.import_module(f".{_TYPES[name]}", __package__), name)
+
+# -----------------------------
+# Encoding
+# -----------------------------
+def encode(value: Any) -> Any:
+    """JSON-compatible form of ``value``."""
+    if value is None or isinstance(value, (bool, str, int, float)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == "O":
+            return {"__list__": [encode(v) for v in value.tolist()]}
+        data = base64.b64encode(np.ascontiguousarray(value).tobytes()).decode("ascii")
+        return {"__ndarray__": value.dtype.str, "shape": list(value.shape), "data": data}
+    if isinstance(value, tuple):
+        return {"__tuple__": [encode(v) for v in value]}
+    if isinstance(value, list):
+        return [encode(v) for v in value]
+    if isinstance(value, dict):
+        if all(isinstance(k, str) and not k.startswith("__") for k in value):
+            return {k: encode(v) for k, v in value.items()}
+        return {"__dict__": [[encode(k), encode(v)] for k, v in value.items()]}
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        name = type(value).__name__
+        if name not in _TYPES:
+            raise TypeError(f"Cannot encode {name}")
+        return {"__type__": name,
+                "fields": {f.name: encode(getattr(value, f.name)) for f in dataclasses.fields(value)}}
+    if hasattr(value, "to_dict") and hasattr(value, "columns"):
+        return {"__frame__": [[str(c), encode(value[c].to_numpy())] for c in value.columns]}
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+def decode(value: Any) -> Any:
+    """Inverse of ``encode``."""
+    if isinstance(value, list):
+        return [decode(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if "__ndarray__" in value:
+        data = base64.b64decode(value["data"])
+        return np.frombuffer(data, dtype=np.dtype(value["__ndarray__"])).reshape(value["shape"]).copy()
+    if "__list__" in value:
+        return np.array([decode(v) for v in value["__list__"]], dtype=object)
+    if "__tuple__" in value:
+        return tuple(decode(v) for v in value["__tuple__"])
+    if "__dict__" in value:
+        return {_hashable(decode(k)): decode(v) for k, v in value["__dict__"]}
+    if "__type__" in value:
+        return _type(value["__type__"])(**{k: decode(v) for k, v in value["fields"].items()})
+    if "__frame__" in value:
+        import pandas as pd
+
+        return pd.DataFrame({name: decode(column) for name, column in value["__frame__"]})
+    return {k: decode(v) for k, v in value.items()}
+
+
+def _hashable(key: Any) -> Any:
+    return tuple(key) if isinstance(key, list) else key
+
+
+def dumps(value: Any) -> bytes:
+    return json.dumps(encode(value), separators=(",", ":")).encode()
+
+
+def loads(data: bytes) -> Any:
+    return decode(json.loads(data))
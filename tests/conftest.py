@@ -0,0 +1,24 @@
+import pytest
+
+from mstr_sim.instruments import ConvertibleDebt, PreferredStock
+from mstr_sim.scenario import scenario_inputs
+
+
+def make_inputs(**overrides) -> dict:
+    """Default scenario with a coupon-paying note book and one preferred."""
+    inputs = scenario_inputs({"n_years": 10})
+    inputs.update(
+        convertible_debts=[
+            ConvertibleDebt("Notes 2028", 1e9, 36, 0.01, 300.0),
+            ConvertibleDebt("Notes 2030", 2e9, 60, 0.02, 400.0),
+            ConvertibleDebt("Notes 2032", 1e9, 84, 0.0, 500.0),
+        ],
+        preferred_stocks=[PreferredStock("Series A", 1e9, 0.08)],
+    )
+    inputs.update(overrides)
+    return inputs
+
+
+@pytest.fixture
+def inputs() -> dict:
+    return make_inputs()
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setenv("MSTR_SIM_OFFLINE", "1")
+    for name in ("MSTR_SIM_CACHE_DIR", "MSTR_SIM_ARCHIVE_DIR", "MSTR_SIM_SERVICE_URL", "MSTR_SIM_DEBUG"):
+        monkeypatch.delenv(name, raising=False)
+
+    def run(tab=None):
+        at = AppTest.from_file(APP, default_timeout=120)
+        if tab:
+            at.session_state['chart_tab'] = tab
+        at.run()
+        assert not at.exception, at.exception
+        return at
+    return run
+
+
+def metrics(at) -> dict:
+    return {m.label: m.value for m in at.metric}
+
+
+def submit(at):
+    [b for b in at.button if 'Run Simulation' in b.label][0].click()
+    at.run()
+    assert not at.exception, at.exception
+    return at
+
+
+@pytest.mark.parametrize("tab", ["Price & Premium", "Balance Sheet", "Cash Flow", "Monte Carlo"])
+def test_tab_renders(app, tab):
+    at = app(tab)
+    assert at.get('plotly_chart')
+
+
+def test_sidebar_edits_apply_on_submit(app):
+    at = app()
+    before = metrics(at)
+    at.slider(key='btc_growth_slider').set_value(-50)
+    at.run()
+    assert metrics(at) == before
+
+    at.slider(key='btc_growth_slider').set_value(-50)
+    after = metrics(submit(at))
+    assert after['Final MSTR Price'] != before['Final MSTR Price']
+
+
+def test_band_toggle_reruns_cleanly(app):
+    at = app("Monte Carlo")
+    charts = len(at.get('plotly_chart'))
+    at.session_state['mc_outer_band'] = "None"
+    at.run()
+    assert not at.exception, at.exception
+    assert len(at.get('plotly_chart')) == charts
@@ -0,0 +1,95 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from mstr_sim.archive import RunArchive
+from mstr_sim.engine import simulate_mstr_monthly
+from mstr_sim.paths import BlockBootstrap
+from mstr_sim.streaming import simulate_mstr_bands
+
+from conftest import make_inputs
+
+
+def test_monthly_round_trip_is_memory_mapped(tmp_path):
+    archive = RunArchive(str(tmp_path))
+    inputs = make_inputs(btc_growth_annual=-0.5)
+    result = simulate_mstr_monthly(**inputs)
+    key = archive.save("monthly", inputs, result, label="bear")
+    assert archive.save("monthly", inputs, result, label="again") == key  # no-op
+    assert os.listdir(tmp_path) == [key + ".arrow"]
+
+    run = archive.load(key)
+    frame, month, reason = run.result()
+    pd.testing.assert_frame_equal(frame, result[0])
+    assert (month, reason) == result[1:] and run.label == "bear"
+    assert run.inputs["convertible_debts"] == inputs["convertible_debts"]
+    price = run.column("MSTR_Price")
+    assert not price.flags.writeable and not price.flags.owndata
+    assert archive.get("monthly", inputs) is not None and archive.get("monthly", make_inputs()) is None
+
+
+def test_bands_round_trip(tmp_path):
+    archive = RunArchive(str(tmp_path))
+    inputs = make_inputs(n_months=24)
+    bands = simulate_mstr_bands(n_paths=300, seed=1, **inputs)
+    restored = archive.load(archive.save("bands", inputs, bands, n_paths=300, seed=1)).result()
+    assert restored.n_paths == 300 and restored.quantiles == bands.quantiles
+    for series in bands.bands:
+        np.testing.assert_array_equal(restored.bands[series], bands.bands[series])
+        np.testing.assert_array_equal(restored.means[series], bands.means[series])
+    np.testing.assert_array_equal(restored.collapse_counts, bands.collapse_counts)
+    assert restored.collapse_reasons == bands.collapse_reasons
+
+
+def test_prune_keeps_the_newest(tmp_path):
+    archive = RunArchive(str(tmp_path), max_runs=2)
+    keys = []
+    for k, growth in enumerate((-0.2, 0.0, 0.2)):
+        inputs = make_inputs(btc_growth_annual=growth, n_months=12)
+        keys.append(archive.save("monthly", inputs, simulate_mstr_monthly(**inputs)))
+        os.utime(os.path.join(tmp_path, keys[-1] + ".arrow"), (1000 + k, 1000 + k))
+    assert archive.keys() == sorted(keys[1:])
+    assert len(archive.index()) == 2
+
+
+def test_index_compare_and_export(tmp_path):
+    archive = RunArchive(str(tmp_path))
+    short, long = make_inputs(n_months=12), make_inputs(n_months=24)
+    a = archive.save("monthly", short, simulate_mstr_monthly(**short), label="run")
+    b = archive.save("monthly", long, simulate_mstr_monthly(**long), label="run")
+    index = archive.index()
+    assert set(index["Key"]) == {a, b} and sorted(index["Months"]) == [12, 24]
+    assert archive.resolve(a[:10]) == a
+    with pytest.raises(KeyError):
+        archive.resolve("")
+
+    compared = archive.compare([a, b])
+    assert list(compared.columns) == ["run", f"run ({b[:8]})"] and len(compared) == 24
+    assert compared["run"].iloc[12:].isna().all()
+
+    path = str(tmp_path / "runs.parquet")
+    archive.export([a, b], path)
+    exported = pq.read_table(path).to_pandas()
+    assert len(exported) == 36 and set(exported["Key"]) == {a, b}
+
+
+def test_generators_with_history_are_stored_by_reference(tmp_path):
+    archive = RunArchive(str(tmp_path))
+    inputs = make_inputs(n_months=12)
+    generator = BlockBootstrap(np.exp(np.linspace(0, 1, 400)))
+    bands = simulate_mstr_bands(n_paths=50, seed=0, generator=generator, **inputs)
+    run = archive.load(archive.save("bands", inputs, bands, n_paths=50, generator=generator))
+    assert run.extra["generator"]["type"] == "BlockBootstrap"
+    other = BlockBootstrap(np.exp(np.linspace(0, 2, 400)))
+    assert archive.key("bands", inputs, n_paths=50, generator=other) != run.key
+
+
+def test_unknown_kind_and_missing_run(tmp_path):
+    archive = RunArchive(str(tmp_path))
+    with pytest.raises(ValueError):
+        archive.save("sweep", make_inputs(), None)
+    with pytest.raises(KeyError):
+        archive.load("0" * 64)
@@ -0,0 +1,31 @@
+import json
+
+from benchmarks.suite import main, make_inputs, time_call
+
+
+def test_time_call_calibrates_loops():
+    calls = []
+    best, median, loops = time_call(lambda: calls.append(1), min_time=0.001, repeats=3)
+    assert loops > 1 and len(calls) >= 3 * loops
+    assert 0 < best <= median
+
+
+def test_make_inputs_has_requested_book():
+    inputs = make_inputs(5, n_tranches=30)
+    assert inputs["n_months"] == 60
+    assert len(inputs["convertible_debts"]) == 30
+    assert all(0 <= d.maturity_month < 60 + 12 for d in inputs["convertible_debts"])
+
+
+def test_filtered_quick_run_writes_and_compares(tmp_path, capsys):
+    output = str(tmp_path / "bench.json")
+    argv = ["--quick", "-k", "scalar_summary", "--min-time", "0.001", "--repeats", "1"]
+    assert main(argv + ["-o", output]) == 0
+    with open(output) as f:
+        results = json.load(f)
+    assert {c["name"] for c in results["cases"]} == {"scalar_summary"}
+    assert all(c["throughput"] > 0 for c in results["cases"])
+    assert "numpy" in results["meta"]
+
+    assert main(argv + ["--compare", output]) == 0
+    assert "ratio > 1 means slower now" in capsys.readouterr().err
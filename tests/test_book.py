@@ -0,0 +1,55 @@
+import numpy as np
+
+from mstr_sim.book import TrancheBook
+from mstr_sim.instruments import ConvertibleDebt, PreferredStock
+
+
+def random_book(rng, n=40):
+    debts = [ConvertibleDebt(f"N{j}", float(rng.uniform(1e7, 3e9)), int(rng.integers(0, 24)),
+                             float(rng.uniform(0, 0.06)), float(rng.uniform(50, 3000))) for j in range(n)]
+    prefs = [PreferredStock(f"P{j}", float(rng.uniform(1e7, 1e9)), float(rng.uniform(0, 0.1))) for j in range(5)]
+    return debts, prefs
+
+
+def test_totals_match_list_scan_bit_for_bit():
+    rng = np.random.default_rng(0)
+    debts, prefs = random_book(rng)
+    book = TrancheBook(debts, prefs)
+    remaining = list(debts)
+
+    assert book.pref_total == sum(p.principal for p in prefs)
+    assert book.annual_dividends == sum(p.principal * p.dividend_rate for p in prefs)
+    for month in range(24):
+        maturing = [d for d in remaining if d.maturity_month == month]
+        assert [book.names[j] for j in book.maturing(month)] == [d.name for d in maturing]
+        book.retire(book.maturing(month))
+        remaining = [d for d in remaining if d.maturity_month != month]
+        assert book.debt_total == sum(d.principal for d in remaining)
+        assert book.annual_interest == sum(d.principal * d.coupon_rate for d in remaining)
+        assert book.n_outstanding == len(remaining)
+
+
+def test_retired_tranches_no_longer_mature():
+    debts = [ConvertibleDebt("a", 1e9, 12, 0.0, 300.0), ConvertibleDebt("b", 2e9, 12, 0.0, 400.0)]
+    book = TrancheBook(debts, [])
+    book.retire(np.array([0]))
+    assert book.maturing(12).tolist() == [1]
+    assert book.maturing(13).size == 0
+
+
+def test_snapshot_restore():
+    rng = np.random.default_rng(1)
+    book = TrancheBook(*random_book(rng))
+    snapshot = book.snapshot()
+    totals = book.debt_total, book.annual_interest
+    for month in range(12):
+        book.retire(book.maturing(month))
+    book.restore(snapshot)
+    assert (book.debt_total, book.annual_interest) == totals
+    assert book.outstanding.all()
+
+
+def test_empty_book():
+    book = TrancheBook([], [])
+    assert len(book) == 0 and book.debt_total == 0.0 and book.pref_total == 0.0
+    assert book.maturing(0).size == 0
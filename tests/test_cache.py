@@ -0,0 +1,172 @@
+import os
+import pickle
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from mstr_sim.cache import ResultCache, TTLCache, input_key
+from mstr_sim.instruments import ConvertibleDebt
+
+
+def test_input_key_is_canonical():
+    debt = ConvertibleDebt("a", 1e9, 36, 0.0, 300.0)
+    assert input_key("ns", a=1, b=[debt]) == input_key("ns", b=[debt], a=1.0)
+    assert input_key("ns", a=1) != input_key("other", a=1)
+    assert input_key("ns", x=np.arange(3.0)) != input_key("ns", x=np.arange(3.0) + 1)
+    with pytest.raises(TypeError):
+        input_key("ns", f=object())
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # a is now the most recent
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_disk_tier_round_trip(tmp_path):
+    value = {"x": np.arange(5.0), "label": "run"}
+    ResultCache(directory=str(tmp_path)).put("k" * 64, value)
+
+    fresh = ResultCache(directory=str(tmp_path))
+    loaded = fresh.get("k" * 64)
+    np.testing.assert_array_equal(loaded["x"], value["x"])
+    assert loaded["label"] == "run" and fresh.hits == 1
+
+
+def test_disk_tier_keeps_at_most_max_disk_entries(tmp_path):
+    cache = ResultCache(max_entries=1, directory=str(tmp_path), max_disk_entries=3)
+    for k in range(6):
+        cache.put(f"{k:064d}", k)
+    files = [n for _, _, names in os.walk(tmp_path) for n in names if n.endswith(".pkl")]
+    assert len(files) <= 3
+    assert cache.get(f"{5:064d}") == 5
+
+
+def test_get_or_compute_and_call():
+    cache = ResultCache()
+    calls = []
+    fn = lambda x: calls.append(x) or x * 2
+    assert cache.get_or_compute("k", lambda: fn(2)) == 4
+    assert cache.get_or_compute("k", lambda: fn(3)) == 4
+    assert calls == [2]
+    assert cache.call(_double, x=21) == 42
+    assert cache.get(ResultCache.call_key(_double, x=21)) == 42
+
+
+def _double(x):
+    return 2 * x
+
+
+def test_ttl_cache_serves_fresh_then_falls_back(tmp_path):
+    cache = TTLCache(ttl_seconds=0.05, directory=str(tmp_path))
+    assert cache.get_or_fetch("q", lambda: 1) == (1, False)
+    assert cache.get_or_fetch("q", lambda: 2) == (1, False)
+    time.sleep(0.06)
+
+    def fail():
+        raise ConnectionError("offline")
+
+    # Last known good value from disk, even for a new instance
+    assert TTLCache(ttl_seconds=0.05, directory=str(tmp_path)).get_or_fetch("q", fail) == (1, True)
+    with pytest.raises(ConnectionError):
+        TTLCache(ttl_seconds=1.0).get_or_fetch("q", fail)
+
+
+def test_concurrent_misses_compute_once():
+    cache = ResultCache()
+    started = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "result"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+               for _ in range(8)]
+    threads[0].start()
+    started.wait()
+    for t in threads[1:]:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ["result"] * 8
+    assert len(calls) == 1 and cache.coalesced == 7
+
+
+def test_failed_compute_reaches_waiters_and_is_retried():
+    cache = ResultCache()
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        time.sleep(0.05)
+        raise RuntimeError("boom")
+
+    errors = []
+
+    def run():
+        try:
+            cache.get_or_compute("k", fail)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=run)
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=run)
+    follower.start()
+    leader.join()
+    follower.join()
+    assert errors == ["boom", "boom"]
+    assert cache.get_or_compute("k", lambda: "ok") == "ok"
+
+
+def test_disk_eviction_scans_only_past_the_cap(tmp_path, monkeypatch):
+    cache = ResultCache(max_entries=1, directory=str(tmp_path), max_disk_entries=100)
+    scans = []
+    walk = os.walk
+    monkeypatch.setattr(os, "walk", lambda *a, **k: scans.append(1) or walk(*a, **k))
+
+    for k in range(100):
+        cache.put(f"{k:064d}", k)
+    cache.put(f"{0:064d}", 0)  # overwrite, not a new file
+    assert len(scans) == 1  # the first write counts the directory
+    cache.put(f"{100:064d}", 100)
+    assert len(scans) == 2
+    files = [n for _, _, names in walk(tmp_path) for n in names if n.endswith(".pkl")]
+    assert len(files) == 90 and cache.get(f"{100:064d}") == 100
+
+
+@pytest.mark.parametrize("payload", [
+    b"cmstr_sim.cache\nRenamedResult\n.",  # class gone in this release: AttributeError
+    b"cno_such_module\nResult\n.",  # ModuleNotFoundError
+    pickle.dumps(np.arange(100.0))[:50],  # truncated
+    b"not a pickle at all",
+])
+def test_unreadable_disk_entries_are_misses_and_removed(tmp_path, payload):
+    key = "a" * 64
+    cache = ResultCache(directory=str(tmp_path))
+    path = cache._path(key)
+    os.makedirs(os.path.dirname(path))
+    with open(path, "wb") as f:
+        f.write(payload)
+
+    assert cache.get(key, "missing") == "missing"
+    assert not os.path.exists(path)
+    assert cache.get_or_compute(key, lambda: 7) == 7
+    assert ResultCache(directory=str(tmp_path)).get(key) == 7
+
+    ttl = TTLCache(ttl_seconds=60, directory=str(tmp_path))
+    with open(ttl._path("q"), "wb") as f:
+        f.write(payload)
+    assert ttl.get_or_fetch("q", lambda: 1) == (1, False)
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from mstr_sim.cli import main
+from mstr_sim.engine import simulate_mstr_monthly
+from mstr_sim.scenario import load_scenario
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIO = os.path.join(ROOT, "scenarios", "music_stops.json")
+
+
+def test_import_is_lazy():
+    code = "import sys, mstr_sim; mstr_sim.ConvertibleDebt; print('pandas' in sys.modules, 'numpy' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.split() == ["False", "False"]
+
+
+def test_run_writes_the_monthly_table(tmp_path):
+    output = str(tmp_path / "run.csv")
+    assert main(["run", SCENARIO, "-o", output, "--set", "btc_growth_annual=-0.3"]) == 0
+
+    inputs = dict(load_scenario(SCENARIO), btc_growth_annual=-0.3)
+    expected, _, _ = simulate_mstr_monthly(**inputs)
+    pd.testing.assert_frame_equal(pd.read_csv(output), expected, check_dtype=False)
+
+
+def test_run_paths_and_bands(tmp_path, capsys):
+    output = str(tmp_path / "paths.parquet")
+    assert main(["run", SCENARIO, "--paths", "50", "--seed", "1", "-o", output]) == 0
+    assert len(pd.read_parquet(output)) == 50
+    assert main(["run", SCENARIO, "--paths", "200", "--bands", "--seed", "1"]) == 0
+    assert "collapse probability" in capsys.readouterr().err
+
+
+def test_steps_per_year_with_paths_is_refused(capsys):
+    with pytest.raises(SystemExit) as exit:
+        main(["run", SCENARIO, "--paths", "10", "--steps-per-year", "365"])
+    assert exit.value.code == 2
+    assert "--steps-per-year" in capsys.readouterr().err
+
+
+def test_input_errors_exit_with_2(tmp_path, capsys):
+    assert main(["run", SCENARIO, "--impact-depth", "1e5"]) == 2
+    assert main(["run", SCENARIO, "--set", "no_such_input=1"]) == 2
+    assert main(["run", str(tmp_path / "missing.json")]) == 2
+    assert capsys.readouterr().err.count("error:") == 3
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from mstr_sim.engine import simulate_mstr_monthly
+from mstr_sim.paths import RegimeSwitching
+
+from conftest import make_inputs
+
+SCENARIOS = [
+    dict(),
+    dict(btc_growth_annual=-0.5),  # insolvency
+    dict(operating_burn_annual=6e11, issuance_capacity_pct_annual=0.0),  # liquidity crisis
+    dict(dynamic_premium=False, operating_burn_annual=5e8),
+    dict(premium_drawdown=0.5),
+]
+
+
+@pytest.mark.parametrize("overrides", SCENARIOS)
+@pytest.mark.parametrize("btc_path", [False, True])
+def test_summary_matches_full_run(overrides, btc_path):
+    inputs = make_inputs(**overrides)
+    if btc_path:
+        inputs["btc_path"] = RegimeSwitching().generate(1, inputs["n_months"], inputs["btc_price_start"],
+                                                        np.random.default_rng(3))[0]
+    frame, collapse_month, collapse_reason = simulate_mstr_monthly(**inputs)
+    summary = simulate_mstr_monthly(**inputs, full_history=False)
+
+    assert summary.collapse_month == collapse_month
+    assert summary.collapse_reason == collapse_reason
+    last = frame.iloc[summary.months_simulated - 1]
+    assert summary.final_btc_price == last['BTC_Price']
+    assert summary.final_mstr_price == last['MSTR_Price']
+    assert summary.final_btc_holdings == last['BTC_Holdings']
+    assert summary.final_shares == last['Shares']
+    assert summary.min_cash == min(inputs["cash_start"], frame['Cash'].iloc[:summary.months_simulated].min())
+
+
+def test_scenarios_cover_every_outcome():
+    reasons = {simulate_mstr_monthly(**make_inputs(**o), full_history=False).collapse_reason for o in SCENARIOS}
+    assert None in reasons and len(reasons) >= 3
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from mstr_sim.engine import simulate_mstr_monthly
+from mstr_sim.events import simulate_mstr_events
+from mstr_sim.instruments import ConvertibleDebt
+
+from conftest import make_inputs
+
+SERIES = ['BTC_Price', 'MSTR_Price', 'BTC_Holdings', 'Debt', 'Shares', 'Premium',
+          'NAV_Per_Share', 'Cash', 'Inflows', 'Outflows', 'BTC_Sold']
+
+
+@pytest.mark.parametrize("overrides", [
+    dict(),
+    dict(btc_growth_annual=-0.5),
+    dict(operating_burn_annual=6e11, issuance_capacity_pct_annual=0.0),
+    dict(dynamic_premium=False),
+    dict(premium_drawdown=0.5),
+])
+def test_monthly_steps_reproduce_the_monthly_engine(overrides):
+    inputs = make_inputs(**overrides)
+    frame, collapse_month, collapse_reason = simulate_mstr_monthly(**inputs)
+    events, collapse_step, reason = simulate_mstr_events(**inputs, steps_per_year=12,
+                                                         coupon_frequency=12, dividend_frequency=12)
+    assert (collapse_step, reason) == (collapse_month, collapse_reason)
+    for series in SERIES:
+        np.testing.assert_allclose(events[series], frame[series], rtol=1e-12, atol=1e-6, err_msg=series)
+
+
+@pytest.mark.parametrize("burn", [4e9, 6e9, 9e9])
+def test_daily_collapse_on_an_obligation_reports_its_month(burn):
+    # Burn is paid on the first day of each month; running out of BTC on that
+    # day is a collapse in that month, as in the monthly engine
+    inputs = make_inputs(convertible_debts=[], preferred_stocks=[], issuance_capacity_pct_annual=0.0,
+                         btc_growth_annual=0.0, operating_burn_annual=burn)
+    monthly = simulate_mstr_monthly(**inputs, full_history=False)
+    daily = simulate_mstr_events(**inputs, steps_per_year=365, full_history=False)
+    frame, step, _ = simulate_mstr_events(**inputs, steps_per_year=365)
+
+    assert daily.collapse_reason == monthly.collapse_reason == "Liquidity Crisis (Ran out of BTC)"
+    assert daily.collapse_month == monthly.collapse_month
+    assert round(frame['Month'].iloc[step]) == daily.collapse_month
+    assert daily.months_simulated == daily.collapse_month + 1
+
+
+def test_coupons_are_paid_on_their_dates():
+    note = ConvertibleDebt("Notes", 1e9, 24, 0.04, 1e9)  # never converts
+    inputs = make_inputs(convertible_debts=[note], preferred_stocks=[], operating_burn_annual=0.0,
+                         issuance_capacity_pct_annual=0.0, n_months=36)
+    frame, _, _ = simulate_mstr_events(**inputs, steps_per_year=365, coupon_frequency=2)
+    paid = frame.loc[frame['Outflows'] > 0]
+    # Semi-annual coupons counted back from maturity, plus the principal at maturity
+    assert np.round(paid['Month']).tolist() == [0, 6, 12, 18, 24]
+    np.testing.assert_allclose(paid['Outflows'].to_numpy(), [2e7, 2e7, 2e7, 2e7, 1e9 + 2e7])
+
+
+def test_put_is_exercised_below_the_conversion_price():
+    note = ConvertibleDebt("Notes", 1e9, 60, 0.0, 1e6, put_month=24)
+    inputs = make_inputs(convertible_debts=[note], preferred_stocks=[], n_months=36)
+    frame, _, _ = simulate_mstr_events(**inputs, steps_per_year=365)
+    assert frame['Debt'].iloc[0] == 1e9 and frame['Debt'].iloc[-1] == 0.0
+    assert round(frame.loc[frame['Debt'] == 0, 'Month'].iloc[0]) == 24
+
+
+def test_summary_matches_full_run():
+    inputs = make_inputs(btc_growth_annual=-0.5)
+    frame, step, reason = simulate_mstr_events(**inputs, steps_per_year=365)
+    summary = simulate_mstr_events(**inputs, steps_per_year=365, full_history=False)
+    assert summary.collapse_reason == reason
+    assert summary.final_btc_price == frame['BTC_Price'].iloc[step]
+
+
+def test_zero_shares_is_insolvent():
+    frame, step, reason = simulate_mstr_events(**make_inputs(shares_start=0.0, n_months=12))
+    assert step == 0 and reason == "NAV <= 0 (Insolvency)"
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from mstr_sim.montecarlo import MarketImpact, generate_btc_paths, simulate_mstr_paths
+
+from conftest import make_inputs
+
+SERIES = ("btc_price", "mstr_price", "premium", "btc_holdings", "cash", "shares", "nav_per_share", "btc_sold")
+
+
+def run(inputs, btc, market_impact=None):
+    inputs = dict(inputs, btc_volatility_annual=0.0, n_months=btc.shape[1])
+    return simulate_mstr_paths(n_paths=len(btc), btc_paths=btc, market_impact=market_impact, **inputs)
+
+
+def paths(n=200, months=60, seed=0):
+    return generate_btc_paths(n, months, 98000.0, 0.0, 0.8, np.random.default_rng(seed))
+
+
+@pytest.mark.parametrize("overrides", [
+    dict(),
+    dict(premium_drawdown=0.5, base_premium=2.5),
+    dict(operating_burn_annual=6e10, issuance_capacity_pct_annual=0.0),
+    dict(dynamic_premium=False),
+])
+def test_no_impact_reproduces_the_plain_engine(overrides):
+    inputs = make_inputs(**overrides)
+    btc = paths()
+    plain = run(inputs, btc)
+    impacted = run(inputs, btc, MarketImpact(depth_btc=np.inf, issuance_elasticity=0.0))
+    np.testing.assert_array_equal(impacted.collapse_month, plain.collapse_month)
+    np.testing.assert_array_equal(impacted.collapse_code, plain.collapse_code)
+    for series in SERIES:
+        np.testing.assert_allclose(getattr(impacted, series), getattr(plain, series), rtol=1e-12, err_msg=series)
+
+
+def test_forced_selling_pushes_the_price_down():
+    inputs = make_inputs(operating_burn_annual=6e10, issuance_capacity_pct_annual=0.0)
+    btc = paths(50)
+    impact = MarketImpact(depth_btc=1e5, issuance_elasticity=0.0, purchases_move_price=False)
+    impacted = run(inputs, btc, impact)
+    assert impacted.btc_sold.sum() > 0
+    assert (impacted.btc_price <= btc).all() and (impacted.btc_price < btc).any()
+    # The first month is never impacted: flows move the following months
+    np.testing.assert_array_equal(impacted.btc_price[:, 0], btc[:, 0])
+
+
+def test_full_recovery_keeps_only_last_months_flow():
+    inputs = make_inputs(operating_burn_annual=6e10, issuance_capacity_pct_annual=0.0)
+    btc = np.full((1, 24), 98000.0)
+    impact = MarketImpact(depth_btc=1e5, recovery=1.0, issuance_elasticity=0.0, purchases_move_price=False)
+    impacted = run(inputs, btc, impact)
+    expected = btc[0, 1:] * np.exp(-impacted.btc_sold[0, :-1] / 1e5)
+    np.testing.assert_allclose(impacted.btc_price[0, 1:], expected, rtol=1e-12)
+
+
+def test_compressed_premium_raises_less():
+    inputs = make_inputs(premium_drawdown=0.5, base_premium=2.5)
+    btc = paths(300)
+    free = run(inputs, btc, MarketImpact(depth_btc=np.inf, issuance_elasticity=0.0))
+    coupled = run(inputs, btc, MarketImpact(depth_btc=np.inf, issuance_elasticity=1.0))
+    assert (coupled.btc_holdings[:, -1] <= free.btc_holdings[:, -1] * (1 + 1e-12)).all()
+    assert (coupled.btc_holdings[:, -1] < free.btc_holdings[:, -1]).any()
+
+
+def test_paths_do_not_move_each_other():
+    inputs = make_inputs(operating_burn_annual=6e10, issuance_capacity_pct_annual=0.0)
+    btc = paths(5)
+    impact = MarketImpact(depth_btc=1e5)
+    together = run(inputs, btc, impact)
+    for p in range(len(btc)):
+        alone = run(inputs, btc[p:p + 1], impact)
+        np.testing.assert_array_equal(together.btc_price[p], alone.btc_price[0])
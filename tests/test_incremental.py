@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from mstr_sim.engine import simulate_mstr_monthly
+from mstr_sim.incremental import IncrementalSimulator
+
+from conftest import make_inputs
+
+
+@pytest.mark.parametrize("full_history", [True, False])
+def test_repeated_run_resumes_from_end_and_matches_fresh(full_history):
+    inputs = make_inputs()
+    fresh = simulate_mstr_monthly(**inputs, full_history=full_history)
+    inc = IncrementalSimulator()
+    first = inc.run(**inputs, full_history=full_history)
+    second = inc.run(**inputs, full_history=full_history)
+
+    assert inc.last_resume_month == inputs["n_months"]
+    for result in (first, second):
+        if full_history:
+            assert result[0].equals(fresh[0]) and result[1:] == fresh[1:]
+        else:
+            # The end-of-run checkpoint must carry the last stock price
+            assert result == fresh
+            assert result.final_mstr_price > 0
+
+
+def test_longer_horizon_resumes_from_shorter_run():
+    inc = IncrementalSimulator(checkpoint_every=12)
+    inc.run(**make_inputs(n_months=60))
+    longer = make_inputs(n_months=120)
+    resumed = inc.run(**longer)
+    fresh = simulate_mstr_monthly(**longer)
+
+    assert inc.last_resume_month == 60
+    assert resumed[0].equals(fresh[0]) and resumed[1:] == fresh[1:]
+
+
+def test_changed_input_does_not_reuse_checkpoints():
+    inc = IncrementalSimulator()
+    inc.run(**make_inputs())
+    changed = make_inputs(btc_growth_annual=-0.3)
+    frame, month, reason = inc.run(**changed)
+
+    assert inc.last_resume_month == 0
+    np.testing.assert_array_equal(frame['MSTR_Price'], simulate_mstr_monthly(**changed)[0]['MSTR_Price'])
+
+
+def test_collapsed_run_resumes_identically():
+    inputs = make_inputs(btc_growth_annual=-0.5)
+    inc = IncrementalSimulator()
+    inc.run(**inputs, full_history=False)
+    resumed = inc.run(**inputs, full_history=False)
+
+    assert resumed.collapse_month is not None
+    assert resumed == simulate_mstr_monthly(**inputs, full_history=False)
@@ -0,0 +1,68 @@
+import time
+
+import pandas as pd
+import pytest
+
+from mstr_sim.marketdata import BTC_TICKER, DEFAULT_SHARES, MSTR_TICKER, FixtureSource, MarketData
+
+
+class RecordingSource(FixtureSource):
+    """Fixture that only knows closes up to ``until`` and records the requested start dates."""
+    name = "recording"
+
+    def __init__(self, until=None, delay=0.0, shares=True):
+        super().__init__()
+        self.until = until
+        self.delay = delay
+        self.shares = shares
+        self.starts = []
+
+    def history(self, ticker, start=None):
+        time.sleep(self.delay)
+        self.starts.append((ticker, start))
+        closes = super().history(ticker, start)
+        return closes if self.until is None else closes[closes.index <= self.until]
+
+    def shares_outstanding(self, ticker):
+        return super().shares_outstanding(ticker) if self.shares else None
+
+
+def test_refresh_reports_the_latest_closes():
+    source = FixtureSource()
+    quotes = MarketData(source, history_path=None).refresh()
+    btc = source.history(BTC_TICKER)
+    assert quotes.btc_price == btc.iloc[-1]
+    assert quotes.mstr_price == source.history(MSTR_TICKER).iloc[-1]
+    assert quotes.shares_outstanding == source.shares_outstanding(MSTR_TICKER)
+    assert quotes.source == "fixture"
+
+
+def test_refresh_only_fetches_after_the_stored_history(tmp_path):
+    path = str(tmp_path / "history.parquet")
+    full = FixtureSource().history(BTC_TICKER)
+    cutoff = full.index[len(full) // 2]
+    MarketData(RecordingSource(until=cutoff), history_path=path).refresh()
+
+    source = RecordingSource()
+    data = MarketData(source, history_path=path)
+    quotes = data.refresh()
+    # The last stored day is fetched again (its close may have been partial)
+    assert dict(source.starts)[BTC_TICKER] == cutoff
+    pd.testing.assert_series_equal(data.load_history()[BTC_TICKER].dropna(), full.astype(float),
+                                   check_names=False, check_freq=False)
+    assert quotes.btc_price == full.iloc[-1]
+    assert pd.read_parquet(path)[BTC_TICKER].dropna().index[-1] == full.index[-1]
+
+
+def test_missing_share_count_falls_back():
+    quotes = MarketData(RecordingSource(shares=False), history_path=None).refresh()
+    assert quotes.shares_outstanding == DEFAULT_SHARES
+
+
+def test_slow_source_times_out():
+    with pytest.raises(TimeoutError):
+        MarketData(RecordingSource(delay=0.5), history_path=None, timeout=0.05).refresh()
+
+
+def test_fixture_never_writes_the_real_history_file():
+    assert MarketData(FixtureSource()).history_path is None
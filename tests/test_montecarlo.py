@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from mstr_sim.engine import simulate_mstr_monthly
+from mstr_sim.montecarlo import NO_COLLAPSE, simulate_mstr_paths
+
+from conftest import make_inputs
+
+SERIES = ['BTC_Price', 'MSTR_Price', 'BTC_Holdings', 'Debt', 'Shares', 'Premium',
+          'NAV_Per_Share', 'Cash', 'Inflows', 'Outflows', 'BTC_Sold']
+
+
+@pytest.mark.parametrize("growth", [-0.5, -0.2, 0.0, 0.15])
+@pytest.mark.parametrize("issuance", [0.0, 0.25])
+@pytest.mark.parametrize("dynamic_premium", [True, False])
+def test_zero_volatility_paths_match_scalar_engine(growth, issuance, dynamic_premium):
+    inputs = make_inputs(btc_growth_annual=growth, issuance_capacity_pct_annual=issuance,
+                         dynamic_premium=dynamic_premium, btc_volatility_annual=0.0)
+    frame, collapse_month, collapse_reason = simulate_mstr_monthly(**inputs)
+    result = simulate_mstr_paths(n_paths=3, **inputs)
+
+    for path in range(result.n_paths):
+        batched = result.path_frame(path)
+        for series in SERIES:
+            np.testing.assert_allclose(batched[series], frame[series], rtol=1e-9, atol=1e-6, err_msg=series)
+        month = int(result.collapse_month[path])
+        assert (None if month == NO_COLLAPSE else month) == collapse_month
+        assert result.collapse_reason(path) == collapse_reason
+
+
+def test_seed_makes_paths_reproducible(inputs):
+    a = simulate_mstr_paths(n_paths=50, seed=7, **inputs)
+    b = simulate_mstr_paths(n_paths=50, seed=7, **inputs)
+    np.testing.assert_array_equal(a.mstr_price, b.mstr_price)
+    np.testing.assert_array_equal(a.collapse_month, b.collapse_month)
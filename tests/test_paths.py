@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from mstr_sim.montecarlo import drawdown_premium, generate_btc_paths
+from mstr_sim.paths import GBM, BlockBootstrap, CachedGenerator, RegimeSwitching
+
+
+def history(n_days=2000, seed=0):
+    returns = np.random.default_rng(seed).normal(0.001, 0.03, n_days)
+    return 20000.0 * np.exp(np.cumsum(returns))
+
+
+@pytest.mark.parametrize("generator", [GBM(0.15, 0.5), BlockBootstrap(history()), RegimeSwitching()])
+def test_shape_start_and_reproducibility(generator):
+    a = generator.generate(200, 36, 98000.0, np.random.default_rng(1))
+    b = generator.generate(200, 36, 98000.0, np.random.default_rng(1))
+    assert a.shape == (200, 36)
+    assert (a[:, 0] == 98000.0).all() and (a > 0).all()
+    np.testing.assert_array_equal(a, b)
+
+
+def test_gbm_matches_the_default_paths():
+    rng_a, rng_b = np.random.default_rng(5), np.random.default_rng(5)
+    np.testing.assert_array_equal(GBM(0.2, 0.6).generate(50, 24, 1e5, rng_a),
+                                  generate_btc_paths(50, 24, 1e5, 0.2, 0.6, rng_b))
+
+
+def test_per_path_start_prices():
+    starts = np.array([1.0, 2.0, 3.0])
+    paths = RegimeSwitching().generate(3, 12, starts, np.random.default_rng(0))
+    np.testing.assert_array_equal(paths[:, 0], starts)
+
+
+def test_bootstrap_uses_only_historical_monthly_returns():
+    generator = BlockBootstrap(history(), block_months=3)
+    paths = generator.generate(100, 25, 1.0, np.random.default_rng(2))
+    steps = np.diff(np.log(paths), axis=1)
+    historical = generator.monthly_returns()
+    assert np.isin(np.round(steps, 10), np.round(historical, 10)).all()
+
+
+def test_bootstrap_recentres_growth():
+    generator = BlockBootstrap(history(), btc_growth_annual=0.0)
+    paths = generator.generate(20000, 13, 1.0, np.random.default_rng(3))
+    assert abs(np.log(paths[:, -1]).mean()) < 0.02
+
+
+def test_bootstrap_needs_enough_history():
+    with pytest.raises(ValueError, match="too short"):
+        BlockBootstrap(history(100), block_months=6).generate(1, 12, 1.0, np.random.default_rng(0))
+
+
+def test_regimes_without_switching_are_lognormal_with_regime_drift():
+    bear = RegimeSwitching(bear_growth_annual=-0.5, bear_volatility_annual=1e-9, start_in_bull=False,
+                           p_bear_to_bull=0.0)
+    paths = bear.generate(4, 13, 1.0, np.random.default_rng(0))
+    np.testing.assert_allclose(paths[:, -1], 0.5, rtol=1e-6)
+
+
+def test_drawdown_premium_reaches_nav_at_the_drawdown():
+    btc = np.array([100.0, 120.0, 90.0, 60.0, 30.0, 130.0])
+    premium = drawdown_premium(btc, 2.0, 0.5)
+    np.testing.assert_allclose(premium, [2.0, 2.0, 1.5, 1.0, 1.0, 2.0])
+    np.testing.assert_array_equal(drawdown_premium(btc, 0.8, 0.5), 0.8)
+
+
+def test_cached_generator_matches_and_restores_the_rng(tmp_path):
+    cached = CachedGenerator(RegimeSwitching(), str(tmp_path))
+    draws = []
+    for _ in range(2):  # miss, then hit
+        rng = np.random.default_rng(7)
+        paths = cached.generate(100, 24, 98000.0, rng)
+        draws.append(rng.random(5))
+        np.testing.assert_array_equal(paths, RegimeSwitching().generate(100, 24, 98000.0,
+                                                                        np.random.default_rng(7)))
+        assert not paths.flags.writeable
+    np.testing.assert_array_equal(draws[0], draws[1])
+    assert len(list(tmp_path.glob("*.npy"))) == 1
+
+
+def test_cached_generator_evicts_least_recently_used(tmp_path):
+    one_file = 50 * 24 * 8 + 128  # float64 paths plus the .npy header
+    cached = CachedGenerator(GBM(0.1, 0.5), str(tmp_path), max_bytes=3 * one_file)
+    first = cached.generate(50, 24, 1.0, np.random.default_rng(0))
+    for seed in range(1, 4):
+        cached.generate(50, 24, 1.0, np.random.default_rng(seed))
+    files = list(tmp_path.glob("*.npy"))
+    assert len(files) == 3 and len(list(tmp_path.glob("*.rng"))) == 3
+    # The oldest (seed 0) went first; asking again regenerates the same paths
+    np.testing.assert_array_equal(cached.generate(50, 24, 1.0, np.random.default_rng(0)), first)
+
+
+def test_cached_generator_regenerates_damaged_files(tmp_path):
+    cached = CachedGenerator(GBM(0.1, 0.5), str(tmp_path))
+    expected = np.array(cached.generate(10, 12, 1.0, np.random.default_rng(0)))
+    for damaged in tmp_path.glob("*.npy"):
+        damaged.write_bytes(b"junk")
+    np.testing.assert_array_equal(cached.generate(10, 12, 1.0, np.random.default_rng(0)), expected)
@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+import pytest
+
+from mstr_sim.montecarlo import NO_COLLAPSE, generate_btc_paths, simulate_mstr_paths
+from mstr_sim.portfolio import Company, load_portfolio, portfolio_inputs, simulate_portfolio
+
+from conftest import make_inputs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MARKET = dict(n_months=36, btc_price_start=98000.0, btc_growth_annual=0.1, btc_volatility_annual=0.9)
+
+
+def companies():
+    return [
+        Company.from_inputs("Big", make_inputs()),
+        Company.from_inputs("Levered", make_inputs(btc_holdings_start=2e4, shares_start=5e7,
+                                                   operating_burn_annual=3e9, issuance_capacity_pct_annual=0.0)),
+        Company.from_inputs("Drawdown", make_inputs(premium_drawdown=0.5, base_premium=2.5)),
+        Company("Plain", btc_holdings_start=1000.0, shares_start=1e6, dynamic_premium=False),
+    ]
+
+
+def test_each_company_matches_a_run_on_its_own():
+    btc = generate_btc_paths(300, 36, 98000.0, 0.1, 0.9, np.random.default_rng(3))
+    result = simulate_portfolio(companies(), n_paths=0, btc_paths=btc, chunk_size=70, **MARKET)
+    assert result.collapse_month.shape == (4, 300)
+    assert result.collapsed.any(axis=1)[1] and not result.collapsed.all()
+    for k, company in enumerate(companies()):
+        alone = simulate_mstr_paths(n_paths=300, btc_paths=btc, **dict(MARKET, btc_volatility_annual=0.0),
+                                    **company.inputs())
+        np.testing.assert_array_equal(result.collapse_month[k], alone.collapse_month)
+        np.testing.assert_array_equal(result.collapse_code[k], alone.collapse_code)
+        alive = alone.collapse_month == NO_COLLAPSE
+        np.testing.assert_allclose(result.final_nav_per_share[k][alive], alone.nav_per_share[alive, -1], rtol=1e-12)
+        np.testing.assert_allclose(result.final_mstr_price[k][alive], alone.mstr_price[alive, -1], rtol=1e-12)
+        # Collapsed companies are worth nothing, whatever NAV the engine left behind
+        assert (result.final_nav_per_share[k][~alive] == 0).all()
+        assert (result.final_mstr_price[k][~alive] == 0).all()
+    np.testing.assert_array_equal(result.final_btc_price, btc[:, -1])
+
+
+def test_seeded_runs_share_paths_and_are_reproducible():
+    a = simulate_portfolio(companies(), n_paths=500, seed=1, chunk_size=128, **MARKET)
+    b = simulate_portfolio(companies()[::-1], n_paths=500, seed=1, chunk_size=128, **MARKET)
+    np.testing.assert_array_equal(a.final_btc_price, b.final_btc_price)
+    np.testing.assert_array_equal(a.collapse_month, b.collapse_month[::-1])
+
+
+def test_collapse_statistics():
+    result = simulate_portfolio(companies(), n_paths=2000, seed=2, **MARKET)
+    p = result.collapse_probability()
+    joint = result.joint_collapse_probability()
+    np.testing.assert_allclose(np.diag(joint), p)
+    assert np.isclose(result.collapse_count_distribution().sum(), 1.0)
+    corr = result.collapse_correlation()
+    defined = ~np.isnan(np.diag(corr))
+    np.testing.assert_allclose(np.diag(corr)[defined], 1.0)
+    assert np.isnan(corr[p == 0]).all()
+    assert (result.collapsed_by(result.n_months) == result.collapsed).all()
+    frame = result.frame()
+    assert frame['Company'].tolist() == result.names
+    np.testing.assert_allclose(frame['Collapse_Probability'], p)
+
+
+def test_portfolio_file():
+    inputs = load_portfolio(os.path.join(ROOT, "scenarios", "treasury_portfolio.json"))
+    assert inputs["companies"] and all(isinstance(c, Company) for c in inputs["companies"])
+    result = simulate_portfolio(**inputs, n_paths=100, seed=0)
+    assert result.names == [c.name for c in inputs["companies"]]
+
+
+@pytest.mark.parametrize("portfolio, match", [
+    ({"n_years": 5}, "non-empty"),
+    ({"companies": [{"btc_holdings_start": 1, "shares_start": 1}], "cash_start": 1}, "Unknown portfolio keys"),
+    ({"companies": [{"name": "A", "btc_holdings_start": 1, "shares_start": 1, "colour": 1}]}, "Unknown keys"),
+    ({"companies": [{"name": "A", "btc_holdings_start": 1, "shares_start": 1}] * 2}, "unique"),
+])
+def test_bad_portfolios(portfolio, match):
+    with pytest.raises(ValueError, match=match):
+        portfolio_inputs(portfolio)
@@ -0,0 +1,63 @@
+import io
+
+import pytest
+
+pytest.importorskip("matplotlib")
+from PIL import Image
+
+from mstr_sim.engine import simulate_mstr_monthly
+from mstr_sim.preview import HEIGHT, WIDTH, PreviewRenderer, card_text
+from mstr_sim.scenario import scenario_inputs
+
+from conftest import make_inputs
+
+
+def test_card_is_a_png_of_the_right_size():
+    png = PreviewRenderer().render(make_inputs())
+    assert Image.open(io.BytesIO(png)).size == (WIDTH, HEIGHT)
+
+
+def test_renders_are_cached_by_scenario():
+    calls = []
+
+    def simulate(**inputs):
+        calls.append(inputs)
+        return simulate_mstr_monthly(**inputs)
+    renderer = PreviewRenderer(simulate=simulate)
+    inputs = make_inputs()
+    first = renderer.render(inputs)
+    # Volatility does not change the monthly run, so it is the same card
+    assert renderer.render(dict(inputs, btc_volatility_annual=2.0)) == first
+    assert renderer.key(dict(inputs, btc_volatility_annual=2.0)) == renderer.key(inputs)
+    assert len(calls) == 1 and renderer.renders == 1
+
+    other = dict(inputs, btc_growth_annual=-0.5)
+    assert renderer.key(other) != renderer.key(inputs)
+    assert renderer.render(other) != first and renderer.renders == 2
+
+
+def test_disk_cache_survives_a_new_renderer(tmp_path):
+    inputs = make_inputs(n_months=24)
+    png = PreviewRenderer(directory=str(tmp_path)).render(inputs)
+    fresh = PreviewRenderer(directory=str(tmp_path))
+    assert fresh.render(inputs) == png and fresh.renders == 0
+
+
+def test_a_given_result_is_not_simulated_again():
+    def simulate(**inputs):
+        raise AssertionError("simulated")
+    inputs = make_inputs()
+    renderer = PreviewRenderer(simulate=simulate)
+    assert renderer.render(inputs, simulate_mstr_monthly(**inputs))
+
+
+def test_card_text_reports_survival_and_collapse():
+    inputs = scenario_inputs({"n_years": 5})
+    headline, color, _, caption, x, y, collapse_x = card_text(inputs, simulate_mstr_monthly(**inputs))
+    assert headline == "SURVIVES 5 YEARS" and collapse_x is None and len(x) == len(y) == 60
+
+    inputs = make_inputs(operating_burn_annual=6e11, issuance_capacity_pct_annual=0.0)
+    result = simulate_mstr_monthly(**inputs)
+    headline, _, detail, _, _, _, collapse_x = card_text(inputs, result)
+    assert headline == f"COLLAPSE IN MONTH {result[1]}" and result[2] in detail
+    assert collapse_x == result[1] / 12
@@ -0,0 +1,70 @@
+import json
+import logging
+import marshal
+import os
+
+import numpy as np
+
+from mstr_sim.cli import main
+from mstr_sim.engine import simulate_mstr_monthly
+from mstr_sim.montecarlo import simulate_mstr_paths
+from mstr_sim.profiling import PHASES, Profiler, StageTimer
+from mstr_sim.streaming import simulate_mstr_bands
+
+from conftest import make_inputs
+
+SCENARIO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scenarios", "music_stops.json")
+
+
+def test_stages_nest_and_log_one_record(caplog):
+    timer = StageTimer("rerun")
+    with timer.stage("load", source="fixture"):
+        pass
+    with timer.stage("simulation", kind="monthly") as stage:
+        stage.details["cached"] = False
+        timer.add_phases({"pricing": 0.25, "funding": 0.5, "unknown": 9.0})
+    timer.add("render", 0.125)
+
+    assert [(s.name, s.depth) for s in timer.stages] == [
+        ("load", 0), ("simulation", 0), ("pricing", 1), ("funding", 1), ("render", 0)]
+    frame = timer.frame()
+    assert frame['Stage'].tolist()[2] == "  pricing" and frame['Details'].tolist()[1] == "kind=monthly, cached=False"
+
+    with caplog.at_level(logging.INFO, logger="mstr_sim.profiling"):
+        timer.log()
+    [record] = caplog.records
+    assert json.loads(record.getMessage()) == record.timings
+    assert record.timings["event"] == "rerun" and record.timings["stages"][4]["ms"] == 125.0
+    elapsed = timer.elapsed
+    assert timer.elapsed == elapsed  # The clock stopped at log()
+
+
+def test_engine_phase_times_are_recorded_without_changing_results():
+    inputs = make_inputs()
+    phases = {}
+    frame, month, reason = simulate_mstr_monthly(**inputs, phase_times=phases)
+    expected, _, _ = simulate_mstr_monthly(**inputs)
+    np.testing.assert_array_equal(frame['MSTR_Price'], expected['MSTR_Price'])
+    assert phases and set(phases) <= set(PHASES) and all(t >= 0 for t in phases.values())
+
+    phases = {}
+    simulate_mstr_paths(n_paths=50, seed=0, phase_times=phases, **inputs)
+    assert {"paths", "pricing"} <= set(phases) <= set(PHASES)
+    phases = {}
+    simulate_mstr_bands(n_paths=50, seed=0, phase_times=phases, **inputs)
+    assert {"paths", "aggregation"} <= set(phases)
+
+
+def test_profiler_report_and_dump(tmp_path):
+    with Profiler() as profiler:
+        simulate_mstr_monthly(**make_inputs(n_months=12))
+    assert "simulate_mstr_monthly" in profiler.report(limit=10)
+    path = tmp_path / "run.prof"
+    assert marshal.loads(profiler.dump(str(path))) and path.read_bytes() == profiler.dump()
+
+
+def test_cli_timings_and_profile(tmp_path, capsys):
+    path = tmp_path / "run.prof"
+    assert main(["run", SCENARIO, "--timings", "--profile", str(path), "--set", "n_years=2"]) == 0
+    err = capsys.readouterr().err
+    assert "pricing" in err and "cumulative" in err and path.stat().st_size > 0
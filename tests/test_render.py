@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from mstr_sim.render import aggregate, bars, downsample, fan_chart, line, lttb_indices
+
+
+def test_lttb_keeps_ends_and_extremes():
+    x = np.arange(10_000)
+    y = np.sin(x / 500.0)
+    y[4321] = 50.0  # one-month spike
+    y[7000] = -50.0  # and crash
+    idx = lttb_indices(x, y, 200)
+    assert len(idx) == 200 and idx[0] == 0 and idx[-1] == len(x) - 1
+    assert (np.diff(idx) > 0).all()
+    assert 4321 in idx and 7000 in idx
+
+
+@pytest.mark.parametrize("n_out", [1, 2, 10_000, 20_000])
+def test_lttb_returns_everything_when_it_cannot_reduce(n_out):
+    assert (lttb_indices(np.arange(10_000), np.zeros(10_000), n_out) == np.arange(10_000)).all()
+
+
+def test_downsample_pairs_x_with_y():
+    x = np.arange(5000) * 2.0
+    xs, ys = downsample(x, x ** 2, 100)
+    np.testing.assert_array_equal(ys, xs ** 2)
+
+
+def test_aggregate_preserves_the_total_flow():
+    y = np.random.default_rng(0).random(6001)
+    xs, ys = aggregate(np.arange(6001), y, 800)
+    assert len(ys) <= 800 and np.isclose(ys.sum(), y.sum())
+    assert xs[0] == 0 and (np.diff(xs) > 0).all()
+    xs, ys = aggregate(np.arange(10), np.ones(10), 800)
+    assert len(ys) == 10
+
+
+def test_traces_respect_the_point_budget():
+    x = np.arange(20_000)
+    assert len(line(x, np.cos(x / 100.0), "l", budget=300).x) == 300
+    assert len(bars(x, np.ones(20_000), "b", budget=300).y) <= 300
+    assert type(line(x, x, "l")).__name__ == "Scattergl"
+
+
+def test_fan_chart_bands_share_the_median_indices():
+    months = np.arange(3000)
+    median = np.exp(months / 1000.0)
+    bands = np.vstack([median * f for f in (0.5, 0.8, 1.0, 1.25, 2.0)])
+    fig = fan_chart(months, bands, (5, 25, 50, 75, 95), "MSTR", budget=100)
+    assert len(fig.data) == 5
+    assert all(len(trace.x) == 100 for trace in fig.data)
+    assert all((np.asarray(trace.x) == np.asarray(fig.data[-1].x)).all() for trace in fig.data)
+    assert fig.data[1].fill == "tonexty" and fig.data[1].name == "5th-95th pct"
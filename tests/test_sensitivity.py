@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from mstr_sim.engine import simulate_mstr_monthly
+from mstr_sim.sensitivity import sensitivity_report
+
+from conftest import make_inputs
+
+
+def deterministic(**inputs):
+    """(survived, final NAV/share or 0) of one monthly run."""
+    frame, collapse_month, _ = simulate_mstr_monthly(**inputs)
+    alive = collapse_month is None
+    return float(alive), frame['NAV_Per_Share'].iloc[-1] if alive else 0.0
+
+
+@pytest.mark.parametrize("parameter", ["btc_growth_annual", "btc_price_start", "operating_burn_annual",
+                                       "convertible_debts[1].conversion_price"])
+def test_zero_volatility_bumps_match_single_runs(parameter):
+    inputs = make_inputs(btc_volatility_annual=0.0, btc_growth_annual=-0.2)
+    report = sensitivity_report(inputs, n_paths=3, seed=0, parameters=[parameter])
+    survival, nav = deterministic(**inputs)
+    assert report.base_survival == survival
+    np.testing.assert_allclose(report.base_nav_per_share, nav, rtol=1e-9)
+    for value, survival, nav in ((report.lo[0], report.survival_lo[0], report.nav_lo[0]),
+                                 (report.hi[0], report.survival_hi[0], report.nav_hi[0])):
+        if parameter.startswith("convertible_debts"):
+            debts = list(inputs["convertible_debts"])
+            debts[1] = debts[1].__class__(**{**debts[1].__dict__, "conversion_price": value})
+            bumped = dict(inputs, convertible_debts=debts)
+        else:
+            bumped = dict(inputs, **{parameter: value})
+        expected_survival, expected_nav = deterministic(**bumped)
+        assert survival == expected_survival
+        np.testing.assert_allclose(nav, expected_nav, rtol=1e-9)
+    assert report.survival_se[0] == 0.0 and report.nav_se[0] == 0.0
+
+
+def test_growth_bump_stays_above_minus_one():
+    inputs = make_inputs(btc_growth_annual=-0.95, n_months=24)
+    report = sensitivity_report(inputs, n_paths=50, seed=1, parameters=["btc_growth_annual"])
+    assert -1.0 < report.lo[0] < -0.95 < report.hi[0]
+    assert np.isfinite([report.nav_lo[0], report.nav_slope[0], report.survival_slope[0]]).all()
+    with pytest.raises(ValueError, match="above -1"):
+        sensitivity_report(make_inputs(btc_growth_annual=-1.0), n_paths=1, parameters=["btc_growth_annual"])
+
+
+def test_common_random_numbers_and_ordering():
+    inputs = make_inputs(n_months=36)
+    report = sensitivity_report(inputs, n_paths=400, seed=2)
+    again = sensitivity_report(inputs, n_paths=400, seed=2)
+    np.testing.assert_array_equal(report.nav_slope, again.nav_slope)
+    assert len(report.parameters) == 8 + 2 * len(inputs["convertible_debts"])
+    # Paired differences: more BTC can only help every path
+    k = report.parameters.index("btc_holdings_start")
+    assert report.nav_slope[k] > 0 and report.nav_se[k] < report.nav_slope[k]
+    swing = (report.frame()['Survival_High'] - report.frame()['Survival_Low']).abs()
+    assert (np.diff(swing.to_numpy()) <= 0).all()
+
+
+def test_unknown_parameter():
+    with pytest.raises(ValueError, match="Cannot bump"):
+        sensitivity_report(make_inputs(), n_paths=1, parameters=["btc_volatility_annual"])
@@ -0,0 +1,125 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pytest
+
+from mstr_sim import wire
+from mstr_sim.engine import simulate_mstr_monthly
+from mstr_sim.scenario import scenario_inputs
+from mstr_sim.service import ServiceBusy, SimulationService, make_server
+from mstr_sim.sweep import sweep_grid
+
+SCENARIO = {"n_years": 5, "btc_growth_annual": -0.3}
+
+
+@pytest.fixture
+def service():
+    service = SimulationService(max_workers=2)
+    yield service
+    service.shutdown()
+
+
+@pytest.fixture
+def url(service):
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def request(url, method="GET", body=None, headers=None):
+    data = None if body is None else wire.dumps(body)
+    req = urllib.request.Request(url, data=data, method=method, headers=headers or {})
+    try:
+        with urllib.request.urlopen(req, timeout=120) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read()
+
+
+def preview_url(url, scenario=SCENARIO):
+    return url + "/preview.png?" + "&".join(f"{k}={json.dumps(v)}" for k, v in scenario.items())
+
+
+def test_monthly_run_matches_the_engine_and_is_stored(service, url):
+    status, _, body = request(url + "/run/monthly", "POST", {"inputs": SCENARIO})
+    assert status == 200
+    df, month, reason = wire.loads(body)["result"]
+    expected, expected_month, expected_reason = simulate_mstr_monthly(**scenario_inputs(SCENARIO))
+    np.testing.assert_array_equal(df['MSTR_Price'].to_numpy(), expected['MSTR_Price'].to_numpy())
+    assert (month, reason) == (expected_month, expected_reason)
+
+    request(url + "/run/monthly", "POST", {"inputs": SCENARIO})
+    health = wire.loads(request(url + "/health")[2])
+    assert health["coalesced"] + health["store_hits"] >= 1
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/run/bands", {"inputs": SCENARIO, "options": {}}),  # n_paths is required
+    ("/run/bands", {"inputs": SCENARIO, "options": {"n_paths": 10, "colour": 1}}),
+    ("/run/sweep", {"inputs": SCENARIO, "options": {"axes": {"base_premium": [1.0]}, "max_workers": 0}}),
+    ("/run/nope", {"inputs": SCENARIO}),
+])
+def test_bad_requests_are_refused(url, path, body):
+    status, _, payload = request(url + path, "POST", body)
+    assert status == 400 and "error" in wire.loads(payload)
+
+
+def test_sweep_matches_in_process_and_caps_workers(service):
+    axes = {"btc_growth_annual": [-0.5, 0.0, 0.5], "base_premium": [1.0, 2.0]}
+    job = service.run("sweep", SCENARIO, {"axes": axes, "max_workers": 64}, timeout=120)
+    assert job.state == "done", job.error
+    expected = sweep_grid(scenario_inputs(SCENARIO), axes, max_workers=1)
+    np.testing.assert_array_equal(job.result.collapse_month, expected.collapse_month)
+
+
+def test_identical_requests_share_one_job(service):
+    options = {"n_paths": 200, "seed": 1}
+    jobs = [service.submit("bands", SCENARIO, options) for _ in range(3)]
+    assert jobs[0] is jobs[1] is jobs[2] and service.coalesced == 2
+    jobs[0].done.wait(120)
+    assert jobs[0].state == "done", jobs[0].error
+    assert service.submit("bands", SCENARIO, options).result is not None
+
+
+def test_full_queue_is_refused():
+    service = SimulationService(max_workers=1, max_pending=0)
+    try:
+        with pytest.raises(ServiceBusy):
+            service.submit("monthly", SCENARIO)
+    finally:
+        service.shutdown()
+
+
+def test_preview_and_not_modified(service, url):
+    status, headers, png = request(preview_url(url))
+    assert status == 200 and headers["Content-Type"] == "image/png" and png.startswith(b"\x89PNG")
+    etag = headers["ETag"]
+
+    # A matching ETag is answered before anything is simulated or drawn
+    fresh = SimulationService(max_workers=1)
+    server = make_server(fresh, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        status, headers, body = request(preview_url(f"http://127.0.0.1:{server.server_address[1]}"),
+                                        headers={"If-None-Match": etag})
+    finally:
+        server.shutdown()
+        server.server_close()
+        fresh.shutdown()
+    assert status == 304 and body == b"" and headers["ETag"] == etag
+    assert fresh.previews.renders == 0 and not fresh.health()["jobs"]["done"]
+
+
+def test_preview_errors(service, url, monkeypatch):
+    assert request(preview_url(url, {"n_years": "ten"}))[0] == 400
+
+    def fail(**inputs):
+        raise ValueError("engine failed")
+    monkeypatch.setattr(service.incremental, "run", fail)
+    status, _, body = request(preview_url(url))
+    assert status == 500 and "engine failed" in wire.loads(body)["error"]
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from mstr_sim.engine import simulate_mstr_monthly
+from mstr_sim.solver import solve_breakeven
+
+from conftest import make_inputs
+
+
+def survives(inputs, horizon, **values):
+    summary = simulate_mstr_monthly(**dict(inputs, n_months=horizon, **values), full_history=False)
+    return summary.survived
+
+
+@pytest.mark.parametrize("parameter, lo, hi, above", [
+    ("btc_growth_annual", -0.9, 1.0, True),
+    ("operating_burn_annual", 0.0, 1e11, False),
+])
+def test_threshold_brackets_the_flip(parameter, lo, hi, above):
+    inputs = make_inputs()
+    horizons = [24, 60, 120]
+    tol = 1e-4 * (hi - lo)
+    result = solve_breakeven(inputs, parameter, lo, hi, horizon_months=horizons, tol=tol)
+
+    assert result.horizon_months.tolist() == horizons
+    for horizon, threshold, survives_above in zip(horizons, result.threshold, result.survives_above):
+        if np.isnan(threshold):
+            continue
+        assert survives_above == above
+        outside = threshold - 2 * tol if above else threshold + 2 * tol
+        assert survives(inputs, horizon, **{parameter: threshold})
+        assert not survives(inputs, horizon, **{parameter: outside})
+    assert np.isfinite(result.threshold).any()
+
+
+def test_no_flip_gives_nan():
+    result = solve_breakeven(make_inputs(), "btc_growth_annual", 0.5, 1.0, horizon_months=24)
+    assert np.isnan(result.threshold).all() and result.rounds == 0
+
+
+def test_overrides_broadcast_against_horizons():
+    result = solve_breakeven(make_inputs(), "btc_growth_annual", -0.9, 1.0, horizon_months=[60, 120],
+                             overrides={"base_premium": [[1.0], [3.0]]})
+    assert result.threshold.shape == (4,)
+
+
+def test_unknown_parameter_is_refused():
+    with pytest.raises(ValueError, match="Cannot solve"):
+        solve_breakeven(make_inputs(), "n_months", 1, 2)
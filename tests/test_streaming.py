@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from mstr_sim.montecarlo import NO_COLLAPSE, simulate_mstr_paths
+from mstr_sim.streaming import BandAccumulator, QuantileSketch, band_chunks, simulate_mstr_bands
+
+from conftest import make_inputs
+
+Q = (1, 5, 25, 50, 75, 95, 99)
+
+
+def lognormal(rng, n, months=6):
+    values = np.exp(rng.normal(5.0, 2.0, (n, months)))
+    values[rng.random((n, months)) < 0.1] = 0.0  # collapsed paths
+    return values
+
+
+@pytest.mark.parametrize("accuracy", [0.01, 0.05])
+def test_merged_sketch_quantiles_within_relative_error(accuracy):
+    rng = np.random.default_rng(0)
+    chunks = [lognormal(rng, n) for n in (1, 500, 3000, 77)]
+    merged = QuantileSketch(6, accuracy)
+    for chunk in chunks:
+        part = QuantileSketch(6, accuracy)
+        part.add(chunk)
+        merged.merge(part)
+
+    values = np.vstack(chunks)
+    exact = np.quantile(values, np.array(Q) / 100, axis=0, method="lower")
+    estimate = merged.quantiles(Q)
+    zero = exact == 0
+    assert (estimate[zero] == 0).all()
+    assert (np.abs(estimate[~zero] - exact[~zero]) <= accuracy * exact[~zero] * (1 + 1e-9)).all()
+    np.testing.assert_array_equal(merged.count, len(values))
+
+
+def test_merge_equals_adding_everything_to_one_sketch():
+    rng = np.random.default_rng(1)
+    a, b = lognormal(rng, 400), lognormal(rng, 400) * 1e6  # disjoint bucket ranges
+    whole = QuantileSketch(6)
+    whole.add(np.vstack([a, b]))
+    left, right = QuantileSketch(6), QuantileSketch(6)
+    left.add(a)
+    right.add(b)
+    right.merge(left)
+    np.testing.assert_array_equal(right.quantiles(Q), whole.quantiles(Q))
+    np.testing.assert_array_equal(right.zeros, whole.zeros)
+
+
+def test_merge_requires_same_shape_and_accuracy():
+    with pytest.raises(ValueError):
+        QuantileSketch(6, 0.01).merge(QuantileSketch(6, 0.02))
+    with pytest.raises(ValueError):
+        QuantileSketch(6).merge(QuantileSketch(7))
+
+
+def test_bands_match_the_stored_paths():
+    inputs = make_inputs(btc_volatility_annual=0.8, n_months=60)
+    bands = simulate_mstr_bands(n_paths=3000, seed=4, chunk_size=700, **inputs)
+    paths = [simulate_mstr_paths(n_paths=n, seed=s, **inputs) for n, s in band_chunks(3000, 60, 4, 700)]
+    price = np.vstack([p.mstr_price for p in paths])
+    collapse = np.concatenate([p.collapse_month for p in paths])
+
+    assert bands.n_paths == 3000
+    np.testing.assert_allclose(bands.means["mstr_price"], price.mean(axis=0), rtol=1e-9)
+    np.testing.assert_array_equal(bands.collapse_counts,
+                                  np.bincount(collapse[collapse != NO_COLLAPSE], minlength=60))
+    assert bands.collapse_probability() == (collapse != NO_COLLAPSE).mean()
+    exact = np.quantile(price, 0.5, axis=0, method="lower")
+    assert np.all(np.abs(bands.band("mstr_price", 50) - exact) <= 0.01 * exact + 1e-12)
+    np.testing.assert_array_equal(bands.sample.mstr_price, price[:20])
+
+
+def test_bands_are_reproducible_and_memory_bounded():
+    inputs = make_inputs(n_months=24)
+    a = simulate_mstr_bands(n_paths=1000, seed=9, chunk_size=128, **inputs)
+    b = simulate_mstr_bands(n_paths=1000, seed=9, chunk_size=128, **inputs)
+    np.testing.assert_array_equal(a.bands["btc_price"], b.bands["btc_price"])
+    # A 1 MB budget at 24 months is 341 paths per chunk
+    assert [n for n, _ in band_chunks(1000, 24, memory_budget_mb=1.0)] == [341, 341, 318]
+
+
+def test_accumulator_merge_matches_sequential_add():
+    inputs = make_inputs(n_months=24)
+    chunks = [simulate_mstr_paths(n_paths=n, seed=s, **inputs) for n, s in band_chunks(900, 24, 2, 300)]
+    sequential = BandAccumulator(24)
+    parts = []
+    for chunk in chunks:
+        sequential.add(chunk)
+        part = BandAccumulator(24)
+        part.add(chunk)
+        parts.append(part)
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    a, b = sequential.result(), merged.result()
+    np.testing.assert_array_equal(a.bands["mstr_price"], b.bands["mstr_price"])
+    np.testing.assert_array_equal(a.collapse_counts, b.collapse_counts)
+    assert a.collapse_reasons == b.collapse_reasons
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from mstr_sim.engine import simulate_mstr_monthly
+from mstr_sim.montecarlo import NO_COLLAPSE
+from mstr_sim.sweep import sweep_grid
+
+from conftest import make_inputs
+
+AXES = {"btc_growth_annual": np.linspace(-0.6, 0.4, 6), "base_premium": [0.8, 1.5, 3.0]}
+
+
+def test_sweep_matches_individual_runs():
+    inputs = make_inputs()
+    result = sweep_grid(inputs, AXES, max_workers=1)
+
+    assert result.collapse_month.shape == (6, 3)
+    for i, growth in enumerate(AXES["btc_growth_annual"]):
+        for j, premium in enumerate(AXES["base_premium"]):
+            _, month, _ = simulate_mstr_monthly(**dict(inputs, btc_growth_annual=growth, base_premium=premium))
+            assert result.collapse_month[i, j] == (NO_COLLAPSE if month is None else month)
+    assert result.survived.any() and not result.survived.all()
+
+
+def test_pool_matches_in_process():
+    inputs = make_inputs()
+    serial = sweep_grid(inputs, AXES, max_workers=1)
+    pooled = sweep_grid(inputs, AXES, max_workers=2, chunks_per_worker=3)
+    np.testing.assert_array_equal(pooled.collapse_month, serial.collapse_month)
+
+
+def test_surfaces_are_y_by_x():
+    result = sweep_grid(make_inputs(), AXES, max_workers=1)
+    surface = result.survival_surface("btc_growth_annual", "base_premium")
+    assert surface.shape == (3, 6)
+    np.testing.assert_array_equal(surface, result.survived.T.astype(float))
+    months = result.collapse_surface("btc_growth_annual", "base_premium")
+    assert months.max() <= result.n_months
+
+
+def test_unknown_axis_is_refused():
+    with pytest.raises(ValueError, match="Cannot sweep"):
+        sweep_grid(make_inputs(), {"convertible_debts": [1, 2]}, max_workers=1)
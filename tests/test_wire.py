@@ -0,0 +1,78 @@
+import dataclasses
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mstr_sim import wire
+from mstr_sim.instruments import ConvertibleDebt
+from mstr_sim.montecarlo import MarketImpact, simulate_mstr_paths
+from mstr_sim.paths import RegimeSwitching
+from mstr_sim.streaming import simulate_mstr_bands
+
+
+def assert_same(a, b):
+    assert type(a) is type(b)
+    if isinstance(a, np.ndarray):
+        assert a.dtype == b.dtype
+        np.testing.assert_array_equal(a, b)
+    elif isinstance(a, pd.DataFrame):
+        pd.testing.assert_frame_equal(a, b)
+    elif dataclasses.is_dataclass(a):
+        for f in dataclasses.fields(a):
+            assert_same(getattr(a, f.name), getattr(b, f.name))
+    elif isinstance(a, dict):
+        assert list(a) == list(b)
+        for k in a:
+            assert_same(a[k], b[k])
+    elif isinstance(a, (list, tuple)):
+        assert len(a) == len(b)
+        for x, y in zip(a, b):
+            assert_same(x, y)
+    else:
+        assert a == b
+
+
+def round_trip(value):
+    return wire.loads(wire.dumps(value))
+
+
+def test_inputs_round_trip(inputs):
+    inputs["btc_path"] = RegimeSwitching().generate(1, inputs["n_months"], inputs["btc_price_start"],
+                                                    np.random.default_rng(0))[0]
+    assert_same(round_trip(inputs), inputs)
+
+
+@pytest.mark.parametrize("value", [
+    ConvertibleDebt("Notes 2030", 2e9, 60, 0.02, 400.0, put_month=36),
+    MarketImpact(1e6, recovery=0.1, issuance_elasticity=0.5),
+    RegimeSwitching(),
+    {1: "int key", (2, 3): "tuple key"},
+    (1.5, None, "x"),
+    np.arange(12, dtype=np.int8).reshape(3, 4),
+])
+def test_values_round_trip(value):
+    assert_same(round_trip(value), value)
+
+
+def test_path_results_round_trip_bit_exact(inputs):
+    result = simulate_mstr_paths(n_paths=20, seed=1, **inputs)
+    assert_same(round_trip(result), result)
+
+
+def test_band_results_round_trip(inputs):
+    result = simulate_mstr_bands(n_paths=500, seed=2, **inputs)
+    assert_same(round_trip(result), result)
+
+
+def test_frame_round_trip(inputs):
+    from mstr_sim.engine import simulate_mstr_monthly
+
+    frame, month, reason = simulate_mstr_monthly(**inputs)
+    assert_same(round_trip((frame, month, reason)), (frame, month, reason))
+
+
+def test_unregistered_types_are_refused():
+    payload = b'{"__type__": "Popen", "fields": {"args": "ls"}}'
+    with pytest.raises(ValueError):
+        wire.loads(payload)